@@ -0,0 +1,1080 @@
+"""
+Benchmarks offline del pipeline de ingesta.
+
+Uso:
+    python benchmark.py fetch --matches 100 --latency 0.05 --workers 8
+    python benchmark.py cache --matches 100 --latency 0.05
+    python benchmark.py parse --matchdays 38 --matches 10 --processes 4
+    python benchmark.py scaling --matchdays 1 5 10 20 38
+    python benchmark.py staging --matchdays 38 --matches 10
+    python benchmark.py stats --matchdays 38 --matches 10
+    python benchmark.py dtypes --matchdays 38 --matches 10
+    python benchmark.py bulk --matchdays 38 --matches 10 --batch-size 500 1000 5000
+    python benchmark.py imports --budget 1.5
+    python benchmark.py pipeline --matchdays 10 38 --matches 10
+    python benchmark.py aggregates --season-id 6
+    python benchmark.py partitions --season-id 6
+    python benchmark.py standings --teams 20 --matchdays 38
+    python benchmark.py matchstore --seasons 10 --teams 20 --matchdays 38
+    python benchmark.py memory --seasons 5 --teams 20 --players 28 --matchdays 38
+    python benchmark.py detailed --season-id 6 --team-id 1
+"""
+import argparse
+import filecmp
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from modules.cache import CachedScraper, ResponseCache
+from modules.fetcher import HostLimiter, fetch_matches
+
+
+class StandInScraper:
+    """
+    Sustituto local de ThreeSixFiveScores con latencia inyectable.
+    Devuelve partidos sintéticos deterministas a partir de la URL.
+    """
+    def __init__(self, latency=0.05):
+        self.latency = latency
+
+    def get_match_data(self, url):
+        time.sleep(self.latency)
+        return synthetic_match(url.strip())
+
+    def get_players_info(self, url):
+        time.sleep(self.latency)
+        match = synthetic_match(url.strip())
+        rows = []
+        for competitor in ['homeCompetitor', 'awayCompetitor']:
+            team = match[competitor]
+            for n, member in enumerate(team['lineups']['members'], start=1):
+                rows.append({
+                    'competitorId': team['id'], 'id': member['id'], 'shortName': f"J{n}", 'name': f"Jugador {member['id']}",
+                    'status': 1, 'jerseyNumber': n, 'statusText': "", 'hasStats': True,
+                })
+        return rows
+
+
+class StandInCursor:
+    """
+    Cursor que no guarda nada: cada sentencia espera `latency` más `row_cost` por fila de VALUES.
+    """
+    def __init__(self, latency, row_cost):
+        self.latency = latency
+        self.row_cost = row_cost
+
+    def execute(self, query, args=None):
+        rows = max(1, query.count("(%s"))
+        time.sleep(self.latency + rows * self.row_cost)
+        return rows
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StandInConnection:
+    def __init__(self, latency, row_cost):
+        self.latency = latency
+        self.row_cost = row_cost
+
+    def cursor(self):
+        return StandInCursor(self.latency, self.row_cost)
+
+    def commit(self):
+        time.sleep(self.latency)
+
+    def rollback(self):
+        pass
+
+    def ping(self, reconnect=False):
+        pass
+
+    def close(self):
+        pass
+
+
+def synthetic_match(url, players_per_team=16):
+    """
+    Genera un partido con la misma forma que la respuesta de 365scores.
+    """
+    rng = random.Random(url)
+    match_id = rng.randint(1_000_000, 9_999_999)
+
+    def competitor(team_id):
+        members = []
+        for n in range(players_per_team):
+            stats = [
+                {"name": "Minutos jugados", "value": f"{rng.randint(1, 90)}'"},
+                {"name": "Goles", "value": str(rng.randint(0, 2))},
+                {"name": "Asistencias", "value": str(rng.randint(0, 1))},
+                {"name": "Pases completados", "value": f"{rng.randint(10, 40)}/{rng.randint(40, 60)} (70%)"},
+                {"name": "Centros", "value": f"{rng.randint(0, 3)}/{rng.randint(3, 6)}"},
+                {"name": "Goles esperados (xG)", "value": f"{rng.random():.2f}"},
+                {"name": "Toques", "value": str(rng.randint(10, 90))},
+            ]
+            members.append({
+                "id": team_id * 100 + n,
+                "position": {"shortName": rng.choice(["POR", "DEF", "MED", "DEL"])},
+                "stats": stats,
+            })
+        return {
+            "id": team_id,
+            "name": f"Equipo {team_id}",
+            "score": rng.randint(0, 4),
+            "lineups": {"members": members},
+        }
+
+    return {
+        "id": match_id,
+        "roundNum": rng.randint(1, 38),
+        "competitionDisplayName": "Synthetic League",
+        "homeCompetitor": competitor(rng.randint(1, 20)),
+        "awayCompetitor": competitor(rng.randint(21, 40)),
+        "gameTime": 90,
+        "actualPlayTime": {"totalTime": {"name": "Tiempo total 96:30"}},
+    }
+
+
+def write_synthetic_season(folder_path, matchdays=38, matches=10):
+    """
+    Escribe una temporada sintética en folder_path/<jornada>/<n>.json, como extractor_data_match.
+    Devuelve la lista de archivos creados.
+    """
+    files = []
+    for matchday in range(1, matchdays + 1):
+        os.makedirs(os.path.join(folder_path, str(matchday)), exist_ok=True)
+        for n in range(1, matches + 1):
+            match = synthetic_match(f"jornada-{matchday}-partido-{n}")
+            match['roundNum'] = matchday
+            file_path = os.path.join(folder_path, str(matchday), f"{n}.json")
+            with open(file_path, 'w') as archivo:
+                json.dump(match, archivo, indent=4)
+            files.append(file_path)
+    return files
+
+
+def bench_fetch(args):
+    urls = [f"https://webws.365scores.com/web/game/?gameId={n}\n" for n in range(args.matches)]
+    scraper = StandInScraper(args.latency)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        secuencial = os.path.join(tmp, "secuencial")
+        concurrente = os.path.join(tmp, "concurrente")
+        os.makedirs(secuencial)
+        os.makedirs(concurrente)
+
+        inicio = time.perf_counter()
+        fetch_matches(scraper, [(url, os.path.join(secuencial, f"{n}.json")) for n, url in enumerate(urls, start=1)])
+        t_secuencial = time.perf_counter() - inicio
+
+        limiter = HostLimiter(args.max_per_host, args.min_interval)
+        inicio = time.perf_counter()
+        fetch_matches(scraper, [(url, os.path.join(concurrente, f"{n}.json")) for n, url in enumerate(urls, start=1)],
+                      workers=args.workers, limiter=limiter)
+        t_concurrente = time.perf_counter() - inicio
+
+        nombres = sorted(os.listdir(secuencial))
+        _, distintos, errores = filecmp.cmpfiles(secuencial, concurrente, nombres, shallow=False)
+
+    print(f"Secuencial:  {t_secuencial:.2f} s")
+    print(f"Concurrente: {t_concurrente:.2f} s ({args.workers} workers, {args.max_per_host} por host)")
+    print(f"Aceleración: {t_secuencial / t_concurrente:.1f}x")
+    print(f"Archivos idénticos: {not distintos and not errores}")
+
+
+def bench_cache(args):
+    urls = [f"https://webws.365scores.com/web/game/?gameId={n}\n" for n in range(args.matches)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        salida = os.path.join(tmp, "match_data")
+        os.makedirs(salida)
+        jobs = [(url, os.path.join(salida, f"{n}.json")) for n, url in enumerate(urls, start=1)]
+        cache = ResponseCache(os.path.join(tmp, "cache"), ttl=0)
+        scraper = CachedScraper(StandInScraper(args.latency), cache)
+
+        # Los partidos sintéticos se marcan como terminados para que no expiren
+        scraper.scraper.get_match_data = lambda url: dict(synthetic_match(url.strip()), statusGroup=4)
+
+        for intento in ("En frío", "En caliente"):
+            inicio = time.perf_counter()
+            fetch_matches(scraper, jobs)
+            print(f"{intento}: {time.perf_counter() - inicio:.2f} s")
+            cache.report()
+
+        # Reproducción sin red: la misma caché sirve como fixture
+        replay = CachedScraper(None, ResponseCache(os.path.join(tmp, "cache"), offline=True))
+        inicio = time.perf_counter()
+        fallidos = fetch_matches(replay, jobs)
+        print(f"Offline: {time.perf_counter() - inicio:.2f} s, {len(fallidos)} fallos")
+
+
+def bench_parse(args):
+    from modules.match_record import MatchRecord, load_records
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = write_synthetic_season(os.path.join(tmp, "match_data"), args.matchdays, args.matches)
+
+        # Antes: football_game, stats, positions y teams abrían y parseaban cada archivo por separado.
+        # La extracción de filas se cuenta una sola vez en ambos casos.
+        inicio = time.perf_counter()
+        for file_path in files:
+            for _ in range(4):
+                with open(file_path, 'r') as f:
+                    data = json.load(f)
+            MatchRecord(file_path, data)
+        t_antes = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        records = load_records(files)
+        t_ahora = time.perf_counter() - inicio
+
+        print(f"{len(files)} archivos, {len(records)} registros")
+        print(f"Una lectura por constructor (4 por archivo): {t_antes:.2f} s")
+        print(f"MatchRecord (1 lectura por archivo):        {t_ahora:.2f} s")
+        print(f"Aceleración: {t_antes / t_ahora:.1f}x")
+
+        if args.processes > 1:
+            inicio = time.perf_counter()
+            paralelo = load_records(files, args.processes)
+            t_paralelo = time.perf_counter() - inicio
+            iguales = list(paralelo) == list(records) and all(
+                paralelo[f].player_stats == records[f].player_stats for f in records)
+            print(f"MatchRecord en {args.processes} procesos:       {t_paralelo:.2f} s ({t_ahora / t_paralelo:.1f}x)")
+            print(f"Resultados idénticos: {iguales}")
+
+
+def bench_scaling(args):
+    from modules.dataframe_builder import dataframe_positions, dataframe_stats_match
+    from modules.match_record import load_records
+
+    print("Jornadas  Partidos  Tiempo (s)  ms/partido")
+    with tempfile.TemporaryDirectory() as tmp:
+        for matchdays in args.matchdays:
+            files = write_synthetic_season(os.path.join(tmp, f"match_data_{matchdays}"), matchdays, args.matches)
+            records = load_records(files)
+            inicio = time.perf_counter()
+            dataframe_stats_match(None, None, 1, 0, files=files, records=records)
+            dataframe_positions(None, 0, files=files, records=records)
+            tiempo = time.perf_counter() - inicio
+            print(f"{matchdays:>8}  {len(files):>8}  {tiempo:>10.2f}  {tiempo / len(files) * 1000:>10.2f}")
+
+
+def bench_staging(args):
+    from modules import staging
+    from modules.dataframe_builder import dataframe_stats_match
+    from modules.match_record import load_records
+
+    if staging.pyarrow is None:
+        print("Este benchmark necesita pyarrow.")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        staging.STAGING_PATH = os.path.join(tmp, "staging")
+        files = write_synthetic_season(os.path.join(tmp, "match_data"), args.matchdays, args.matches)
+
+        inicio = time.perf_counter()
+        stats, football_game = dataframe_stats_match(None, None, 1, 0, files=files, records=load_records(files))
+        t_json = time.perf_counter() - inicio
+
+        for matchday in range(1, args.matchdays + 1):
+            staging.write_matchday("synthetic", "2024_2025", matchday, {
+                'football_game': football_game[football_game['matchday_id'] == matchday + 50],
+                'player_stats': stats[stats['match_id'].isin(football_game.loc[football_game['matchday_id'] == matchday + 50, 'match_id'])],
+            })
+
+        inicio = time.perf_counter()
+        staged_stats = staging.read_table("synthetic", "2024_2025", 'player_stats')
+        staged_game = staging.read_table("synthetic", "2024_2025", 'football_game')
+        t_parquet = time.perf_counter() - inicio
+
+    print(f"{len(files)} partidos, {len(staged_stats)} filas de player_stats, {len(staged_game)} partidos en staging")
+    print(f"Desde JSON:    {t_json:.2f} s")
+    print(f"Desde Parquet: {t_parquet:.2f} s")
+    print(f"Aceleración: {t_json / t_parquet:.1f}x")
+
+
+def bench_stats(args):
+    from modules.dataframe_builder import concat_frames, extract_stats, extract_stats_vectorized
+    from modules.match_record import load_records
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = write_synthetic_season(os.path.join(tmp, "match_data"), args.matchdays, args.matches)
+
+        inicio = time.perf_counter()
+        records = load_records(files)
+        t_records = time.perf_counter() - inicio
+        antes = concat_frames([extract_stats(file_path, records[file_path]) for file_path in files])
+        t_antes = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        records = load_records(files, long_stats=True)
+        t_records_long = time.perf_counter() - inicio
+        ahora, _ = extract_stats_vectorized(files, records)
+        t_ahora = time.perf_counter() - inicio
+
+    print(f"Por valor:   lectura y conversión {t_records:.2f} s, DataFrames {t_antes - t_records:.2f} s, total {t_antes:.2f} s")
+    print(f"Vectorizado: lectura {t_records_long:.2f} s, conversión y pivot {t_ahora - t_records_long:.2f} s, total {t_ahora:.2f} s")
+    print(f"Aceleración: {t_antes / t_ahora:.1f}x")
+    print(f"Mismos valores: {list(antes.columns) == list(ahora.columns) and antes.astype(float).equals(ahora.astype(float))}")
+
+
+def bench_dtypes(args):
+    from modules.dataframe_builder import concat_frames, extract_football_game, extract_stats
+    from modules.match_record import load_records
+    from modules.staging import narrow_frame, out_of_range, schema_dtypes
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = write_synthetic_season(os.path.join(tmp, "match_data"), args.matchdays, args.matches)
+        records = load_records(files)
+        frames = {
+            'player_stats': concat_frames([extract_stats(file_path, records[file_path]) for file_path in files]),
+            'football_game': concat_frames([extract_football_game(file_path, 1, records[file_path]) for file_path in files]),
+        }
+    dtypes = schema_dtypes()
+    print(f"{'Tabla':<14} {'Filas':>6} {'Antes (MB)':>11} {'Ahora (MB)':>11} {'Conversión (ms)':>16}  Mismos valores")
+    for table, antes in frames.items():
+        antes['season_id'] = 1
+        inicio = time.perf_counter()
+        ahora = narrow_frame(antes.copy(), table, dtypes)
+        segundos = time.perf_counter() - inicio
+        iguales = antes.astype(float).equals(ahora.astype(float)) and not out_of_range(ahora, table)
+        print(f"{table:<14} {len(antes):>6} {antes.memory_usage(deep=True).sum() / 2 ** 20:>11.2f} "
+              f"{ahora.memory_usage(deep=True).sum() / 2 ** 20:>11.2f} {segundos * 1000:>16.1f}  {iguales}")
+
+
+def bench_bulk(args):
+    import pymysql
+    from modules.bulk_loader import bulk_insert, frame_rows
+    from modules.dataframe_builder import concat_frames, extract_stats
+    from modules.match_record import load_records
+    from modules.stat_catalog import get_catalog
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = write_synthetic_season(os.path.join(tmp, "match_data"), args.matchdays, args.matches)
+        records = load_records(files)
+        stats = concat_frames([extract_stats(file_path, records[file_path]) for file_path in files]).fillna(0)
+    stats['season_id'] = 1
+    columns = get_catalog().insert_columns(stats.columns)
+    rows = frame_rows(stats, columns)
+
+    with open(args.credentials) as f:
+        config = json.load(f)
+    connection = pymysql.connect(user=config['DB_USER'], password=config['DB_PASSWORD'], host=config['DB_HOST'],
+                                 database=config['DB_NAME'], local_infile=True)
+    cursor = connection.cursor()
+    # La tabla temporal no copia las claves foráneas ni toca los datos reales
+    cursor.execute("CREATE TEMPORARY TABLE bench_player_stats LIKE player_stats")
+
+    def medir(nombre, cargar):
+        cursor.execute("TRUNCATE TABLE bench_player_stats")
+        inicio = time.perf_counter()
+        cargar()
+        connection.commit()
+        segundos = time.perf_counter() - inicio
+        print(f"{nombre:<22} {len(rows)} filas en {segundos:.2f} s ({len(rows) / segundos:.0f} filas/s)")
+
+    query = f"INSERT INTO bench_player_stats ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    medir("executemany", lambda: cursor.executemany(query, rows))
+    for batch_size in args.batch_size:
+        medir(f"insert lotes de {batch_size}", lambda: bulk_insert(connection, 'bench_player_stats', columns, rows, 'insert', batch_size))
+    medir("load_data", lambda: bulk_insert(connection, 'bench_player_stats', columns, rows, 'load_data'))
+    cursor.close()
+    connection.close()
+
+
+def bench_aggregates(args):
+    import pymysql
+
+    with open(args.credentials) as f:
+        config = json.load(f)
+    connection = pymysql.connect(user=config['DB_USER'], password=config['DB_PASSWORD'], host=config['DB_HOST'],
+                                 database=config['DB_NAME'])
+    cursor = connection.cursor()
+    # La consulta que hacía Season.load_teams_and_players antes de player_season_stats
+    antes = """
+    SELECT p.player_id, p.team_id, SUM(ps.goles), SUM(ps.asistencias), SUM(ps.pases_claves), SUM(ps.goles_recibidos),
+        SUM(ps.faltas_cometidas), SUM(ps.big_chances_scored), SUM(ps.chances_perdidas)
+    FROM player p
+    LEFT JOIN player_stats ps ON p.player_id = ps.player_id AND p.team_id = ps.team_id
+    WHERE p.season_id = %s
+    GROUP BY p.player_id
+    """
+    ahora = """
+    SELECT p.player_id, p.team_id, t.goles, t.asistencias, t.pases_claves, t.goles_recibidos,
+        t.faltas_cometidas, t.big_chances_scored, t.chances_perdidas
+    FROM player p
+    LEFT JOIN player_season_stats t ON t.player_id = p.player_id AND t.team_id = p.team_id AND t.season_id = p.season_id
+    WHERE p.season_id = %s
+    """
+    cursor.execute("SELECT COUNT(*) FROM player_stats WHERE season_id = %s", (args.season_id,))
+    print(f"Temporada {args.season_id}: {cursor.fetchone()[0]} filas en player_stats")
+    for nombre, query in (("SUM sobre player_stats", antes), ("player_season_stats", ahora)):
+        inicio = time.perf_counter()
+        for _ in range(args.repeat):
+            cursor.execute(query, (args.season_id,))
+            filas = cursor.fetchall()
+        segundos = (time.perf_counter() - inicio) / args.repeat
+        print(f"{nombre:<24} {len(filas)} jugadores en {segundos * 1000:.1f} ms")
+    cursor.close()
+    connection.close()
+
+
+def bench_partitions(args):
+    import pymysql
+
+    with open(args.credentials) as f:
+        config = json.load(f)
+    connection = pymysql.connect(user=config['DB_USER'], password=config['DB_PASSWORD'], host=config['DB_HOST'],
+                                 database=config['DB_NAME'])
+    cursor = connection.cursor()
+    cursor.execute(
+        "SELECT TABLE_NAME, PARTITION_NAME, TABLE_ROWS FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ('player_stats', 'football_game') AND PARTITION_NAME IS NOT NULL"
+    )
+    for table, partition, rows in cursor.fetchall():
+        print(f"{table:<14} {partition:<10} ~{rows} filas")
+    # Las lecturas de una temporada deben leer solo su partición (columna partitions de EXPLAIN)
+    consultas = [
+        "SELECT * FROM player_stats WHERE season_id = %s",
+        "SELECT * FROM football_game WHERE season_id = %s",
+        "SELECT player_id, SUM(goles) FROM player_stats WHERE season_id = %s GROUP BY player_id",
+    ]
+    for query in consultas:
+        cursor.execute("EXPLAIN PARTITIONS " + query, (args.season_id,))
+        columnas = [column[0] for column in cursor.description]
+        particiones = {row[columnas.index('partitions')] for row in cursor.fetchall()}
+        inicio = time.perf_counter()
+        for _ in range(args.repeat):
+            cursor.execute(query, (args.season_id,))
+            filas = cursor.fetchall()
+        segundos = (time.perf_counter() - inicio) / args.repeat
+        print(f"{query[:60]:<60} particiones {sorted(particiones)}: {len(filas)} filas en {segundos * 1000:.1f} ms")
+    cursor.close()
+    connection.close()
+
+
+def bench_detailed(args):
+    import pymysql
+    from modules import stats_cache
+
+    with open(args.credentials) as f:
+        config = json.load(f)
+    connection = pymysql.connect(user=config['DB_USER'], password=config['DB_PASSWORD'], host=config['DB_HOST'],
+                                 database=config['DB_NAME'])
+    cursor = connection.cursor()
+    cursor.execute("SELECT player_id, team_id FROM player WHERE season_id = %s AND team_id = %s", (args.season_id, args.team_id))
+    plantel = cursor.fetchall()
+    print(f"Temporada {args.season_id}, equipo {args.team_id}: {len(plantel)} jugadores")
+
+    def por_jugador_antes():
+        # Como el display_detailed_stats original: SHOW COLUMNS y un SELECT por jugador, sumados en Python
+        for player_id, team_id in plantel:
+            cursor.execute("SHOW COLUMNS FROM player_stats")
+            columnas = [column[0] for column in cursor.fetchall()]
+            cursor.execute("SELECT * FROM player_stats WHERE player_id = %s AND team_id = %s AND season_id = %s",
+                           (player_id, team_id, args.season_id))
+            totales = {}
+            for fila in cursor.fetchall():
+                for columna, valor in zip(columnas, fila):
+                    if columna not in ('player_id', 'team_id', 'season_id', 'match_id', 'insert_date'):
+                        totales[columna] = totales.get(columna, 0) + (valor or 0)
+
+    def por_jugador():
+        # Una fila de player_season_stats por jugador
+        for player_id, team_id in plantel:
+            cursor.execute("SELECT * FROM player_season_stats WHERE player_id = %s AND team_id = %s AND season_id = %s",
+                           (player_id, team_id, args.season_id))
+            cursor.fetchone()
+
+    def cache():
+        stats_cache.invalidate([args.season_id])
+        stats = stats_cache.season_stats(args.season_id)
+        for player_id, team_id in plantel:
+            stats.player_totals(connection, player_id, team_id)
+            if args.per_match:
+                stats.player_matches(connection, player_id, team_id)
+
+    for nombre, ejecutar, consultas in (("SHOW COLUMNS + SELECT", por_jugador_antes, 2 * len(plantel)),
+                                        ("player_season_stats", por_jugador, len(plantel)),
+                                        ("caché de temporada", cache, 2 if args.per_match else 1)):
+        inicio = time.perf_counter()
+        for _ in range(args.repeat):
+            ejecutar()
+        segundos = (time.perf_counter() - inicio) / args.repeat
+        print(f"{nombre:<24} {consultas:>4} consultas, {segundos * 1000:.1f} ms para el plantel")
+    cursor.close()
+    connection.close()
+
+
+def bench_standings(args):
+    from collections import namedtuple
+    import pandas as pd
+    from modules.standings import Standings, results_from_matches
+
+    # Mismos atributos que classes.Match, sin importar bokeh
+    Partido = namedtuple('Partido', 'match_id matchday_id home_team_id away_team_id home_score away_score')
+    rng = random.Random(0)
+    team_ids = list(range(1, args.teams + 1))
+    matches_by_team = {team_id: [] for team_id in team_ids}
+    match_id = 0
+    for matchday in range(1, args.matchdays + 1):
+        rng.shuffle(team_ids)
+        for home, away in zip(team_ids[::2], team_ids[1::2]):
+            match_id += 1
+            partido = Partido(match_id, 50 + matchday, home, away, rng.randint(0, 4), rng.randint(0, 3))
+            matches_by_team[home].append(partido)
+            matches_by_team[away].append(partido)
+    matchdays = [50 + matchday for matchday in range(1, args.matchdays + 1)]
+
+    def recorrido(matchday):
+        # Como el calculate_standings anterior: cada tabla recorre los partidos de todos los equipos
+        stats = {team_id: [0, 0, 0, 0, 0] for team_id in matches_by_team}
+        for team_id, matches in matches_by_team.items():
+            for match in matches:
+                if match.matchday_id > matchday:
+                    continue
+                home = match.home_team_id == team_id
+                goals_for, goals_against = (match.home_score, match.away_score) if home else (match.away_score, match.home_score)
+                fila = stats[team_id]
+                fila[0] += goals_for > goals_against
+                fila[1] += goals_for == goals_against
+                fila[2] += goals_for < goals_against
+                fila[3] += goals_for
+                fila[4] += goals_against
+        order = sorted(stats, key=lambda team_id: (stats[team_id][0] * 3 + stats[team_id][1],
+                                                   stats[team_id][3] - stats[team_id][4], stats[team_id][3]), reverse=True)
+        # La misma tabla que Standings.table, para comparar lo mismo
+        return pd.DataFrame({
+            'Posicion': range(1, len(order) + 1), 'Equipo': order, 'Nombre': [f"Equipo {team_id}" for team_id in order],
+            'PJ': [sum(stats[team_id][:3]) for team_id in order], 'PG': [stats[team_id][0] for team_id in order],
+            'PE': [stats[team_id][1] for team_id in order], 'PP': [stats[team_id][2] for team_id in order],
+            'GF': [stats[team_id][3] for team_id in order], 'GC': [stats[team_id][4] for team_id in order],
+            'DG': [stats[team_id][3] - stats[team_id][4] for team_id in order],
+            'Pts': [stats[team_id][0] * 3 + stats[team_id][1] for team_id in order],
+        })
+
+    inicio = time.perf_counter()
+    for matchday in matchdays:
+        tabla = recorrido(matchday)
+    antes = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    standings = Standings(results_from_matches(match for matches in matches_by_team.values() for match in matches),
+                          {team_id: f"Equipo {team_id}" for team_id in matches_by_team})
+    construccion = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    for matchday in matchdays:
+        ahora = standings.table(matchday)
+    consultas = time.perf_counter() - inicio
+    iguales = tabla[['Equipo', 'PJ', 'GF', 'GC', 'Pts']].values.tolist() == ahora[['Equipo', 'PJ', 'GF', 'GC', 'Pts']].values.tolist()
+    inicio = time.perf_counter()
+    for _ in range(args.lookups):
+        standings.team_totals(1, matchdays[len(matchdays) // 2])
+    totales = (time.perf_counter() - inicio) / args.lookups
+
+    print(f"{args.teams} equipos, {args.matchdays} jornadas, {match_id} partidos")
+    print(f"Recorriendo los partidos por jornada: {antes * 1000:.1f} ms para las {len(matchdays)} tablas "
+          f"({antes / len(matchdays) * 1000:.2f} ms por tabla)")
+    print(f"Tabla acumulada: construcción {construccion * 1000:.1f} ms, {consultas * 1000:.1f} ms para las "
+          f"{len(matchdays)} tablas ({consultas / len(matchdays) * 1000:.2f} ms por tabla), "
+          f"totales de un equipo {totales * 1e6:.1f} µs")
+    print(f"Misma tabla en la última jornada: {iguales}")
+
+
+def bench_matchstore(args):
+    import numpy as np
+    from modules.match_store import RECORD_COLUMNS, MatchStore
+    from modules.standings import Standings, results_from_matches
+
+    class Partido:
+        # Mismos atributos que classes.Match, sin importar bokeh
+        def __init__(self, match_id, matchday_id, home_team_id, away_team_id, home_score, away_score, duration):
+            self.match_id = match_id
+            self.matchday_id = matchday_id
+            self.home_team_id = home_team_id
+            self.away_team_id = away_team_id
+            self.home_score = home_score
+            self.away_score = away_score
+            self.duration = duration
+
+    rng = random.Random(0)
+    filas = {}
+    match_id = 0
+    for season_id in range(1, args.seasons + 1):
+        team_ids = list(range(1, args.teams + 1))
+        filas[season_id] = []
+        for matchday in range(1, args.matchdays + 1):
+            rng.shuffle(team_ids)
+            for home, away in zip(team_ids[::2], team_ids[1::2]):
+                match_id += 1
+                filas[season_id].append((match_id, season_id * 50 + matchday, home, away,
+                                         rng.randint(0, 4), rng.randint(0, 3), 90))
+    names = {team_id: f"Equipo {team_id}" for team_id in range(1, args.teams + 1)}
+
+    def objetos():
+        # Como el load_matches_and_assign_to_teams anterior: un objeto por partido en la lista de cada equipo
+        temporadas = {}
+        for season_id, rows in filas.items():
+            matches = temporadas[season_id] = {team_id: [] for team_id in names}
+            for row in rows:
+                partido = Partido(*row)
+                matches[partido.home_team_id].append(partido)
+                matches[partido.away_team_id].append(partido)
+        return temporadas
+
+    def tablas_objetos(temporadas):
+        return [Standings(results_from_matches(m for matches in t.values() for m in matches), names).table()
+                for t in temporadas.values()]
+
+    def tendencias_objetos(temporadas):
+        # Rendimiento acumulado de cada equipo, como plot_performance_trends
+        tendencias = []
+        for matches_by_team in temporadas.values():
+            for team_id, matches in matches_by_team.items():
+                total, serie = 0, []
+                for match in sorted(matches, key=lambda x: x.matchday_id):
+                    goals_for, goals_against = ((match.home_score, match.away_score) if match.home_team_id == team_id
+                                                else (match.away_score, match.home_score))
+                    total += (goals_for > goals_against) - (goals_for < goals_against)
+                    serie.append(total)
+                tendencias.append(serie)
+        return tendencias
+
+    def totales_objetos(temporadas):
+        # Totales de cada equipo sumando todas las temporadas
+        totales = {team_id: [0, 0, 0] for team_id in names}
+        for matches_by_team in temporadas.values():
+            for team_id, matches in matches_by_team.items():
+                for match in matches:
+                    home = match.home_team_id == team_id
+                    goals_for, goals_against = ((match.home_score, match.away_score) if home
+                                                else (match.away_score, match.home_score))
+                    fila = totales[team_id]
+                    fila[0] += 3 * (goals_for > goals_against) + (goals_for == goals_against)
+                    fila[1] += goals_for
+                    fila[2] += goals_against
+        return totales
+
+    def columnas():
+        return {season_id: MatchStore(rows, season_id) for season_id, rows in filas.items()}
+
+    def tablas_columnas(stores):
+        return [Standings(store.results(), names).table() for store in stores.values()]
+
+    def tendencias_columnas(stores):
+        return [np.cumsum(store.team_results(team_id)['outcome']).tolist()
+                for store in stores.values() for team_id in names]
+
+    def totales_columnas(stores):
+        totals = MatchStore.concat(stores.values()).records().sum(axis=1)
+        pts, gf, gc = (RECORD_COLUMNS.index(name) for name in ('Pts', 'GF', 'GC'))
+        return {team_id: [int(row[pts]), int(row[gf]), int(row[gc])] for team_id, row in zip(names, totals.tolist())}
+
+    etapas = {
+        "objetos": (objetos, tablas_objetos, tendencias_objetos, totales_objetos),
+        "columnas": (columnas, tablas_columnas, tendencias_columnas, totales_columnas),
+    }
+    resultados = {}
+    print(f"{'':<9} {'carga':>8} {'tablas':>8} {'tendencias':>11} {'totales':>8}  (ms)")
+    for nombre, (cargar, *analisis) in etapas.items():
+        inicio = time.perf_counter()
+        datos = cargar()
+        tiempos = [time.perf_counter() - inicio]
+        resultados[nombre] = []
+        for etapa in analisis:
+            inicio = time.perf_counter()
+            resultados[nombre].append(etapa(datos))
+            tiempos.append(time.perf_counter() - inicio)
+        print(f"{nombre:<9} {tiempos[0] * 1000:>8.1f} {tiempos[1] * 1000:>8.1f} {tiempos[2] * 1000:>11.1f} {tiempos[3] * 1000:>8.1f}")
+
+    (tablas_a, tendencias_a, totales_a), (tablas_b, tendencias_b, totales_b) = resultados["objetos"], resultados["columnas"]
+    iguales = (all(a.equals(b) for a, b in zip(tablas_a, tablas_b)) and tendencias_a == tendencias_b
+               and totales_a == totales_b)
+    print(f"{args.seasons} temporadas, {args.teams} equipos, {args.matchdays} jornadas, {match_id} partidos")
+    print(f"Mismos resultados: {iguales}")
+
+
+def bench_memory(args):
+    import tracemalloc
+    import numpy as np
+    from modules.classes import PLAYER_STAT_COLUMNS, Match, Player, PlayerStats, Season
+    from modules.match_store import MatchStore
+
+    class PlayerAntes:
+        # Como el Player anterior: __dict__ por instancia y un diccionario de estadísticas
+        def __init__(self, player_id, team_id, player_name, jersey_number, season_id, position, stats=None):
+            self.player_id = player_id
+            self.team_id = team_id
+            self.player_name = player_name
+            self.jersey_number = jersey_number
+            self.season_id = season_id
+            self.position = position
+            self.stats = stats or {}
+
+    class MatchAntes:
+        def __init__(self, match_id, matchday_id, home_team_id, away_team_id, home_score, away_score, duration):
+            self.match_id = match_id
+            self.matchday_id = matchday_id
+            self.home_team_id = home_team_id
+            self.away_team_id = away_team_id
+            self.home_score = home_score
+            self.away_score = away_score
+            self.duration = duration
+
+    # Filas como las de la base de datos, creadas antes de medir: los textos y tuplas son los mismos en los dos casos
+    rng = random.Random(0)
+    jugadores, partidos = {}, {}
+    player_id = match_id = 0
+    for season_id in range(1, args.seasons + 1):
+        jugadores[season_id] = []
+        for team_id in range(1, args.teams + 1):
+            for dorsal in range(1, args.players + 1):
+                player_id += 1
+                jugadores[season_id].append((player_id, team_id, f"Jugador {player_id}", dorsal, season_id, "M")
+                                            + tuple(rng.randint(0, 300 if i == 3 else 20) for i in range(len(PLAYER_STAT_COLUMNS))))
+        partidos[season_id] = []
+        team_ids = list(range(1, args.teams + 1))
+        for matchday in range(1, args.matchdays + 1):
+            rng.shuffle(team_ids)
+            for home, away in zip(team_ids[::2], team_ids[1::2]):
+                match_id += 1
+                partidos[season_id].append((match_id, season_id * 50 + matchday, home, away,
+                                            rng.randint(0, 4), rng.randint(0, 3), 90 + rng.randint(0, 8)))
+
+    def jugadores_antes():
+        # Como el load_teams_and_players anterior
+        return [PlayerAntes(*row[:6], stats={column: int(value or 0) for column, value in zip(PLAYER_STAT_COLUMNS, row[6:])})
+                for rows in jugadores.values() for row in rows]
+
+    def jugadores_ahora():
+        objetos = []
+        for rows in jugadores.values():
+            table = PlayerStats(np.array([[value or 0 for value in row[6:]] for row in rows], dtype='int32'))
+            objetos.extend(Player(*row[:6], table=table, row=i) for i, row in enumerate(rows))
+        return objetos
+
+    def partidos_antes():
+        # Como el load_matches_and_assign_to_teams anterior: un objeto por partido en la lista de sus dos equipos
+        temporadas = []
+        for rows in partidos.values():
+            matches_by_team = {team_id: [] for team_id in range(1, args.teams + 1)}
+            for row in rows:
+                match = MatchAntes(*row)
+                matches_by_team[match.home_team_id].append(match)
+                matches_by_team[match.away_team_id].append(match)
+            temporadas.append(matches_by_team)
+        return temporadas
+
+    def partidos_ahora():
+        return [MatchStore(rows, season_id) for season_id, rows in partidos.items()]
+
+    def medir(crear):
+        tracemalloc.start()
+        inicio = tracemalloc.get_traced_memory()[0]
+        objetos = crear()
+        memoria = tracemalloc.get_traced_memory()[0] - inicio
+        tracemalloc.stop()
+        del objetos
+        return memoria
+
+    n_jugadores = sum(len(rows) for rows in jugadores.values())
+    n_partidos = sum(len(rows) for rows in partidos.values())
+    print(f"{args.seasons} temporadas: {n_jugadores} jugadores, {n_partidos} partidos")
+    print(f"{'':<10} {'antes':>12} {'ahora':>12}  (bytes por objeto)")
+    for nombre, total, antes, ahora in (("jugador", n_jugadores, jugadores_antes, jugadores_ahora),
+                                        ("partido", n_partidos, partidos_antes, partidos_ahora)):
+        bytes_antes, bytes_ahora = medir(antes), medir(ahora)
+        print(f"{nombre:<10} {bytes_antes / total:>12.0f} {bytes_ahora / total:>12.0f}  "
+              f"({bytes_antes / 1024 ** 2:.2f} MB -> {bytes_ahora / 1024 ** 2:.2f} MB)")
+    print(f"Un Match creado al recorrer una vista: {sys.getsizeof(Match(*partidos[1][0]))} bytes "
+          f"(antes {sys.getsizeof(MatchAntes(*partidos[1][0])) + sys.getsizeof(MatchAntes(*partidos[1][0]).__dict__)})")
+
+    class StandInCursor:
+        def __init__(self, queries):
+            self.queries = queries
+            self.rows = []
+
+        def execute(self, query, params):
+            self.rows = self.queries(query, params[0])
+
+        def fetchall(self):
+            return self.rows
+
+        def close(self):
+            pass
+
+    class StandInConnection:
+        def cursor(self):
+            return StandInCursor(lambda query, season_id: (
+                [(team_id, f"Equipo {team_id}", None, None) for team_id in range(1, args.teams + 1)] if "FROM team" in query
+                else jugadores[season_id] if "FROM player" in query else partidos[season_id]))
+
+    # Carga completa de las temporadas con Season, para ver el total en el uso real
+    def temporadas():
+        seasons = []
+        for season_id in jugadores:
+            season = Season(season_id, "synthetic", 1, "synthetic")
+            season.load_teams_and_players(StandInConnection())
+            season.load_matches_and_assign_to_teams(StandInConnection())
+            seasons.append(season)
+        return seasons
+    inicio = time.perf_counter()
+    temporadas()
+    segundos = time.perf_counter() - inicio
+    print(f"Season con jugadores y partidos, {args.seasons} temporadas: {medir(temporadas) / 1024 ** 2:.2f} MB, "
+          f"cargadas en {segundos * 1000:.0f} ms")
+
+
+def write_synthetic_jornadas(folder_path, matchdays=38, matches=10):
+    """
+    Escribe jornadas/<jornada>.txt con una URL sintética por partido, como las que lee el extractor.
+    """
+    os.makedirs(folder_path, exist_ok=True)
+    for matchday in range(1, matchdays + 1):
+        with open(os.path.join(folder_path, f"{matchday}.txt"), 'w') as archivo:
+            for n in range(1, matches + 1):
+                archivo.write(f"jornada-{matchday}-partido-{n}\n")
+
+
+def bench_pipeline(args):
+    import contextlib
+    import tracemalloc
+    from concurrent.futures import ThreadPoolExecutor
+    from modules import stat_catalog
+    from modules.database import ConnectionPool
+    from modules.pipeline import MatchdayBatch, SeasonPipeline
+
+    class StandInPool(ConnectionPool):
+        def _connect(self):
+            return StandInConnection(args.db_latency, args.row_cost)
+
+    def crear(carpeta):
+        write_synthetic_jornadas(os.path.join(carpeta, "synthetic", "2024_2025", "jornadas"), matchdays, args.matches)
+        return SeasonPipeline(
+            "synthetic", "2024_2025", 1, 0, fetch_workers=args.fetch_workers, parse_workers=args.parse_workers,
+            queue_size=args.queue_size, scraper=StandInScraper(args.latency), pool=StandInPool(2), data_path=carpeta)
+
+    def lotes(pipeline):
+        # Como extractor_data_match + update_season: todo se descarga, luego se parsea y al final se carga
+        jobs = pipeline.jobs()
+        with ThreadPoolExecutor(max_workers=args.fetch_workers) as executor:
+            list(executor.map(pipeline.fetch, jobs))
+        for item in jobs:
+            pipeline.parse(item)
+        pipeline.load(MatchdayBatch(0, jobs))
+
+    def flujo(pipeline):
+        return pipeline.run()
+
+    def medir(nombre, ejecutar):
+        # El tiempo se mide sin tracemalloc, que lo distorsiona; la memoria en otra ejecución
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            inicio = time.perf_counter()
+            report = ejecutar(crear(os.path.join(tmp, nombre, str(matchdays), "tiempo")))
+            segundos = time.perf_counter() - inicio
+            tracemalloc.start()
+            ejecutar(crear(os.path.join(tmp, nombre, str(matchdays), "memoria")))
+            pico = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+            tracemalloc.stop()
+        print(f"{matchdays:>8}  {matchdays * args.matches:>8}  {nombre:<8}  {segundos:>10.2f}  {pico:>17.1f}")
+        return report
+
+    print("Jornadas  Partidos  Modo      Tiempo (s)  Memoria pico (MB)")
+    with tempfile.TemporaryDirectory() as tmp:
+        stat_catalog._catalog = stat_catalog.StatCatalog(os.path.join(tmp, "stat_catalog.json"))
+        for matchdays in args.matchdays:
+            medir("lotes", lotes)
+            report = medir("flujo", flujo)
+            for name, stage in report['stages'].items():
+                print(f"    etapa {name}: {stage['items']} elementos, {stage['per_sec']:.1f}/s, {stage['errors']} errores")
+            for name, queue in report['queues'].items():
+                print(f"    cola {name}: máximo {queue['max']}/{queue['capacity']}, media {queue['mean']:.1f}")
+
+
+# Módulos de ingesta que se deben poder importar sin leer archivos ni abrir conexiones
+IMPORT_MODULES = ["modules.utils_dataframe", "modules.dataframe_builder", "modules.connector", "updater"]
+
+# Se ejecuta en un intérprete nuevo: mide el import y registra los open() del proyecto
+# (no los de pandas o numpy al cargarse) y todos los connect()
+IMPORT_PROBE = """
+import builtins, json, os, socket, sys, time
+efectos = []
+_open = builtins.open
+def _registrar_open(file, *args, **kwargs):
+    if sys._getframe(1).f_code.co_filename.startswith(os.getcwd()):
+        efectos.append(f"open {file}")
+    return _open(file, *args, **kwargs)
+def _registrar_connect(self, address):
+    efectos.append(f"connect {address}")
+    raise OSError("conexión bloqueada durante el import")
+builtins.open = _registrar_open
+socket.socket.connect = _registrar_connect
+inicio = time.perf_counter()
+error = None
+try:
+    __import__(sys.argv[1])
+except Exception as e:
+    error = repr(e)
+segundos = time.perf_counter() - inicio
+builtins.open = _open
+print(json.dumps({"seconds": segundos, "effects": efectos, "error": error}))
+"""
+
+
+def bench_imports(args):
+    carpeta = os.path.dirname(os.path.abspath(__file__))
+    fallos = 0
+    for module in args.modules:
+        tiempos = []
+        for _ in range(args.repeat):
+            proceso = subprocess.run([sys.executable, "-X", "importtime", "-c", IMPORT_PROBE, module],
+                                     cwd=carpeta, capture_output=True, text=True)
+            resultado = json.loads(proceso.stdout.strip().splitlines()[-1])
+            tiempos.append(resultado["seconds"])
+        segundos = sorted(tiempos)[len(tiempos) // 2]
+        estado = "OK" if segundos <= args.budget and not resultado["effects"] and not resultado["error"] else "FALLA"
+        fallos += estado != "OK"
+        print(f"{module:<28} {segundos:.2f} s (presupuesto {args.budget:.2f} s) {estado}")
+        if resultado["error"]:
+            print(f"  error al importar: {resultado['error']}")
+        for efecto in resultado["effects"]:
+            print(f"  efecto al importar: {efecto}")
+
+        # Los paquetes que más tardan en cargarse (tiempo acumulado de -X importtime)
+        paquetes = []
+        for line in proceso.stderr.splitlines():
+            partes = line.split("|")
+            if line.startswith("import time:") and len(partes) == 3 and partes[1].strip().isdigit():
+                paquetes.append((int(partes[1]), partes[2].strip()))
+        for microsegundos, nombre in sorted(paquetes, reverse=True)[1:args.top + 1]:
+            print(f"  {microsegundos / 1e6:.2f} s  {nombre}")
+    if fallos:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    fetch = subparsers.add_parser("fetch", help="Descarga secuencial vs concurrente contra un scraper local.")
+    fetch.add_argument("--matches", type=int, default=100)
+    fetch.add_argument("--latency", type=float, default=0.05)
+    fetch.add_argument("--workers", type=int, default=8)
+    fetch.add_argument("--max-per-host", type=int, default=8)
+    fetch.add_argument("--min-interval", type=float, default=0.0)
+    fetch.set_defaults(func=bench_fetch)
+
+    cache = subparsers.add_parser("cache", help="Ingesta repetida a través de la caché de respuestas.")
+    cache.add_argument("--matches", type=int, default=100)
+    cache.add_argument("--latency", type=float, default=0.05)
+    cache.set_defaults(func=bench_cache)
+
+    parse = subparsers.add_parser("parse", help="Parseo por constructor vs MatchRecord sobre una temporada sintética.")
+    parse.add_argument("--matchdays", type=int, default=38)
+    parse.add_argument("--matches", type=int, default=10)
+    parse.add_argument("--processes", type=int, default=1)
+    parse.set_defaults(func=bench_parse)
+
+    scaling = subparsers.add_parser("scaling", help="Tiempo de los constructores según el número de jornadas (debe crecer lineal).")
+    scaling.add_argument("--matchdays", type=int, nargs="+", default=[1, 5, 10, 20, 38])
+    scaling.add_argument("--matches", type=int, default=10)
+    scaling.set_defaults(func=bench_scaling)
+
+    staging = subparsers.add_parser("staging", help="Recarga de una temporada desde JSON vs desde el staging en Parquet.")
+    staging.add_argument("--matchdays", type=int, default=38)
+    staging.add_argument("--matches", type=int, default=10)
+    staging.set_defaults(func=bench_staging)
+
+    stats = subparsers.add_parser("stats", help="Conversión de estadísticas por valor vs vectorizada sobre una temporada.")
+    stats.add_argument("--matchdays", type=int, default=38)
+    stats.add_argument("--matches", type=int, default=10)
+    stats.set_defaults(func=bench_stats)
+
+    dtypes = subparsers.add_parser("dtypes", help="Memoria de los DataFrames de una temporada con int64/float64 vs los tipos de schema.sql.")
+    dtypes.add_argument("--matchdays", type=int, default=38)
+    dtypes.add_argument("--matches", type=int, default=10)
+    dtypes.set_defaults(func=bench_dtypes)
+
+    bulk = subparsers.add_parser("bulk", help="Carga de player_stats con executemany, INSERT por lotes y LOAD DATA (necesita la base de datos).")
+    bulk.add_argument("--matchdays", type=int, default=38)
+    bulk.add_argument("--matches", type=int, default=10)
+    bulk.add_argument("--batch-size", type=int, nargs="+", default=[500, 1000, 5000])
+    bulk.add_argument("--credentials", default="/home/sp3767/Documents/files/credentials.json")
+    bulk.set_defaults(func=bench_bulk)
+
+    imports = subparsers.add_parser("imports", help="Tiempo de import de los módulos de ingesta y efectos (archivos, conexiones) al importarlos.")
+    imports.add_argument("--modules", nargs="+", default=IMPORT_MODULES)
+    imports.add_argument("--budget", type=float, default=1.5)
+    imports.add_argument("--repeat", type=int, default=3)
+    imports.add_argument("--top", type=int, default=5)
+    imports.set_defaults(func=bench_imports)
+
+    pipeline = subparsers.add_parser("pipeline", help="Ingesta en lotes vs en flujo: tiempo y memoria según el largo de la temporada.")
+    pipeline.add_argument("--matchdays", type=int, nargs="+", default=[10, 38])
+    pipeline.add_argument("--matches", type=int, default=10)
+    pipeline.add_argument("--latency", type=float, default=0.02)
+    pipeline.add_argument("--db-latency", type=float, default=0.005)
+    pipeline.add_argument("--row-cost", type=float, default=0.00002)
+    pipeline.add_argument("--fetch-workers", type=int, default=4)
+    pipeline.add_argument("--parse-workers", type=int, default=2)
+    pipeline.add_argument("--queue-size", type=int, default=20)
+    pipeline.set_defaults(func=bench_pipeline)
+
+    aggregates = subparsers.add_parser("aggregates", help="Carga de jugadores de una temporada: SUM sobre player_stats vs player_season_stats (necesita la base de datos).")
+    aggregates.add_argument("--season-id", type=int, required=True)
+    aggregates.add_argument("--repeat", type=int, default=20)
+    aggregates.add_argument("--credentials", default="/home/sp3767/Documents/files/credentials.json")
+    aggregates.set_defaults(func=bench_aggregates)
+
+    partitions = subparsers.add_parser("partitions", help="Poda de particiones y tiempo de las lecturas de una temporada (necesita la base de datos).")
+    partitions.add_argument("--season-id", type=int, required=True)
+    partitions.add_argument("--repeat", type=int, default=20)
+    partitions.add_argument("--credentials", default="/home/sp3767/Documents/files/credentials.json")
+    partitions.set_defaults(func=bench_partitions)
+
+    detailed = subparsers.add_parser("detailed", help="Estadísticas detalladas de un plantel: una consulta por jugador vs la caché de temporada (necesita la base de datos).")
+    detailed.add_argument("--season-id", type=int, required=True)
+    detailed.add_argument("--team-id", type=int, required=True)
+    detailed.add_argument("--per-match", action="store_true", help="Lee también las filas por partido de cada jugador.")
+    detailed.add_argument("--repeat", type=int, default=5)
+    detailed.add_argument("--credentials", default="/home/sp3767/Documents/files/credentials.json")
+    detailed.set_defaults(func=bench_detailed)
+
+    standings = subparsers.add_parser("standings", help="Tablas de todas las jornadas recorriendo los partidos vs con la tabla acumulada.")
+    standings.add_argument("--teams", type=int, default=20)
+    standings.add_argument("--matchdays", type=int, default=38)
+    standings.add_argument("--lookups", type=int, default=10000)
+    standings.set_defaults(func=bench_standings)
+
+    matchstore = subparsers.add_parser("matchstore", help="Carga y análisis de varias temporadas con objetos Match vs el almacén por columnas.")
+    matchstore.add_argument("--seasons", type=int, default=10)
+    matchstore.add_argument("--teams", type=int, default=20)
+    matchstore.add_argument("--matchdays", type=int, default=38)
+    matchstore.set_defaults(func=bench_matchstore)
+
+    memory = subparsers.add_parser("memory", help="Memoria por jugador y por partido con objetos con __dict__ vs Player/Match compactos.")
+    memory.add_argument("--seasons", type=int, default=5)
+    memory.add_argument("--teams", type=int, default=20)
+    memory.add_argument("--players", type=int, default=28, help="Jugadores por equipo.")
+    memory.add_argument("--matchdays", type=int, default=38)
+    memory.set_defaults(func=bench_memory)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
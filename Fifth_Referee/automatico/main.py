@@ -1,12 +1,19 @@
-from modules.connector import get_competitions, get_seasons, connection
+from modules.connector import get_competitions, get_seasons
+from modules.database import get_pool
 from modules.classes import *
 
+import pandas as pd
+
+# Opciones de visualización para las tablas del análisis (antes las fijaban los módulos de ingesta al importarse)
+pd.set_option('display.max_columns', None)
+pd.set_option('display.max_rows', None)
+
 def select_and_display_season():
     """
     Función para seleccionar una competición, una temporada y mostrar los jugadores destacados.
     """
     # Selección de competición
-    competition_list = sorted(get_competitions(connection))
+    competition_list = sorted(get_competitions(get_pool()))
     print("\nCompeticiones disponibles:\n")
     for competition in competition_list:
         print(f"{competition[0]}. {competition[1].replace('_', ' ').title()}",end="    ")
@@ -15,7 +22,7 @@ def select_and_display_season():
     print(f"\nHas seleccionado {competition_name.replace('_', ' ').title()}\n")
 
     # Selección de temporada
-    season_list = list(get_seasons(connection, competition_id))
+    season_list = list(get_seasons(get_pool(), competition_id))
     print("Temporadas disponibles:\n")
     for idx, season in enumerate(season_list, start=1):
         print(f"{idx}. {season[2].replace('_','/')}\n")
@@ -31,8 +38,9 @@ def select_and_display_season():
 
     # Crear instancia de Season y cargar datos
     selected_season = Season(season_id, season_name, competition_id, competition_name)
-    selected_season.load_teams_and_players(connection)
-    selected_season.load_matches_and_assign_to_teams(connection)
+    with get_pool().connection() as connection:
+        selected_season.load_teams_and_players(connection)
+        selected_season.load_matches_and_assign_to_teams(connection)
 #    selected_season.display_top_players()
     selected_season.calculate_standings()
     # selected_season.display_standings()
@@ -86,24 +94,11 @@ def create_versus_from_ids(selected_season, home_team_id, away_team_id):
     """
     try:
         # Obtener standings de la temporada (última jornada disponible)
-        matchdays = []
-        for team in selected_season.teams:
-            if hasattr(team, 'matches'):  # Verificamos si el equipo tiene el atributo matches
-                matchdays.extend([match.matchday_id for match in team.matches])
-        
-        latest_matchday = max(matchdays) if matchdays else 0
-        standings = selected_season.calculate_standings(latest_matchday)
+        standings = selected_season.calculate_standings()
 
-        # Buscar los equipos por ID verificando el atributo team_id
-        home_team = None
-        away_team = None
-        
-        for team in selected_season.teams:
-            if hasattr(team, 'team_id'):  # Verificamos si el objeto tiene el atributo team_id
-                if team.team_id == home_team_id:
-                    home_team = team
-                elif team.team_id == away_team_id:
-                    away_team = team
+        # Buscar los equipos en el índice de la temporada
+        home_team = selected_season.get_team(home_team_id)
+        away_team = selected_season.get_team(away_team_id)
 
         if not home_team or not away_team:
             print("Uno o ambos equipos no se encontraron en la temporada seleccionada.")
@@ -115,9 +110,10 @@ def create_versus_from_ids(selected_season, home_team_id, away_team_id):
 
         # Crear el objeto Versus
         versus_instance = Versus(
-            home_team=home_team,
-            away_team=away_team,
-            standings=standings
+            home_team_id=home_team.team_id,
+            away_team_id=away_team.team_id,
+            standings=standings,
+            season=selected_season
         )
         
         print(f"Análisis creado para {home_name} (local) vs {away_name} (visitante)")
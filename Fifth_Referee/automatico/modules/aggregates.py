@@ -0,0 +1,170 @@
+"""
+Agregados materializados de la base de datos, mantenidos al insertar y borrar.
+
+- player_season_stats: totales de la temporada por jugador y equipo (una fila por jugador),
+  con el número de partidos con estadísticas en `matches`.
+- team_matchday_results: resultado de cada equipo en cada partido, con su jornada, goles
+  a favor y en contra y puntos. delete_matches la borra junto con su partido en football_game.
+
+Los totales de un jugador se recalculan desde player_stats solo para los jugadores que tocó
+una carga o un borrado, con una lectura por clave primaria, así que el costo depende de lo
+que cambió y no del tamaño de la temporada.
+
+Para llenar las tablas en una base de datos que ya tenía temporadas cargadas:
+    python -m modules.aggregates <season_id> [<season_id> ...]
+"""
+import argparse
+
+import pymysql as sql
+
+from modules.bulk_loader import bulk_insert
+from modules.database import get_pool, pooled
+from modules.staging import schema_dtypes
+
+# Columnas de player_season_stats que no son totales
+SEASON_KEY_COLUMNS = ['player_id', 'team_id', 'season_id', 'matches']
+
+RESULT_COLUMNS = ['team_id', 'match_id', 'season_id', 'matchday_id', 'home', 'goals_for', 'goals_against', 'points']
+
+_total_columns = None
+
+
+def total_columns():
+    """
+    Estadísticas que player_season_stats suma, según schema.sql.
+    """
+    global _total_columns
+    if _total_columns is None:
+        _total_columns = [column for column in schema_dtypes()['player_season_stats'] if column not in SEASON_KEY_COLUMNS]
+    return _total_columns
+
+
+def refresh_player_totals(connection, season_id, player_ids):
+    """
+    Recalcula desde player_stats los totales de temporada de una lista de jugadores.
+    No hace commit: se llama dentro de la transacción que insertó o borró sus estadísticas.
+
+    player_stats no tiene clave foránea a player (está particionada), pero player_season_stats sí:
+    las estadísticas de un (player_id, team_id) que no está en player no se suman y se listan,
+    en lugar de que la clave foránea haga fallar la transacción completa.
+
+    Parámetros:
+    - connection: Conexión a la base de datos.
+    - season_id (int): Temporada.
+    - player_ids (iterable): Jugadores a recalcular. Los que ya no tienen estadísticas se eliminan.
+
+    Retorno:
+    - list: (player_id, team_id) con estadísticas que se omitieron por no estar en player.
+    """
+    player_ids = sorted({int(player_id) for player_id in player_ids})
+    if not player_ids:
+        return []
+    columns = total_columns()
+    placeholders = ", ".join(["%s"] * len(player_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT s.player_id, s.team_id FROM player_stats s "
+            "LEFT JOIN player p ON p.player_id = s.player_id AND p.team_id = s.team_id "
+            f"WHERE s.season_id = %s AND s.player_id IN ({placeholders}) AND p.player_id IS NULL "
+            "GROUP BY s.player_id, s.team_id",
+            [season_id] + player_ids
+        )
+        omitidos = list(cursor.fetchall())
+        cursor.execute(f"DELETE FROM player_season_stats WHERE season_id = %s AND player_id IN ({placeholders})",
+                       [season_id] + player_ids)
+        cursor.execute(
+            f"INSERT INTO player_season_stats ({', '.join(SEASON_KEY_COLUMNS + columns)}) "
+            f"SELECT s.player_id, s.team_id, s.season_id, COUNT(*), {', '.join(f'SUM(s.{column})' for column in columns)} "
+            "FROM player_stats s JOIN player p ON p.player_id = s.player_id AND p.team_id = s.team_id "
+            f"WHERE s.season_id = %s AND s.player_id IN ({placeholders}) "
+            "GROUP BY s.player_id, s.team_id, s.season_id",
+            [season_id] + player_ids
+        )
+    if omitidos:
+        print(f"Temporada {season_id}: {len(omitidos)} jugadores con estadísticas que no están en player "
+              f"no se suman en player_season_stats: {omitidos[:10]}")
+    return omitidos
+
+
+def result_rows(dataframe):
+    """
+    Filas de team_matchday_results de un DataFrame de football_game: una por equipo y partido.
+    """
+    rows = []
+    for match in dataframe[['match_id', 'season_id', 'matchday_id', 'home_team_id', 'away_team_id',
+                            'home_score', 'away_score']].itertuples(index=False):
+        match_id, season_id, matchday_id, home_team_id, away_team_id, home_score, away_score = (int(value) for value in match)
+        for team_id, home, goals_for, goals_against in ((home_team_id, 1, home_score, away_score),
+                                                         (away_team_id, 0, away_score, home_score)):
+            points = 3 if goals_for > goals_against else 1 if goals_for == goals_against else 0
+            rows.append([team_id, match_id, season_id, matchday_id, home, goals_for, goals_against, points])
+    return rows
+
+
+def upsert_results(connection, dataframe, mode='insert', batch_size=1000):
+    """
+    Inserta o actualiza en team_matchday_results los partidos de un DataFrame de football_game.
+    No hace commit.
+
+    Retorno:
+    - dict: Reporte de bulk_insert.
+    """
+    return bulk_insert(connection, 'team_matchday_results', RESULT_COLUMNS, result_rows(dataframe), mode, batch_size,
+                       key_columns=['team_id', 'match_id'], on_duplicate=RESULT_COLUMNS[2:])
+
+
+def affected_players(connection, match_ids, season_id=None):
+    """
+    Devuelve {season_id: set de player_id} con estadísticas en una lista de partidos,
+    para recalcular sus totales después de borrarlos. Con season_id solo se lee su partición.
+    """
+    match_ids = list(match_ids)
+    affected = {}
+    if not match_ids:
+        return affected
+    query = f"SELECT DISTINCT season_id, player_id FROM player_stats WHERE match_id IN ({', '.join(['%s'] * len(match_ids))})"
+    if season_id is not None:
+        query += " AND season_id = %s"
+    with connection.cursor() as cursor:
+        cursor.execute(query, match_ids + ([season_id] if season_id is not None else []))
+        for season_id, player_id in cursor.fetchall():
+            affected.setdefault(season_id, set()).add(player_id)
+    return affected
+
+
+@pooled
+def rebuild_season(connection, season_id):
+    """
+    Vuelve a calcular los dos agregados de una temporada completa desde player_stats y football_game.
+    """
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT DISTINCT player_id FROM player_stats WHERE season_id = %s", (season_id,))
+            player_ids = [row[0] for row in cursor.fetchall()]
+            cursor.execute("DELETE FROM player_season_stats WHERE season_id = %s", (season_id,))
+            cursor.execute("DELETE FROM team_matchday_results WHERE season_id = %s", (season_id,))
+            cursor.execute(
+                f"INSERT INTO team_matchday_results ({', '.join(RESULT_COLUMNS)}) "
+                "SELECT home_team_id, match_id, season_id, matchday_id, 1, home_score, away_score, "
+                "CASE WHEN home_score > away_score THEN 3 WHEN home_score = away_score THEN 1 ELSE 0 END "
+                "FROM football_game WHERE season_id = %s "
+                "UNION ALL "
+                "SELECT away_team_id, match_id, season_id, matchday_id, 0, away_score, home_score, "
+                "CASE WHEN away_score > home_score THEN 3 WHEN away_score = home_score THEN 1 ELSE 0 END "
+                "FROM football_game WHERE season_id = %s",
+                (season_id, season_id)
+            )
+        refresh_player_totals(connection, season_id, player_ids)
+        connection.commit()
+        print(f"Agregados de la temporada {season_id} recalculados: {len(player_ids)} jugadores.")
+    except sql.MySQLError as e:
+        connection.rollback()
+        print(f"Error al recalcular los agregados de la temporada {season_id}:", e)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Llena player_season_stats y team_matchday_results de temporadas ya cargadas.")
+    parser.add_argument("season_id", type=int, nargs="+")
+    args = parser.parse_args()
+    for season_id in args.season_id:
+        rebuild_season(get_pool(), season_id)
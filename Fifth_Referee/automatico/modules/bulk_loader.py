@@ -0,0 +1,246 @@
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+# Número máximo de diagnósticos por fila que se imprimen en el reporte
+MAX_DIAGNOSTICOS = 10
+
+MODES = ('insert', 'load_data')
+
+# Avisos de LOAD DATA que cambian los datos de la fila (fila recortada, NULL en columna NOT NULL,
+# valor fuera de rango, valor truncado, valor incorrecto): con INSERT serían errores
+DATA_WARNING_CODES = {1262, 1263, 1264, 1265, 1366}
+
+# Fila duplicada omitida por LOAD DATA LOCAL al cargar directo en la tabla
+DUPLICATE_WARNING_CODE = 1062
+
+
+def frame_rows(dataframe, columns):
+    """
+    Convierte las columnas del DataFrame en filas de valores de Python, con None en lugar de NaN.
+    """
+    data = dataframe[columns].astype(object)
+    return data.where(pd.notnull(data), None).values.tolist()
+
+
+def _upsert_clause(columns, on_duplicate):
+    """
+    Cláusula ON DUPLICATE KEY UPDATE según on_duplicate (ver bulk_insert).
+    Con 'ignore' la actualización no cambia nada, así que las filas existentes quedan igual
+    pero los demás errores (por ejemplo de claves foráneas) no se ocultan como con INSERT IGNORE.
+    """
+    if on_duplicate is None:
+        return ""
+    if on_duplicate == 'ignore':
+        return f" ON DUPLICATE KEY UPDATE {columns[0]} = {columns[0]}"
+    return " ON DUPLICATE KEY UPDATE " + ", ".join(f"{column} = VALUES({column})" for column in on_duplicate)
+
+
+def _count(cursor, rows, on_duplicate):
+    """
+    Separa las filas de una sentencia en nuevas, actualizadas y sin cambios a partir de
+    cursor.rowcount y el número de filas enviadas.
+
+    Con ON DUPLICATE KEY UPDATE el servidor cuenta 1 por fila nueva, 2 por fila actualizada y 0 por
+    fila que ya tenía esos valores. Con 'ignore' la actualización nunca cambia nada, así que la
+    cuenta es exacta; con una lista de columnas rowcount no alcanza para separar las tres, y se
+    supone que no hay filas sin cambios si cuenta más que las filas enviadas y ninguna actualizada si no.
+
+    Retorno:
+    - list: [nuevas, actualizadas, sin cambios].
+    """
+    if on_duplicate is None:
+        return [rows, 0, 0]
+    affected = max(0, cursor.rowcount)
+    if on_duplicate == 'ignore' or affected <= rows:
+        return [affected, 0, rows - affected]
+    updated = min(rows, affected - rows)
+    return [rows - updated, updated, 0]
+
+
+def _insert_rows(cursor, table, columns, rows, batch_size, on_duplicate=None):
+    """
+    Inserta las filas en lotes de un solo INSERT con varias filas. Si un lote falla se
+    reintenta fila por fila para saber cuáles fallan.
+
+    Retorno:
+    - tuple: ([nuevas, actualizadas, sin cambios], lista de (índice, fila, error)).
+    """
+    placeholder = f"({', '.join(['%s'] * len(columns))})"
+    upsert = _upsert_clause(columns, on_duplicate)
+    counts = [0, 0, 0]
+    errores = []
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([placeholder] * len(batch))}{upsert}"
+        try:
+            cursor.execute(query, [value for row in batch for value in row])
+        except Exception:
+            # El lote falló completo: se repite fila por fila para obtener el diagnóstico
+            query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES {placeholder}{upsert}"
+            for offset, row in enumerate(batch):
+                try:
+                    cursor.execute(query, row)
+                except Exception as e:
+                    errores.append((start + offset, row, e))
+                    continue
+                counts = [a + b for a, b in zip(counts, _count(cursor, 1, on_duplicate))]
+            continue
+        counts = [a + b for a, b in zip(counts, _count(cursor, len(batch), on_duplicate))]
+    return counts, errores
+
+
+def _csv_value(value):
+    """
+    Valor de una celda del CSV de LOAD DATA: NULL sin comillas para None y los textos entre comillas dobles.
+    """
+    if value is None:
+        return "NULL"
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    return str(value)
+
+
+def _load_data(cursor, table, columns, rows, on_duplicate=None):
+    """
+    Escribe las filas en un CSV temporal y las carga con LOAD DATA LOCAL INFILE.
+    Los avisos del servidor (SHOW WARNINGS) indican la fila de cada problema; con LOCAL las
+    filas duplicadas se omiten con un aviso en lugar de detener la carga. Son errores de la fila
+    los de nivel Error y los avisos que cambian o descartan datos (DATA_WARNING_CODES y, al cargar
+    directo en la tabla, los duplicados omitidos), igual que fallarían con INSERT; los demás
+    Warning y Note se devuelven aparte. El servidor guarda como máximo max_error_count avisos
+    (64 por defecto).
+
+    Con on_duplicate el CSV se carga en una tabla temporal y se pasa a la tabla con
+    INSERT ... SELECT ... ON DUPLICATE KEY UPDATE, porque REPLACE borraría en cascada las filas hijas.
+
+    Retorno:
+    - tuple: ([nuevas, actualizadas, sin cambios], errores y avisos, cada uno una lista de (índice, fila, mensaje)).
+    """
+    fd, csv_path = tempfile.mkstemp(suffix=".csv")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as archivo:
+            for row in rows:
+                archivo.write(",".join(_csv_value(value) for value in row) + "\n")
+        target = table if on_duplicate is None else f"_carga_{table}"
+        if on_duplicate is not None:
+            # Sin claves ni particiones, solo las columnas a cargar
+            cursor.execute(f"CREATE TEMPORARY TABLE {target} SELECT {', '.join(columns)} FROM {table} LIMIT 0")
+        query = (
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE {target} "
+            "CHARACTER SET utf8mb4 FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+            f"LINES TERMINATED BY '\\n' ({', '.join(columns)})"
+        )
+        cargadas = cursor.execute(query, (csv_path,))
+        cursor.execute("SHOW COUNT(*) WARNINGS")
+        total_avisos = cursor.fetchone()[0]
+        cursor.execute("SHOW WARNINGS")
+        errores = []
+        avisos = []
+        for level, code, message in cursor.fetchall():
+            # Los mensajes de LOAD DATA terminan en "at row N" (N empieza en 1)
+            index = None
+            if " at row " in message:
+                try:
+                    index = int(message.rsplit(" at row ", 1)[1]) - 1
+                except ValueError:
+                    pass
+            row = rows[index] if index is not None and 0 <= index < len(rows) else None
+            es_error = (level == 'Error' or code in DATA_WARNING_CODES
+                        or (on_duplicate is None and code == DUPLICATE_WARNING_CODE))
+            (errores if es_error else avisos).append((index, row, f"{level} {code}: {message}"))
+        revisados = len(errores) + len(avisos)
+        if total_avisos > revisados:
+            # Los avisos que no guardó el servidor pueden ser errores: no se da la carga por buena
+            errores.append((None, None, f"{total_avisos - revisados} avisos más que el servidor no guardó "
+                                        "(max_error_count); no se puede saber qué filas cambiaron"))
+        if on_duplicate is None:
+            return [cargadas, 0, 0], errores, avisos
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) SELECT {', '.join(columns)} FROM {target}"
+            f"{_upsert_clause(columns, on_duplicate)}"
+        )
+        return _count(cursor, cargadas, on_duplicate), errores, avisos
+    finally:
+        os.remove(csv_path)
+        if on_duplicate is not None:
+            cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS _carga_{table}")
+
+
+def bulk_insert(connection, table, columns, rows, mode='insert', batch_size=1000, key_columns=None, on_duplicate=None):
+    """
+    Carga filas en una tabla con INSERT de varias filas por lote o con LOAD DATA LOCAL INFILE,
+    y reporta filas por segundo, filas nuevas y actualizadas y los errores de cada fila.
+
+    Parámetros:
+    - connection: Conexión pymysql. Para LOAD DATA debe abrirse con local_infile=True.
+    - table (str): Tabla de destino.
+    - columns (list): Columnas en el orden de cada fila.
+    - rows (list): Filas a cargar (listas de valores de Python).
+    - mode (str): 'insert' (lotes de INSERT) o 'load_data' (CSV temporal y LOAD DATA LOCAL INFILE).
+      Si LOAD DATA falla (por ejemplo, no está permitido en el servidor) se usa 'insert'.
+    - batch_size (int): Filas por INSERT en el modo 'insert'.
+    - key_columns (list): Columnas que identifican la fila en los diagnósticos.
+    - on_duplicate: Qué hacer con las filas cuya clave ya existe. None: error de clave duplicada;
+      'ignore': se dejan como están; lista de columnas: se actualizan esas columnas.
+      'ignore' no usa INSERT IGNORE a propósito: emite ON DUPLICATE KEY UPDATE sobre la primera
+      columna consigo misma, que no modifica la fila existente, para que los errores que no son
+      de clave duplicada (claves foráneas, valores inválidos) sigan apareciendo en errors.
+
+    Retorno:
+    - dict: rows, loaded, new, updated, unchanged, errors (lista de diagnósticos), warnings
+      (avisos de LOAD DATA que no son errores), seconds, rows_per_sec y mode. No hace commit: lo decide quien llama.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Modo de carga desconocido: {mode!r} (se admite {' o '.join(MODES)}).")
+    inicio = time.perf_counter()
+    cursor = connection.cursor()
+    avisos = []
+    try:
+        if mode == 'load_data':
+            try:
+                counts, errores, avisos = _load_data(cursor, table, columns, rows, on_duplicate)
+            except Exception as e:
+                print(f"LOAD DATA LOCAL INFILE falló ({e}); se usan INSERT por lotes.")
+                mode = 'insert'
+        if mode == 'insert':
+            counts, errores = _insert_rows(cursor, table, columns, rows, batch_size, on_duplicate)
+    finally:
+        cursor.close()
+    segundos = time.perf_counter() - inicio
+
+    key_columns = key_columns or columns[:1]
+
+    def diagnosticar(problemas):
+        diagnosticos = []
+        for index, row, error in problemas:
+            key = {column: row[columns.index(column)] for column in key_columns} if row is not None else None
+            diagnosticos.append({'row': index, 'key': key, 'error': str(error)})
+        return diagnosticos
+
+    diagnosticos = diagnosticar(errores)
+    advertencias = diagnosticar(avisos)
+
+    new, updated, unchanged = counts
+    report = {
+        'rows': len(rows),
+        'loaded': new + updated + unchanged,
+        'new': new,
+        'updated': updated,
+        'unchanged': unchanged,
+        'errors': diagnosticos,
+        'warnings': advertencias,
+        'seconds': segundos,
+        'rows_per_sec': len(rows) / segundos if segundos else 0.0,
+        'mode': mode,
+    }
+    print(f"{table}: {len(rows)} filas en {segundos:.2f} s ({report['rows_per_sec']:.0f} filas/s, {mode}): "
+          f"{new} nuevas, {updated} actualizadas, {unchanged} sin cambios, {len(diagnosticos)} errores"
+          + (f", {len(advertencias)} avisos" if advertencias else ""))
+    for diagnostico in diagnosticos[:MAX_DIAGNOSTICOS]:
+        print(f"  fila {diagnostico['row']} {diagnostico['key']}: {diagnostico['error']}")
+    if len(diagnosticos) > MAX_DIAGNOSTICOS:
+        print(f"  ... y {len(diagnosticos) - MAX_DIAGNOSTICOS} errores más")
+    return report
@@ -0,0 +1,293 @@
+"""
+Almacenamiento compacto de match_data: un bundle comprimido por jornada.
+
+Cada jornada se guarda en match_data/<jornada>.ndjson.gz. Cada partido es un miembro gzip
+independiente con una línea JSON {"match": <n>, "data": {...}}, así que el bundle completo
+se puede leer como un NDJSON comprimido normal. match_data/<jornada>.idx.json guarda el
+offset y la longitud de cada miembro para leer un solo partido sin descomprimir el resto.
+
+Los partidos se siguen nombrando con su ruta lógica match_data/<jornada>/<n>.json, exista o
+no el archivo suelto, de modo que el manifest y los constructores no dependen del formato.
+
+Uso:
+    python -m modules.bundle /home/sp3767/Documents/football_data/<competición>/<temporada>/match_data
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import zlib
+
+BUNDLE_SUFFIX = ".ndjson.gz"
+INDEX_SUFFIX = ".idx.json"
+
+# Índices ya leídos por ruta del bundle, junto con el mtime del índice
+_indexes = {}
+
+
+def bundle_path(folder_path, matchday):
+    return os.path.join(folder_path, f"{matchday}{BUNDLE_SUFFIX}")
+
+
+def index_path(bundle):
+    return bundle[:-len(BUNDLE_SUFFIX)] + INDEX_SUFFIX
+
+
+def _locate(file_path):
+    """
+    Devuelve (ruta del bundle, número de partido) de una ruta lógica match_data/<jornada>/<n>.json.
+    """
+    folder = os.path.dirname(file_path)
+    number = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(os.path.dirname(folder), os.path.basename(folder) + BUNDLE_SUFFIX), number
+
+
+def _members(bundle):
+    """
+    Recorre los miembros gzip de un bundle y devuelve (número, offset, longitud, datos) de cada uno.
+    """
+    with open(bundle, 'rb') as f:
+        raw = f.read()
+    offset = 0
+    while offset < len(raw):
+        decompressor = zlib.decompressobj(wbits=31)
+        line = decompressor.decompress(raw[offset:])
+        length = len(raw) - offset - len(decompressor.unused_data)
+        member = json.loads(line)
+        yield str(member['match']), offset, length, member['data']
+        offset += length
+
+
+def rebuild_index(bundle):
+    """
+    Reconstruye el índice de un bundle recorriendo sus miembros.
+    """
+    members = {number: [offset, length] for number, offset, length, _ in _members(bundle)}
+    index = {'size': os.path.getsize(bundle), 'members': members}
+    _write_json(index, index_path(bundle))
+    return index
+
+
+def read_index(bundle):
+    """
+    Devuelve {número: [offset, longitud]} del bundle. Si el índice falta o no corresponde
+    al tamaño del bundle (escritura interrumpida), se reconstruye.
+    """
+    path = index_path(bundle)
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        mtime_ns = None
+    cached = _indexes.get(bundle)
+    if cached and mtime_ns is not None and cached[0] == mtime_ns and cached[1]['size'] == os.path.getsize(bundle):
+        return cached[1]['members']
+
+    index = None
+    if mtime_ns is not None:
+        with open(path, 'r') as f:
+            index = json.load(f)
+    if index is None or index.get('size') != os.path.getsize(bundle):
+        index = rebuild_index(bundle)
+        mtime_ns = os.stat(path).st_mtime_ns
+    _indexes[bundle] = (mtime_ns, index)
+    return index['members']
+
+
+def _member_bytes(bundle, number):
+    members = read_index(bundle)
+    if number not in members:
+        return None
+    offset, length = members[number]
+    with open(bundle, 'rb') as f:
+        f.seek(offset)
+        return f.read(length)
+
+
+def bundle_members(bundle):
+    """
+    Rutas lógicas de los partidos guardados en un bundle, en orden de partido.
+    """
+    folder_path = os.path.dirname(bundle)
+    matchday = os.path.basename(bundle)[:-len(BUNDLE_SUFFIX)]
+    numbers = sorted(read_index(bundle), key=lambda n: int(n) if n.isdigit() else 0)
+    return [os.path.join(folder_path, matchday, f"{number}.json") for number in numbers]
+
+
+def read_match(file_path):
+    """
+    Lee un partido por su ruta lógica, desde el archivo suelto o desde el bundle de su jornada.
+    """
+    if os.path.exists(file_path):
+        with open(file_path, 'r') as f:
+            return json.load(f)
+    bundle, number = _locate(file_path)
+    chunk = _member_bytes(bundle, number) if os.path.exists(bundle) else None
+    if chunk is None:
+        raise FileNotFoundError(f"No existe el partido {file_path}")
+    return json.loads(gzip.decompress(chunk))['data']
+
+
+def match_stat(file_path):
+    """
+    Devuelve (tamaño, mtime_ns) del partido. En un bundle son la longitud del miembro y el mtime del bundle.
+    """
+    if os.path.exists(file_path):
+        stat = os.stat(file_path)
+        return stat.st_size, stat.st_mtime_ns
+    bundle, number = _locate(file_path)
+    offset, length = read_index(bundle)[number]
+    return length, os.stat(bundle).st_mtime_ns
+
+
+def match_hash(file_path):
+    """
+    SHA1 del contenido guardado del partido (el archivo suelto o su miembro comprimido).
+    """
+    sha1 = hashlib.sha1()
+    if os.path.exists(file_path):
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha1.update(chunk)
+    else:
+        bundle, number = _locate(file_path)
+        sha1.update(_member_bytes(bundle, number))
+    return sha1.hexdigest()
+
+
+def matchday_of(name):
+    """
+    Jornada de una entrada de match_data ('3' o '3.ndjson.gz'), o None si no es una jornada.
+    """
+    if name.endswith(BUNDLE_SUFFIX):
+        name = name[:-len(BUNDLE_SUFFIX)]
+    return int(name) if name.isdigit() else None
+
+
+def match_files(folder_path):
+    """
+    Rutas lógicas de todos los partidos de match_data, sueltos o en bundles.
+    Si un partido está en los dos formatos, cuenta una sola vez (el archivo suelto es el más nuevo).
+    """
+    selected = []
+    seen = set()
+    # La carpeta "3" se ordena antes que "3.ndjson.gz", así los sueltos se ven primero
+    for name in sorted(os.listdir(folder_path)):
+        full_path = os.path.join(folder_path, name)
+        if matchday_of(name) is None:
+            continue
+        if os.path.isdir(full_path):
+            for file_name in os.listdir(full_path):
+                if file_name.endswith('.json'):
+                    selected.append(os.path.join(full_path, file_name))
+                    seen.add(selected[-1])
+        elif name.endswith(BUNDLE_SUFFIX):
+            selected.extend(file_path for file_path in bundle_members(full_path) if file_path not in seen)
+    return selected
+
+
+def _write_json(data, output_file):
+    tmp_path = f"{output_file}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, output_file)
+
+
+def pack_matchday(folder_path, matchday, manifest=None):
+    """
+    Mueve los archivos sueltos de match_data/<jornada>/ al bundle de la jornada, conservando
+    los partidos que ya estaban en él. Si se da un manifest, las entradas que no cambiaron
+    se actualizan al nuevo contenido para que no se vuelvan a cargar.
+
+    Retorno:
+    - int: Número de archivos sueltos que se movieron al bundle.
+    """
+    folder = os.path.join(folder_path, str(matchday))
+    bundle = bundle_path(folder_path, matchday)
+    loose = []
+    if os.path.isdir(folder):
+        loose = [name for name in os.listdir(folder) if name.endswith('.json')]
+    if not loose:
+        return 0
+
+    members = {}
+    if os.path.exists(bundle):
+        with open(bundle, 'rb') as f:
+            for number, (offset, length) in read_index(bundle).items():
+                f.seek(offset)
+                members[number] = f.read(length)
+
+    unchanged = set()
+    for file_name in loose:
+        file_path = os.path.join(folder, file_name)
+        number = os.path.splitext(file_name)[0]
+        if manifest is not None:
+            entry = manifest.entry(file_path)
+            if entry and entry['sha1'] == match_hash(file_path):
+                unchanged.add(file_path)
+        with open(file_path, 'r') as f:
+            data = json.load(f)
+        line = json.dumps({'match': int(number) if number.isdigit() else number, 'data': data}) + "\n"
+        members[number] = gzip.compress(line.encode('utf-8'), mtime=0)
+
+    tmp_path = f"{bundle}.tmp"
+    index = {'members': {}}
+    offset = 0
+    with open(tmp_path, 'wb') as f:
+        for number in sorted(members, key=lambda n: int(n) if n.isdigit() else 0):
+            f.write(members[number])
+            index['members'][number] = [offset, len(members[number])]
+            offset += len(members[number])
+    index['size'] = offset
+    os.replace(tmp_path, bundle)
+    _write_json(index, index_path(bundle))
+    _indexes.pop(bundle, None)
+
+    for file_name in loose:
+        os.remove(os.path.join(folder, file_name))
+    if not os.listdir(folder):
+        os.rmdir(folder)
+
+    if manifest is not None:
+        for file_path in unchanged:
+            entry = manifest.entry(file_path)
+            entry['sha1'] = match_hash(file_path)
+            entry['size'], entry['mtime_ns'] = match_stat(file_path)
+    return len(loose)
+
+
+def migrate(folder_path, manifest_path=None):
+    """
+    Convierte todas las carpetas de jornada de match_data en bundles.
+
+    Parámetros:
+    - folder_path (str): Carpeta match_data de una temporada.
+    - manifest_path (str): manifest.json de la temporada; por defecto el de la carpeta superior si existe.
+    """
+    from modules.manifest import IngestManifest
+
+    if manifest_path is None:
+        manifest_path = os.path.join(os.path.dirname(folder_path.rstrip('/')), "manifest.json")
+    manifest = IngestManifest(manifest_path) if os.path.exists(manifest_path) else None
+
+    antes = sum(len(files) for _, _, files in os.walk(folder_path))
+    movidos = 0
+    for name in sorted(os.listdir(folder_path), key=lambda n: matchday_of(n) or 0):
+        if os.path.isdir(os.path.join(folder_path, name)) and name.isdigit():
+            try:
+                movidos += pack_matchday(folder_path, int(name), manifest)
+            except Exception as e:
+                print(f"Error migrando la jornada {name}: {e}")
+    if manifest is not None:
+        manifest.save()
+    despues = sum(len(files) for _, _, files in os.walk(folder_path))
+    print(f"{movidos} partidos migrados a bundles. Archivos en match_data: {antes} -> {despues}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convierte match_data por archivo a bundles por jornada.")
+    parser.add_argument("folder_path", nargs="+", help="Carpetas match_data a migrar.")
+    parser.add_argument("--manifest", default=None, help="Ruta del manifest.json de la temporada.")
+    args = parser.parse_args()
+    for folder_path in args.folder_path:
+        migrate(folder_path, args.manifest)
@@ -0,0 +1,185 @@
+from threading import Lock
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+class CacheMiss(KeyError):
+    """Se lanza en modo offline cuando una respuesta no está en la caché."""
+
+
+def normalize_url(url):
+    """
+    Normaliza una URL de partido para usarla como clave: quita espacios y saltos de línea,
+    pasa esquema y host a minúsculas, quita la barra final y ordena los parámetros.
+    """
+    parts = urlparse(url.strip())
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    fragment = urlencode(sorted(parse_qsl(parts.fragment, keep_blank_values=True))) or parts.fragment
+    return urlunparse((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), parts.params, query, fragment))
+
+
+def is_finished(match):
+    """
+    Indica si una respuesta de get_match_data corresponde a un partido terminado.
+    """
+    if not isinstance(match, dict):
+        return False
+    if match.get('statusGroup') == 4:
+        return True
+    return str(match.get('statusText', '')).lower() in ('ended', 'finalizado', 'final', 'ft')
+
+
+class ResponseCache:
+    """
+    Caché en disco de respuestas del scraper, comprimidas con gzip.
+
+    Cada respuesta se guarda en <folder>/<tipo>/<sha1 de la URL normalizada>.json.gz.
+    Los partidos terminados no expiran; los demás expiran tras `ttl` segundos.
+    Cuando el tamaño total supera `max_bytes` se eliminan las entradas menos usadas
+    (la fecha de modificación del archivo se actualiza en cada acierto).
+
+    Parámetros:
+    - folder (str): Carpeta de la caché.
+    - max_bytes (int): Tamaño máximo en disco.
+    - ttl (int): Segundos de validez de los partidos no terminados.
+    - offline (bool): Si es True, nunca se llama a la red y un fallo lanza CacheMiss.
+    """
+    def __init__(self, folder, max_bytes=512 * 1024 * 1024, ttl=3600, offline=False):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.offline = offline
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+        self._lock = Lock()
+        os.makedirs(folder, exist_ok=True)
+        self._size = sum(os.path.getsize(path) for path in self._entries())
+
+    def _entries(self):
+        for root, _, files in os.walk(self.folder):
+            for file_name in files:
+                if file_name.endswith('.json.gz'):
+                    yield os.path.join(root, file_name)
+
+    def _path(self, kind, url):
+        key = hashlib.sha1(normalize_url(url).encode('utf-8')).hexdigest()
+        return os.path.join(self.folder, kind, f"{key}.json.gz")
+
+    def _load(self, path):
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def finished(self, url):
+        """
+        Indica si el partido de la URL ya está guardado como terminado, sin contar acierto ni fallo.
+        """
+        entry = self._load(self._path('match_data', url))
+        return bool(entry and entry['finished'])
+
+    def get(self, kind, url):
+        """
+        Devuelve la respuesta guardada o None si no existe o expiró.
+        """
+        path = self._path(kind, url)
+        entry = self._load(path)
+        if entry is None:
+            with self._lock:
+                self.stats['misses'] += 1
+            return None
+
+        if not entry['finished'] and time.time() - entry['stored_at'] > self.ttl:
+            with self._lock:
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.stats['hits'] += 1
+        return entry['data']
+
+    def put(self, kind, url, data, finished):
+        path = self._path(kind, url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {'url': normalize_url(url), 'finished': finished, 'stored_at': time.time(), 'data': data}
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(entry, f)
+        # El tamaño anterior y el reemplazo van juntos bajo el lock: dos put de la misma URL
+        # en paralelo descontarían el mismo archivo anterior
+        with self._lock:
+            try:
+                old_size = os.path.getsize(path)
+            except FileNotFoundError:
+                old_size = 0
+            os.replace(tmp_path, path)
+            self._size += os.path.getsize(path) - old_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Eliminar las entradas menos usadas hasta quedar en el 90% del límite.
+        # Cada archivo se consulta una sola vez; los que otro proceso ya borró se saltan
+        entries = []
+        for path in self._entries():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        for _, size, path in entries:
+            if self._size <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            self._size -= size
+            self.stats['evictions'] += 1
+
+    def report(self):
+        total = self.stats['hits'] + self.stats['misses']
+        ratio = self.stats['hits'] / total * 100 if total else 0
+        print(f"Caché: {self.stats['hits']} aciertos, {self.stats['misses']} fallos ({ratio:.1f}% aciertos), "
+              f"{self.stats['expired']} expirados, {self.stats['evictions']} desalojados, {self._size / 1024 ** 2:.1f} MB")
+
+
+class CachedScraper:
+    """
+    Envuelve un scraper de 365scores y pasa get_match_data y get_players_info por la caché.
+    Con una caché offline sirve como reproductor de respuestas grabadas para pruebas sin red.
+    """
+    def __init__(self, scraper, cache):
+        self.scraper = scraper
+        self.cache = cache
+
+    def _fetch(self, kind, url, finished):
+        data = self.cache.get(kind, url)
+        if data is not None:
+            return data
+        if self.cache.offline:
+            raise CacheMiss(normalize_url(url))
+        data = getattr(self.scraper, f"get_{kind}")(url)
+        self.cache.put(kind, url, data, finished(data))
+        return data
+
+    def get_match_data(self, url):
+        return self._fetch('match_data', url, is_finished)
+
+    def get_players_info(self, url):
+        # La respuesta de jugadores no trae el estado; se usa el del partido si ya está en caché
+        return self._fetch('players_info', url, lambda _: self.cache.finished(url))
+
+    def __getattr__(self, name):
+        return getattr(self.scraper, name)
@@ -1,4 +1,6 @@
+from collections.abc import MutableMapping
 from math import pi
+import numpy as np
 import pandas as pd
 from IPython.display import display, HTML
 from bokeh.io import output_notebook, show
@@ -17,6 +19,26 @@ from bokeh.palettes import Category20, Category20c
 from bokeh.plotting import figure
 from bokeh.transform import cumsum
 
+from modules.match_store import MATCH_COLUMNS, MatchStore, MatchView
+from modules.standings import Standings
+from modules.stats_cache import season_stats
+
+# Estadísticas básicas de cada jugador (totales de player_season_stats), en el orden de las columnas de PlayerStats
+PLAYER_STAT_COLUMNS = ['goles', 'asistencias', 'pases_claves', 'goles_recibidos',
+                       'faltas_cometidas', 'big_chances_scored', 'chances_perdidas']
+STAT_INDEX = {column: i for i, column in enumerate(PLAYER_STAT_COLUMNS)}
+
+# Nombre de cada estadística en los gráficos de mejores jugadores
+STAT_LABELS = {
+    'goles': 'Goals',
+    'asistencias': 'Assists',
+    'pases_claves': 'Key_Passes',
+    'goles_recibidos': 'Goals_Conceded',
+    'faltas_cometidas': 'Fouls_Committed',
+    'big_chances_scored': 'Big_Chances_Scored',
+    'chances_perdidas': 'Missed_Chances',
+}
+
 
 class Season:
     def __init__(self, season_id, season_name, competition_id, competition_name):
@@ -25,6 +47,15 @@ class Season:
         self.competition_id = competition_id
         self.competition_name = competition_name
         self.teams = []
+        self.matchday_results = None
+        self.standings = None  # Standings de la temporada, se construye al pedir la primera tabla
+        # Índices para buscar sin recorrer las listas; se mantienen en add_team, add_player y set_match_store
+        self.teams_by_id = {}  # {team_id: Team}
+        self.players_by_key = {}  # {(player_id, team_id): Player}
+        self.matches_by_matchday = {}  # {matchday_id: posiciones en match_store}
+        self.matches_by_pair = {}  # {(team_id menor, team_id mayor): posiciones en match_store}
+        self.player_stats = PlayerStats()  # Estadísticas básicas de todos los jugadores; cada Player es una fila
+        self.set_match_store(MatchStore(season_id=season_id))  # Partidos por columnas; Team.matches es una vista
 
     def load_teams_and_players(self, connection):
         """
@@ -44,37 +75,28 @@ class Season:
         
         teams_dict = {team_id: (team_name, stadium, city) for team_id, team_name, stadium, city in teams_data}            # Obtener jugadores y estadísticas básicas (actualizado)
         
+        # Los totales de la temporada ya están sumados en player_season_stats (se mantienen al insertar)
         query_players = """
         SELECT p.player_id, p.team_id, p.player_name, p.jersey_number, p.season_id, p.position,
-            SUM(ps.goles) as goles, SUM(ps.asistencias) as asistencias,
-            SUM(ps.pases_claves) as pases_claves, SUM(ps.goles_recibidos) as goles_recibidos,
-            SUM(ps.faltas_cometidas) as faltas_cometidas, SUM(ps.big_chances_scored) as big_chances_scored,
-            SUM(ps.chances_perdidas) as chances_perdidas
+            t.goles, t.asistencias, t.pases_claves, t.goles_recibidos,
+            t.faltas_cometidas, t.big_chances_scored, t.chances_perdidas
         FROM player p
-        LEFT JOIN player_stats ps ON p.player_id = ps.player_id AND p.team_id = ps.team_id
+        LEFT JOIN player_season_stats t
+            ON t.player_id = p.player_id AND t.team_id = p.team_id AND t.season_id = p.season_id
         WHERE p.season_id = %s
-        GROUP BY p.player_id
         """
         cursor.execute(query_players, (self.season_id,))
         players_data = cursor.fetchall()
 
+        # Estadísticas básicas de todos los jugadores en una sola matriz (NULL si no jugó, se cuenta 0)
+        self.player_stats = PlayerStats(np.array(
+            [[value or 0 for value in player[6:]] for player in players_data], dtype='int32'
+        ).reshape(-1, len(PLAYER_STAT_COLUMNS)))
+
         # Crear un diccionario de jugadores por equipo
         players_by_team = {}
-        for player in players_data:
-            (player_id, team_id, player_name, jersey_number, season_id, position,
-            goles, asistencias, pases_claves, goles_recibidos,
-            faltas_cometidas, big_chances_scored, chances_perdidas) = player
-
-            # Convertir valores a tipos numéricos nativos
-            stats = {
-                'goles': int(goles or 0),
-                'asistencias': int(asistencias or 0),
-                'pases_claves': int(pases_claves or 0),
-                'goles_recibidos': int(goles_recibidos or 0),
-                'faltas_cometidas': int(faltas_cometidas or 0),
-                'big_chances_scored': int(big_chances_scored or 0),
-                'chances_perdidas': int(chances_perdidas or 0)
-            }
+        for row, player in enumerate(players_data):
+            player_id, team_id, player_name, jersey_number, season_id, position = player[:6]
             player_obj = Player(
                 player_id=player_id,
                 team_id=team_id,
@@ -82,7 +104,8 @@ class Season:
                 jersey_number=jersey_number,
                 season_id=season_id,
                 position=position,
-                stats=stats
+                table=self.player_stats,
+                row=row
             )
 
             # Añadir jugador al equipo correspondiente
@@ -102,13 +125,14 @@ class Season:
                 players=team_players,
                 season=self  # Referencia a la temporada actual
             )
-            self.teams.append(team_obj)
+            self.add_team(team_obj)
 
         cursor.close()
 
     def load_matches_and_assign_to_teams(self, connection):
         """
-        Carga los partidos de la temporada y los asigna a los equipos correspondientes.
+        Carga los partidos de la temporada en el almacén por columnas (self.match_store).
+        Los partidos de cada equipo (team.matches) se leen de ahí.
         """
         cursor = connection.cursor()
 
@@ -119,132 +143,213 @@ class Season:
         WHERE season_id = %s
         """
         cursor.execute(query_matches, (self.season_id,))
-        matches_data = cursor.fetchall()
-
-        # Crear un diccionario para mapear team_id a objetos Team
-        teams_by_id = {team.team_id: team for team in self.teams}
-
-        for match in matches_data:
-            (match_id, matchday_id, home_team_id, away_team_id,
-             home_score, away_score, duration) = match
-
-            # Crear objeto Match (asegurando que la clase Match está definida)
-            match_obj = Match(
-                match_id=match_id,
-                matchday_id=matchday_id,
-                home_team_id=home_team_id,
-                away_team_id=away_team_id,
-                home_score=home_score,
-                away_score=away_score,
-                duration=duration
-            )
+        self.set_match_store(MatchStore(cursor.fetchall(), self.season_id))
 
-            # Asignar el partido al equipo local
-            if home_team_id in teams_by_id:
-                teams_by_id[home_team_id].matches.append(match_obj)
+        cursor.close()
 
-            # Asignar el partido al equipo visitante
-            if away_team_id in teams_by_id:
-                teams_by_id[away_team_id].matches.append(match_obj)
+    def load_matchday_results(self, connection):
+        """
+        Carga de team_matchday_results el resultado de cada equipo en cada partido de la temporada.
 
+        Retorno:
+        - pd.DataFrame: team_id, match_id, matchday_id, home, goals_for, goals_against y points.
+        """
+        cursor = connection.cursor()
+        query = """
+        SELECT team_id, match_id, matchday_id, home, goals_for, goals_against, points
+        FROM team_matchday_results
+        WHERE season_id = %s
+        ORDER BY matchday_id
+        """
+        cursor.execute(query, (self.season_id,))
+        self.matchday_results = pd.DataFrame(
+            cursor.fetchall(),
+            columns=['team_id', 'match_id', 'matchday_id', 'home', 'goals_for', 'goals_against', 'points']
+        )
         cursor.close()
+        self.standings = None
+        return self.matchday_results
 
 ## Metodos.
 
-    def calculate_standings(self):
-        # Constantes para índices en las sublistas de equipos
-        TEAM_ID = 0
-        STANDING = 1
-        WINS = 2
-        LOSSES = 3
-        DRAWS = 4
-        GOALS = 5
-        GOALS_CONCEDED = 6
-
-        # Inicializar estructura temporal para las estadísticas de los equipos
-        team_stats = [
-            [team.team_id, 0, [0, 0], [0, 0], [0, 0], [0, 0], [0, 0], [0, 0]]  # [team_id, standing, wins, losses, draws, goals, goals_conceded]
-            for team in self.teams
-        ]
+    def add_team(self, team):
+        """
+        Añade un equipo (con sus jugadores) a la temporada y a los índices por team_id y por jugador.
+        """
+        team.season = self
+        self.teams.append(team)
+        self.teams_by_id[team.team_id] = team
+        # Los partidos que el equipo tenía antes de entrar a la temporada pasan al almacén
+        if team._matches:
+            self.add_matches([match_row(match) for match in team._matches])
+            team._matches = []
+        self._adopt(team.players)
+        for player in team.players:
+            self.players_by_key[(player.player_id, player.team_id)] = player
+        self.standings = None
+
+    def add_player(self, player):
+        """
+        Añade un jugador a su equipo (que ya debe estar en la temporada) y al índice de jugadores.
+        """
+        self._adopt([player])
+        self.teams_by_id[player.team_id].players.append(player)
+        self.players_by_key[(player.player_id, player.team_id)] = player
+
+    def _adopt(self, players):
+        # Los jugadores creados fuera de la temporada pasan sus filas a la matriz de la temporada, todas en una copia
+        players = [player for player in players if player.table is not self.player_stats]
+        if not players:
+            return
+        rows = self.player_stats.extend(player_stats_matrix(players))
+        for player, row in zip(players, rows):
+            player.table = self.player_stats
+            player.row = row
+
+    def set_match_store(self, store):
+        """
+        Reemplaza los partidos de la temporada y reconstruye los índices por jornada y por par de equipos.
+        """
+        self.match_store = store
+        self.standings = None
+        # El almacén está ordenado por jornada: cada jornada es un tramo contiguo
+        matchdays, starts = np.unique(store.matchday_id, return_index=True)
+        ends = list(starts[1:]) + [len(store)]
+        self.matches_by_matchday = {int(matchday_id): np.arange(start, end)
+                                    for matchday_id, start, end in zip(matchdays.tolist(), starts.tolist(), ends)}
+        home, away = store.team_ids[store.home], store.team_ids[store.away]
+        pairs = {}
+        for position, pair in enumerate(zip(np.minimum(home, away).tolist(), np.maximum(home, away).tolist())):
+            pairs.setdefault(pair, []).append(position)
+        self.matches_by_pair = {pair: np.array(positions) for pair, positions in pairs.items()}
+
+    def add_matches(self, rows):
+        """
+        Añade partidos (filas como las de football_game en load_matches_and_assign_to_teams) sin volver a leer la temporada.
+        Los match_id que ya están se omiten. Cada llamada reconstruye el almacén: conviene pasar todas las filas juntas.
+        """
+        rows = list(rows)
+        if rows:
+            nuevos = ~self.match_store.has_match([row[0] for row in rows])
+            rows = [row for row, nuevo in zip(rows, nuevos.tolist()) if nuevo]
+        if rows:
+            self.set_match_store(MatchStore.concat([self.match_store, MatchStore(rows, self.season_id)]))
+
+    def replace_team_matches(self, team_id, rows):
+        """
+        Reemplaza los partidos de un equipo (los de local y de visitante) por las filas dadas.
+        """
+        store = self.match_store
+        i = store.index.get(team_id)
+        keep = np.ones(len(store), dtype=bool) if i is None else (store.home != i) & (store.away != i)
+        self.set_match_store(store.take(np.flatnonzero(keep)))
+        self.add_matches(rows)
+
+    def detailed_stats(self, connection, per_match=False):
+        """
+        Estadísticas detalladas de todos los jugadores de la temporada, de la caché en memoria
+        (una consulta la primera vez; se invalida al insertar partidos o estadísticas).
 
-        # Crear un diccionario para optimizar la búsqueda de estadísticas
-        team_stats_dict = {team.team_id: stats for team, stats in zip(self.teams, team_stats)}
+        Parámetros:
+        - connection: Conexión (o pool) para la primera lectura.
+        - per_match (bool): Filas por partido (player_stats) en lugar de los totales.
 
-        # Recorrer todos los partidos asociados a los equipos de la temporada
+        Retorno:
+        - pd.DataFrame: Indexado por (player_id, team_id).
+        """
+        cache = season_stats(self.season_id)
+        return cache.matches(connection) if per_match else cache.totals(connection)
+
+    def get_team(self, team_id):
+        """
+        Equipo de la temporada por su team_id; None si no está.
+        """
+        return self.teams_by_id.get(team_id)
+
+    def get_player(self, player_id, team_id):
+        """
+        Jugador de la temporada por (player_id, team_id); None si no está.
+        """
+        return self.players_by_key.get((player_id, team_id))
+
+    def get_matchday_matches(self, matchday_id):
+        """
+        Partidos de una jornada (matchday_id real), como objetos Match.
+        """
+        return MatchView(self.match_store, self.matches_by_matchday.get(matchday_id, []), Match)
+
+    def get_matches_between(self, team_id, other_team_id):
+        """
+        Partidos entre dos equipos, en cualquier localía, ordenados por jornada.
+        """
+        pair = (min(team_id, other_team_id), max(team_id, other_team_id))
+        return MatchView(self.match_store, self.matches_by_pair.get(pair, []), Match)
+
+    def get_standings(self):
+        """
+        Devuelve la tabla acumulada de la temporada (Standings), construyéndola la primera vez.
+        Usa team_matchday_results si se cargó con load_matchday_results y, si no, los partidos
+        de self.match_store.
+        """
+        if self.standings is None:
+            if self.matchday_results is not None:
+                results = self.matchday_results
+            else:
+                results = self.match_store.results()
+            self.standings = Standings(results, {team.team_id: team.team_name for team in self.teams})
+        return self.standings
+
+    def calculate_standings(self, matchday=None, venue=None):
+        """
+        Clasificación de la temporada hasta una jornada, leída de la tabla acumulada.
+        Con venue=None también actualiza la posición, victorias, empates, derrotas y goles
+        (de local y de visitante) de cada equipo y ordena self.teams por posición.
+
+        Parámetros:
+        - matchday (int): Jornada real (roundNum + season_id * 50). None para la última.
+        - venue (str): 'local' o 'visitante' para la tabla de solo esos partidos.
+
+        Retorno:
+        - pd.DataFrame: Posicion, Equipo (team_id), Nombre, PJ, PG, PE, PP, GF, GC, DG y Pts.
+        """
+        standings = self.get_standings()
+        table = standings.table(matchday, venue)
+        if venue is not None:
+            return table
+
+        positions = dict(zip(table['Equipo'], table['Posicion']))
         for team in self.teams:
-            for match in team.matches:
-                # Identificar si el equipo es local o visitante
-                if match.home_team_id == team.team_id:
-                    home_team_stats = team_stats_dict[match.home_team_id]
-                    home_team_stats[GOALS][0] += match.home_score  # Goles de local
-                    home_team_stats[GOALS_CONCEDED][0] += match.away_score  # Goles concedidos de local
-                    if match.home_score > match.away_score:
-                        home_team_stats[WINS][0] += 1  # Victoria de local
-                    elif match.home_score < match.away_score:
-                        home_team_stats[LOSSES][0] += 1  # Derrota de local
-                    else:
-                        home_team_stats[DRAWS][0] += 1  # Empate de local
-
-                if match.away_team_id == team.team_id:
-                    away_team_stats = team_stats_dict[match.away_team_id]
-                    away_team_stats[GOALS][1] += match.away_score  # Goles de visitante
-                    away_team_stats[GOALS_CONCEDED][1] += match.home_score  # Goles concedidos de visitante
-                    if match.away_score > match.home_score:
-                        away_team_stats[WINS][1] += 1  # Victoria de visitante
-                    elif match.away_score < match.home_score:
-                        away_team_stats[LOSSES][1] += 1  # Derrota de visitante
-                    else:
-                        away_team_stats[DRAWS][1] += 1  # Empate de visitante
-
-        # Actualizar los atributos de cada equipo con los datos calculados
-        for team, stats in zip(self.teams, team_stats):
-            team.standing = stats[STANDING]  # La posición se mantendrá en el atributo de la clase
-            team.wins = sum(stats[WINS])  # Sumar victorias de local y visitante
-            team.losses = sum(stats[LOSSES])  # Sumar derrotas de local y visitante
-            team.draws = sum(stats[DRAWS])  # Sumar empates de local y visitante
-            team.goals = [sum(stats[GOALS][0:1]), sum(stats[GOALS][1:2])]  # Goles de local y visitante
-            team.goals_conceded = [sum(stats[GOALS_CONCEDED][0:1]), sum(stats[GOALS_CONCEDED][1:2])]  # Goles concedidos de local y visitante
-
-        # Ahora ordenamos los equipos por puntos, diferencia de goles, y goles a favor
-        self.teams.sort(key=lambda team: (
-            team.wins * 3 + team.draws,  # Puntos
-            (sum(team.goals) - sum(team.goals_conceded)),  # Diferencia de goles
-            sum(team.goals)  # Goles a favor
-        ), reverse=True)
-
-        # Actualizamos la posición de cada equipo después de ordenar
-        for position, team in enumerate(self.teams, start=1):
-            team.standing = position  # Actualizar la posición en el standing
-
-        # Limpiar las variables temporales de la memoria
-        del team_stats
-        del team_stats_dict
+            total = standings.team_totals(team.team_id, matchday)
+            home = standings.team_totals(team.team_id, matchday, 'local')
+            away = standings.team_totals(team.team_id, matchday, 'visitante')
+            team.standing = positions[team.team_id]
+            team.wins = total['PG']
+            team.draws = total['PE']
+            team.losses = total['PP']
+            team.goals = [home['GF'], away['GF']]  # Goles de local y visitante
+            team.goals_conceded = [home['GC'], away['GC']]  # Goles concedidos de local y visitante
+        self.teams.sort(key=lambda team: team.standing)
+        return table
 
     def display_top_players(self, top_n=10):
         """
         Muestra un gráfico interactivo de los mejores jugadores en diferentes categorías utilizando Bokeh.
         Los jugadores están coloreados según su equipo.
         """
-        # Crear un mapeo de team_id a team_name
-        team_id_to_name = {team.team_id: team.team_name for team in self.teams}
-        
         # Lista para almacenar todos los jugadores
         all_players = []
         for team in self.teams:
             all_players.extend(team.players)
         
-        # Crear DataFrame con las estadísticas relevantes
+        # Crear DataFrame con las estadísticas relevantes, leídas por columnas de la matriz de estadísticas
+        stats = player_stats_matrix(all_players)
         data = {
             'Player': [player.player_name for player in all_players],
-            'Team': [team_id_to_name.get(player.team_id, 'Unknown') for player in all_players],
-            'Goals': [int(player.stats.get('goles', 0)) for player in all_players],
-            'Assists': [int(player.stats.get('asistencias', 0)) for player in all_players],
-            'Key_Passes': [int(player.stats.get('pases_claves', 0)) for player in all_players],
-            'Goals_Conceded': [int(player.stats.get('goles_recibidos', 0)) for player in all_players],
-            'Fouls_Committed': [int(player.stats.get('faltas_cometidas', 0)) for player in all_players],
-            'Big_Chances_Scored': [int(player.stats.get('big_chances_scored', 0)) for player in all_players],
-            'Missed_Chances': [int(player.stats.get('chances_perdidas', 0)) for player in all_players]
+            'Team': [self.teams_by_id[player.team_id].team_name if player.team_id in self.teams_by_id else 'Unknown'
+                     for player in all_players],
         }
+        for stat, name in STAT_LABELS.items():
+            data[name] = stats[:, PLAYER_STAT_COLUMNS.index(stat)]
         
         df = pd.DataFrame(data)
         
@@ -374,7 +479,7 @@ class Season:
         """
 
         # Obtener todas las jornadas disponibles
-        matchdays = sorted(set(match.matchday_id for team in self.teams for match in team.matches))
+        matchdays = [int(matchday) for matchday in self.get_standings().matchdays]
 
         if not matchdays:
             print("No hay jornadas disponibles para esta temporada.")
@@ -388,13 +493,20 @@ class Season:
 
         standings_df = self.calculate_standings(matchday=initial_real_matchday)
 
+        # Las tablas de todas las jornadas salen de la tabla acumulada; el Select solo cambia de tabla
+        standings = self.get_standings()
+        tables = {
+            str(visible_md): standings.table(real_md).astype(str).to_dict(orient='list')
+            for visible_md, real_md in zip(visible_matchdays, matchdays)
+        }
+
         # Convertir datos a tipos serializables
         standings_df = standings_df.astype(str)  # Convertir todos los datos a cadenas para evitar problemas de serialización
         source = ColumnDataSource(standings_df)
 
         columns = [
             TableColumn(field="Posicion", title="Position"),
-            TableColumn(field="Equipo", title="Team"),
+            TableColumn(field="Nombre", title="Team"),
             TableColumn(field="PJ", title="Matches"),
             TableColumn(field="PG", title="Wins"),
             TableColumn(field="PE", title="Draws"),
@@ -402,6 +514,7 @@ class Season:
             TableColumn(field="GF", title="Goals"),
             TableColumn(field="GC", title="G. Conceded"),
             TableColumn(field="DG", title="G. Balance"),
+            TableColumn(field="Pts", title="Points"),
         ]
 
         data_table = DataTable(source=source, columns=columns, width=800, height=400)
@@ -412,13 +525,8 @@ class Season:
             options=[str(md) for md in visible_matchdays]
         )
 
-        callback = CustomJS(args=dict(source=source, matchday_mapping=matchday_mapping), code="""
-            const visible_matchday = cb_obj.value;
-            const real_matchday = matchday_mapping[visible_matchday];
-
-            // Simulación: Obtén datos desde el servidor o recalcula datos
-            console.log(`Cambiando a jornada ${visible_matchday} (matchday real: ${real_matchday})`);
-            // Aquí deberías reemplazar con una lógica real para actualizar los datos
+        callback = CustomJS(args=dict(source=source, tables=tables), code="""
+            source.data = tables[cb_obj.value];
         """)
         select.js_on_change('value', callback)
 
@@ -435,13 +543,53 @@ class Team:
         self.season_id = season_id
         self.players = players or []
         self.season = season
-        self.matches = []
         self.standing = 0  # Posición en la tabla
         self.wins = [0, 0]  # [local_wins, away_wins]
         self.losses = [0, 0]  # [local_losses, away_losses]
         self.draws = [0, 0]  # [local_draws, away_draws]
         self.goals = [0, 0]  # [home_goals, away_goals]
         self.goals_conceded = [0, 0]  # [home_goals_conceded, away_goals_conceded]
+        self._matches = []  # Partidos agregados antes de que el equipo esté en una temporada
+        self._matches_view = None
+
+    @property
+    def matches(self):
+        """
+        Partidos del equipo ordenados por jornada, como objetos Match leídos del almacén de la temporada.
+        La vista es la misma mientras no cambie el almacén. Sin temporada es una lista.
+        """
+        if self.season is None:
+            return self._matches
+        return self._view()
+
+    def _view(self):
+        # La vista se actualiza en su lugar, así que una referencia guardada ve los partidos nuevos
+        store = self.season.match_store
+        view = self._matches_view
+        if view is None:
+            view = self._matches_view = MatchView(store, store.team_rows(self.team_id), Match, self.add_match)
+        elif view.store is not store:
+            view.store, view.rows = store, store.team_rows(self.team_id)
+        return view
+
+    @matches.setter
+    def matches(self, matches):
+        matches = list(matches)
+        if self.season is None:
+            self._matches = matches
+            return
+        self.season.replace_team_matches(self.team_id, [match_row(match) for match in matches])
+
+    def add_match(self, match):
+        """
+        Agrega un partido al equipo. Con temporada va a su almacén y, si la temporada ya tiene
+        ese match_id (p. ej. se agregó al rival), no se duplica.
+        """
+        if self.season is None:
+            self._matches.append(match)
+            return
+        self.season.add_matches([match_row(match)])
+        self._view()
 
     def __str__(self):
         return f"\n{self.team_name} ({self.city}) - Posición: {self.standing}, Goles: {sum(self.goals)}, Goles Concedidos: {sum(self.goals_conceded)}"
@@ -471,6 +619,40 @@ class Team:
             print(f"Jornada {match.matchday_id}: {result}")
 
     
+    def performance_trends(self):
+        """
+        Datos de los gráficos de rendimiento, a partir de los partidos jugados del equipo en el
+        almacén de la temporada: el rendimiento suma 1 por victoria y resta 1 por derrota.
+
+        Retorno:
+        - dict: {'total', 'local', 'visitante'}, cada uno con listas x (número de partido),
+          y (rendimiento acumulado), desc ("Jornada N: resultado"), result y outcome (1, 0 o -1).
+        """
+        results = self.season.match_store.team_results(self.team_id)
+        home = results['home']
+        outcome = results['outcome']
+        # Jornada visible: matchday_id = roundNum + season_id * 50
+        rounds = results['matchday_id'] - 50 * results['season_id']
+        names = [self.get_team_name(opponent_id) for opponent_id in results['opponent_id'].tolist()]
+        result = np.array([
+            f"{self.team_name} {home_score} - {away_score} {opponent}" if is_home
+            else f"{opponent} {home_score} - {away_score} {self.team_name}"
+            for is_home, home_score, away_score, opponent in zip(
+                home.tolist(), results['home_score'].tolist(), results['away_score'].tolist(), names)
+        ], dtype=object)
+        desc = np.array([f"Jornada {n}: {r}" for n, r in zip(rounds.tolist(), result.tolist())], dtype=object)
+
+        trends = {}
+        for name, mask in (('total', np.ones(len(home), dtype=bool)), ('local', home), ('visitante', ~home)):
+            trends[name] = {
+                'x': list(range(1, int(mask.sum()) + 1)),
+                'y': np.cumsum(outcome[mask]).tolist(),
+                'desc': desc[mask].tolist(),
+                'result': result[mask].tolist(),
+                'outcome': outcome[mask].tolist(),
+            }
+        return trends
+
     def display_team_summary(self):
         """
         Muestra un resumen completo del rendimiento del equipo combinando gráficos de dona para
@@ -478,84 +660,12 @@ class Team:
         """
         output_notebook()
 
-        # Procesar datos para los gráficos de dona
-        home_wins, home_draws, home_losses = 0, 0, 0
-        away_wins, away_draws, away_losses = 0, 0, 0
-        home_results = []
-        away_results = []
-
-        # Datos para gráficos de tendencia
-        match_numbers = []
-        total_performance = []
-        home_performance = []
-        away_performance = []
-        tooltips_total = []
-        tooltips_home = []
-        tooltips_away = []
-
-        total_score = 0
-        home_score = 0
-        away_score = 0
-        
-        # Ordenar los partidos por jornada
-        sorted_matches = sorted(self.matches, key=lambda x: x.matchday_id)
-        
-        # Variables para llevar el conteo de partidos
-        home_match_number = 0
-        away_match_number = 0
-
-        for idx, match in enumerate(sorted_matches):
-            match_numbers.append(idx + 1)
-            
-            if match.home_team_id == self.team_id:
-                home_match_number += 1
-                opponent = self.get_team_name(match.away_team_id)
-                result = f"{self.team_name} {match.home_score} - {match.away_score} {opponent}"
-                home_results.append(result)
-                
-                # Procesar resultado para dona
-                if match.home_score > match.away_score:
-                    home_wins += 1
-                    total_score += 1
-                    home_score += 1
-                elif match.home_score == match.away_score:
-                    home_draws += 1
-                else:
-                    home_losses += 1
-                    total_score -= 1
-                    home_score -= 1
-                    
-                # Datos para gráfico de tendencia
-                tooltips_total.append(f"Jornada {int(match.matchday_id) - (50*self.season_id)}: {result}")
-                tooltips_home.append(f"Jornada {int(match.matchday_id) - (50*self.season_id)}: {result}")
-                tooltips_away.append(None)
-                total_performance.append(total_score)
-                home_performance.append(home_score)
-                
-            elif match.away_team_id == self.team_id:
-                away_match_number += 1
-                opponent = self.get_team_name(match.home_team_id)
-                result = f"{opponent} {match.home_score} - {match.away_score} {self.team_name}"
-                away_results.append(result)
-                
-                # Procesar resultado para dona
-                if match.away_score > match.home_score:
-                    away_wins += 1
-                    total_score += 1
-                    away_score += 1
-                elif match.away_score == match.home_score:
-                    away_draws += 1
-                else:
-                    away_losses += 1
-                    total_score -= 1
-                    away_score -= 1
-                    
-                # Datos para gráfico de tendencia
-                tooltips_total.append(f"Jornada {int(match.matchday_id) - (50*self.season_id)}: {result}")
-                tooltips_home.append(None)
-                tooltips_away.append(f"Jornada {int(match.matchday_id) - (50*self.season_id)}: {result}")
-                total_performance.append(total_score)
-                away_performance.append(away_score)
+        # Resultados por jornada, calculados con máscaras sobre los partidos del equipo
+        performance = self.performance_trends()
+        home_wins, home_draws, home_losses = (performance['local']['outcome'].count(v) for v in (1, 0, -1))
+        away_wins, away_draws, away_losses = (performance['visitante']['outcome'].count(v) for v in (1, 0, -1))
+        home_results = performance['local']['result']
+        away_results = performance['visitante']['result']
 
         # Crear fuentes de datos para las donas
         home_total = home_wins + home_draws + home_losses
@@ -578,23 +688,9 @@ class Team:
         })
 
         # Crear fuentes de datos para los gráficos de tendencia
-        source_total = ColumnDataSource(data=dict(
-            x=match_numbers,
-            y=total_performance,
-            desc=tooltips_total
-        ))
-
-        source_home = ColumnDataSource(data=dict(
-            x=list(range(1, home_match_number + 1)),
-            y=home_performance,
-            desc=[d for d in tooltips_home if d is not None]
-        ))
-
-        source_away = ColumnDataSource(data=dict(
-            x=list(range(1, away_match_number + 1)),
-            y=away_performance,
-            desc=[d for d in tooltips_away if d is not None]
-        ))
+        source_total = ColumnDataSource(data={key: performance['total'][key] for key in ('x', 'y', 'desc')})
+        source_home = ColumnDataSource(data={key: performance['local'][key] for key in ('x', 'y', 'desc')})
+        source_away = ColumnDataSource(data={key: performance['visitante'][key] for key in ('x', 'y', 'desc')})
 
         # Crear gráficos de dona
         tooltips_dona = [
@@ -694,84 +790,13 @@ class Team:
 
         output_notebook()
 
-        # Inicializar listas para almacenar datos
-        match_numbers = []
-        total_performance = []
-        home_performance = []
-        away_performance = []
-        tooltips_total = []
-        tooltips_home = []
-        tooltips_away = []
-
-        total_score = 0
-        home_score = 0
-        away_score = 0
-
-        # Ordenar los partidos por jornada
-        sorted_matches = sorted(self.matches, key=lambda x: x.matchday_id)
-
-        # Variables para llevar el conteo de partidos en casa y fuera
-        home_match_number = 0
-        away_match_number = 0
-
-        for idx, match in enumerate(sorted_matches):
-            match_numbers.append(idx + 1)
-
-            if match.home_team_id == self.team_id:
-                home_match_number += 1
-                if match.home_score > match.away_score:
-                    total_score += 1
-                    home_score += 1
-                elif match.home_score == match.away_score:
-                    pass  # Empate, no cambia el puntaje
-                else:
-                    total_score -= 1
-                    home_score -= 1
-                # Información del partido
-                opponent = self.get_team_name(match.away_team_id)
-                result = f"{self.team_name} {match.home_score} - {match.away_score} {opponent}"
-                tooltips_total.append(f"Jornada {int(match.matchday_id) - (50*self.season_id)}: {result}")
-                tooltips_home.append(f"Jornada {int(match.matchday_id) - (50*self.season_id)}: {result}")
-                tooltips_away.append(None)  # No hay datos para partidos fuera
-                total_performance.append(total_score)
-                home_performance.append(home_score)
-            else:
-                away_match_number += 1
-                if match.away_score > match.home_score:
-                    total_score += 1
-                    away_score += 1
-                elif match.away_score == match.home_score:
-                    pass  # Empate, no cambia el puntaje
-                else:
-                    total_score -= 1
-                    away_score -= 1
-                # Información del partido
-                opponent = self.get_team_name(match.home_team_id)
-                result = f"{opponent} {match.home_score} - {match.away_score} {self.team_name}"
-                tooltips_total.append(f"Jornada {int(match.matchday_id) - (50*self.season_id)}: {result}")
-                tooltips_home.append(None)  # No hay datos para partidos en casa
-                tooltips_away.append(f"Jornada {int(match.matchday_id) - (50*self.season_id)}: {result}")
-                total_performance.append(total_score)
-                away_performance.append(away_score)
+        # Resultados por jornada, calculados con máscaras sobre los partidos del equipo
+        performance = self.performance_trends()
 
         # Crear ColumnDataSource para cada gráfico
-        source_total = ColumnDataSource(data=dict(
-            x=match_numbers,
-            y=total_performance,
-            desc=tooltips_total
-        ))
-
-        source_home = ColumnDataSource(data=dict(
-            x=list(range(1, home_match_number + 1)),
-            y=home_performance,
-            desc=[d for d in tooltips_home if d is not None]
-        ))
-
-        source_away = ColumnDataSource(data=dict(
-            x=list(range(1, away_match_number + 1)),
-            y=away_performance,
-            desc=[d for d in tooltips_away if d is not None]
-        ))
+        source_total = ColumnDataSource(data={key: performance['total'][key] for key in ('x', 'y', 'desc')})
+        source_home = ColumnDataSource(data={key: performance['local'][key] for key in ('x', 'y', 'desc')})
+        source_away = ColumnDataSource(data={key: performance['visitante'][key] for key in ('x', 'y', 'desc')})
 
         # Crear herramientas de hover
         hover_total = HoverTool(tooltips=[("Info", "@desc")])
@@ -809,10 +834,8 @@ class Team:
         """
         Obtiene el nombre de un equipo dado su ID dentro de la temporada.
         """
-        for team in self.season.teams:
-            if team.team_id == team_id:
-                return team.team_name
-        return "Desconocido"
+        team = self.season.get_team(team_id)
+        return team.team_name if team is not None else "Desconocido"
         
     def display_top_players(self, top_n=10):
         """
@@ -820,17 +843,13 @@ class Team:
         """
         
         # Crear DataFrame con las estadísticas relevantes para los jugadores del equipo
+        stats = player_stats_matrix(self.players)
         data = {
             'Player': [player.player_name for player in self.players],
             'Position': [player.position for player in self.players],
-            'Goals': [int(player.stats.get('goles', 0)) for player in self.players],
-            'Assists': [int(player.stats.get('asistencias', 0)) for player in self.players],
-            'Key_Passes': [int(player.stats.get('pases_claves', 0)) for player in self.players],
-            'Goals_Conceded': [int(player.stats.get('goles_recibidos', 0)) for player in self.players],
-            'Fouls_Committed': [int(player.stats.get('faltas_cometidas', 0)) for player in self.players],
-            'Big_Chances_Scored': [int(player.stats.get('big_chances_scored', 0)) for player in self.players],
-            'Missed_Chances': [int(player.stats.get('chances_perdidas', 0)) for player in self.players]
         }
+        for stat, name in STAT_LABELS.items():
+            data[name] = stats[:, PLAYER_STAT_COLUMNS.index(stat)]
         
         df = pd.DataFrame(data)
         
@@ -953,15 +972,124 @@ class Team:
         # Mostrar todo en un layout
         layout = column(select, p)
         show(layout)
+class PlayerStats:
+    """
+    Estadísticas básicas de varios jugadores en una matriz de enteros: una fila por jugador y una
+    columna por cada estadística de PLAYER_STAT_COLUMNS.
+
+    La matriz guarda filas libres al final y duplica su capacidad cuando se llena, así que añadir
+    jugadores de a uno no copia la matriz completa cada vez.
+    """
+    def __init__(self, values=None):
+        if values is None:
+            values = np.zeros((0, len(PLAYER_STAT_COLUMNS)), dtype='int32')
+        self.values = values
+
+    @property
+    def values(self):
+        # Vista de las filas ocupadas: escribir en ella cambia la matriz
+        return self._data[:self._size]
+
+    @values.setter
+    def values(self, values):
+        self._data = values
+        self._size = len(values)
+
+    @classmethod
+    def from_dicts(cls, stats):
+        return cls(np.array([[stats_dict.get(column, 0) or 0 for column in PLAYER_STAT_COLUMNS] for stats_dict in stats],
+                            dtype='int32').reshape(-1, len(PLAYER_STAT_COLUMNS)))
+
+    def append(self, values):
+        """
+        Añade una fila y devuelve su posición.
+        """
+        return self.extend([values])[0]
+
+    def extend(self, rows):
+        """
+        Añade varias filas y devuelve sus posiciones (range).
+        """
+        rows = np.asarray(rows, dtype=self._data.dtype).reshape(-1, len(PLAYER_STAT_COLUMNS))
+        start, end = self._size, self._size + len(rows)
+        if end > len(self._data):
+            data = np.zeros((max(end, 2 * len(self._data), 16), len(PLAYER_STAT_COLUMNS)), dtype=self._data.dtype)
+            data[:start] = self._data[:start]
+            self._data = data
+        self._data[start:end] = rows
+        self._size = end
+        return range(start, end)
+
+
+class PlayerStatsRow(MutableMapping):
+    """
+    Estadísticas básicas de un jugador como diccionario {estadística: valor} que lee y escribe
+    su fila de PlayerStats: player.stats['goles'] += 1 cambia la matriz.
+    """
+    def __init__(self, table, row):
+        self.table = table
+        self.row = row
+
+    def __getitem__(self, column):
+        return int(self.table.values[self.row, STAT_INDEX[column]])
+
+    def __setitem__(self, column, value):
+        self.table.values[self.row, STAT_INDEX[column]] = value or 0
+
+    def __delitem__(self, column):
+        raise TypeError("Las estadísticas básicas son columnas fijas; asigne 0 en lugar de borrar.")
+
+    def __iter__(self):
+        return iter(PLAYER_STAT_COLUMNS)
+
+    def __len__(self):
+        return len(PLAYER_STAT_COLUMNS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+def player_stats_matrix(players):
+    """
+    Filas de estadísticas de una lista de jugadores, en su orden. Si todos comparten la misma
+    matriz (los de una temporada cargada), es una sola indexación.
+    """
+    tables = {id(player.table) for player in players}
+    if len(tables) == 1:
+        return players[0].table.values[[player.row for player in players]]
+    return np.array([player.table.values[player.row] for player in players],
+                    dtype='int32').reshape(-1, len(PLAYER_STAT_COLUMNS))
+
+
 class Player:
-    def __init__(self, player_id, team_id, player_name, jersey_number, season_id, position, stats=None):
+    # Sin __dict__ por instancia: una temporada tiene cientos de jugadores y varias temporadas, miles
+    __slots__ = ('player_id', 'team_id', 'player_name', 'jersey_number', 'season_id', 'position', 'table', 'row')
+
+    def __init__(self, player_id, team_id, player_name, jersey_number, season_id, position, stats=None, table=None, row=None):
         self.player_id = player_id
         self.team_id = team_id
         self.player_name = player_name
         self.jersey_number = jersey_number
         self.season_id = season_id
         self.position = position
-        self.stats = stats or {}  # Diccionario para estadísticas básicas
+        # Las estadísticas básicas son la fila row de table (PlayerStats); sin table se crea una de una fila con stats
+        if table is None:
+            table, row = PlayerStats.from_dicts([stats or {}]), 0
+        self.table = table
+        self.row = row
+
+    @property
+    def stats(self):
+        """
+        Estadísticas básicas como diccionario {estadística: valor} sobre la fila del jugador:
+        los cambios (player.stats['goles'] += 1) se escriben en la matriz.
+        """
+        return PlayerStatsRow(self.table, self.row)
+
+    @stats.setter
+    def stats(self, stats):
+        # Las estadísticas que no vienen quedan en 0, como al crear el jugador
+        self.table.values[self.row] = [stats.get(column, 0) or 0 for column in PLAYER_STAT_COLUMNS]
     
     def display_player_info(self):
         """
@@ -971,40 +1099,24 @@ class Player:
         print(f"Goles: {self.stats.get('goles', 0)}, Asistencias: {self.stats.get('asistencias', 0)}, "
               f"Pases Claves: {self.stats.get('pases_claves', 0)}, Goles Recibidos: {self.stats.get('goles_recibidos', 0)}\n")
     
-    def display_detailed_stats(self, connection):
+    def display_detailed_stats(self, connection, per_match=False):
         """
-        Muestra las estadísticas detalladas del jugador, cargando los datos desde MySQL.
+        Muestra las estadísticas detalladas del jugador desde la caché de la temporada
+        (modules.stats_cache): la primera vista lee los totales de todos los jugadores de la
+        temporada en una sola consulta y las siguientes no consultan la base de datos.
+
+        Parámetros:
+        - connection: Conexión (o pool) para la primera lectura de la temporada.
+        - per_match (bool): Muestra también sus estadísticas en cada partido.
         """
-        cursor = connection.cursor()
-        
-        # Obtener todas las columnas de estadísticas disponibles en player_stats
-        cursor.execute("SHOW COLUMNS FROM player_stats")
-        columns_info = cursor.fetchall()
-        stat_columns = [col[0] for col in columns_info if col[0] not in ['player_id', 'team_id', 'match_id']]
-        
-        # Construir la consulta SQL para obtener las estadísticas del jugador
-        query = f"""
-        SELECT {', '.join(stat_columns)}
-        FROM player_stats
-        WHERE player_id = %s AND team_id = %s
-        """
-        cursor.execute(query, (self.player_id, self.team_id))
-        stats_data = cursor.fetchall()
-        
+        cache = season_stats(self.season_id)
+        total_stats = cache.player_totals(connection, self.player_id, self.team_id)
+
         # Verificar si hay datos disponibles
-        if not stats_data:
+        if not total_stats:
             print(f"No hay estadísticas detalladas disponibles para {self.player_name}.")
-            cursor.close()
             return
         
-        # Calcular las estadísticas totales
-        total_stats = {col: 0 for col in stat_columns}
-        for row in stats_data:
-            for idx, value in enumerate(row):
-                total_stats[stat_columns[idx]] += int(value or 0)
-        
-        cursor.close()
-        
         # Crear un DataFrame para mostrar las estadísticas
         df_stats = pd.DataFrame(list(total_stats.items()), columns=['Estadística', 'Valor'])
         
@@ -1012,7 +1124,14 @@ class Player:
         display(HTML(f"<h3>Estadísticas detalladas de {self.player_name}</h3>"))
         display(df_stats)
 
+        if per_match:
+            display(HTML("<h4>Por partido</h4>"))
+            display(cache.player_matches(connection, self.player_id, self.team_id))
+
 class Match:
+    # Los partidos se guardan en MatchStore; estos objetos se crean al recorrer una vista y no necesitan __dict__
+    __slots__ = ('match_id', 'matchday_id', 'home_team_id', 'away_team_id', 'home_score', 'away_score', 'duration')
+
     def __init__(self, match_id, matchday_id, home_team_id, away_team_id, home_score, away_score, duration):
         self.match_id = match_id
         self.matchday_id = matchday_id
@@ -1022,25 +1141,45 @@ class Match:
         self.away_score = away_score
         self.duration = duration
 
+def match_row(match):
+    """
+    Partido como fila en el orden de MATCH_COLUMNS, para MatchStore.
+    """
+    return tuple(getattr(match, column) for column in MATCH_COLUMNS)
+
 class Versus:
-    def __init__(self, home_team_id, away_team_id, standings):
+    def __init__(self, home_team_id, away_team_id, standings, season=None):
         self.home_team_id = home_team_id
         self.away_team_id = away_team_id
         self.standings = standings
-        
-    def check_derby(self, teams_info):
+        self.season = season
+        # Posición de cada equipo, leída una sola vez de la tabla
+        self.positions = dict(zip(standings['Equipo'].tolist(), standings['Posicion'].astype(int).tolist()))
+
+    def team_info(self, column, teams_info=None):
+        """
+        Valor de un atributo (city, team_name) del equipo local y del visitante, del índice de la
+        temporada o, si se pasa, de teams_info indexado una sola vez por team_id.
+        """
+        if teams_info is None:
+            return (getattr(self.season.get_team(self.home_team_id), column),
+                    getattr(self.season.get_team(self.away_team_id), column))
+        values = teams_info.set_index('team_id')[column]
+        return values.at[self.home_team_id], values.at[self.away_team_id]
+
+    def check_derby(self, teams_info=None):
         """
         Verifica si el enfrentamiento es un derbi (mismos equipos en la misma ciudad).
 
         Parámetros:
-        - teams_info (pd.DataFrame): DataFrame con información de equipos (team_id, city).
+        - teams_info (pd.DataFrame): DataFrame con información de equipos (team_id, city). Si es None
+          se usan los equipos de self.season.
 
         Retorna:
         - bool: True si es un derbi, False en caso contrario.
         """
-        home_city = teams_info.loc[teams_info['team_id'] == self.home_team_id, 'city'].values[0]
-        away_city = teams_info.loc[teams_info['team_id'] == self.away_team_id, 'city'].values[0]
-        
+        home_city, away_city = self.team_info('city', teams_info)
+
         return home_city == away_city
 
     def analyze_match(self):
@@ -1050,8 +1189,8 @@ class Versus:
         Retorna:
         - str: Una categoría de dificultad del partido.
         """
-        home_team_position = self.standings.loc[self.standings['Equipo'] == self.home_team_id, 'Posicion'].astype(int).values[0]
-        away_team_position = self.standings.loc[self.standings['Equipo'] == self.away_team_id, 'Posicion'].astype(int).values[0]
+        home_team_position = self.positions[self.home_team_id]
+        away_team_position = self.positions[self.away_team_id]
 
         position_diff = abs(home_team_position - away_team_position)
 
@@ -1066,17 +1205,17 @@ class Versus:
         else:
             return "Neutro"
 
-    def display_analysis(self, teams_info):
+    def display_analysis(self, teams_info=None):
         """
         Muestra el análisis del partido usando Matplotlib.
 
         Parámetros:
-        - teams_info (pd.DataFrame): DataFrame con información de equipos (team_id, team_name, city).
+        - teams_info (pd.DataFrame): DataFrame con información de equipos (team_id, team_name, city). Si es
+          None se usan los equipos de self.season.
         """
         import matplotlib.pyplot as plt
 
-        home_team_name = teams_info.loc[teams_info['team_id'] == self.home_team_id, 'team_name'].values[0]
-        away_team_name = teams_info.loc[teams_info['team_id'] == self.away_team_id, 'team_name'].values[0]
+        home_team_name, away_team_name = self.team_info('team_name', teams_info)
 
         derby = self.check_derby(teams_info)
         analysis = self.analyze_match()
@@ -0,0 +1,157 @@
+"""
+Tipos de columna más angostos para player_stats según los valores que realmente tiene.
+
+La mayoría de las estadísticas por partido son conteos pequeños (toques, faltas, remates) que
+caben en TINYINT UNSIGNED o SMALLINT UNSIGNED, y los goles esperados caben en FLOAT. Con tipos
+más angostos cada fila ocupa menos en disco y en el buffer pool, y los DataFrames que arma
+dataframe_builder usan los mismos tipos (UInt8, UInt16, float32) porque los lee de schema.sql.
+schema.sql conserva INT y DOUBLE hasta que --apply perfila la base de datos real y escribe ahí
+los tipos elegidos.
+
+La herramienta:
+1. Lee el mínimo y el máximo de cada estadística en la tabla.
+2. Propone el tipo más angosto que cubre el máximo multiplicado por un margen.
+3. Con --apply cambia los tipos con un solo ALTER TABLE, actualiza schema.sql y muestra el
+   tamaño de fila, el tamaño de la tabla y las páginas en el buffer pool antes y después.
+
+Uso:
+    python -m modules.column_types                 # solo muestra la propuesta
+    python -m modules.column_types --apply --margin 2
+"""
+import argparse
+import re
+import time
+
+import pymysql as sql
+
+from modules.database import get_pool, pooled
+from modules.staging import SCHEMA_PATH, propose, table_types
+from modules.stat_catalog import KEY_COLUMNS
+
+# Bytes por valor de cada tipo en InnoDB
+TYPE_BYTES = {'tinyint': 1, 'smallint': 2, 'mediumint': 3, 'int': 4, 'float': 4, 'double': 8}
+
+
+def type_bytes(sql_type):
+    return TYPE_BYTES.get(sql_type.split()[0], 0)
+
+
+def profile(connection, table='player_stats', types=None):
+    """
+    Lee en una sola consulta el mínimo y el máximo de cada columna numérica que no es clave.
+
+    Retorno:
+    - dict: {columna: (mínimo, máximo)}; (None, None) si la columna no tiene valores.
+    """
+    types = types or table_types(connection, table)
+    columns = [column for column, sql_type in types.items()
+               if column not in KEY_COLUMNS and sql_type.split()[0] in TYPE_BYTES]
+    select = ", ".join(f"MIN({column}), MAX({column})" for column in columns)
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {select} FROM {table}")
+        row = cursor.fetchone()
+    return {column: (row[2 * i], row[2 * i + 1]) for i, column in enumerate(columns)}
+
+
+def footprint(connection, table='player_stats', buffer_pool=True):
+    """
+    Tamaño de la tabla según information_schema: filas, bytes por fila, datos e índices, y
+    las páginas de la tabla que están en el buffer pool. Leer INNODB_BUFFER_PAGE recorre todo
+    el buffer pool, así que en un servidor con mucha memoria se puede omitir con buffer_pool=False.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE TABLE " + table)
+        cursor.fetchall()
+        cursor.execute(
+            "SELECT TABLE_ROWS, AVG_ROW_LENGTH, DATA_LENGTH, INDEX_LENGTH FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", (table,)
+        )
+        rows, avg_row_length, data_length, index_length = cursor.fetchone()
+        result = {'rows': rows, 'avg_row_length': avg_row_length, 'data_mb': data_length / 2 ** 20,
+                  'index_mb': index_length / 2 ** 20, 'buffer_pool_pages': None, 'buffer_pool_mb': None}
+        if buffer_pool:
+            # Sin la comilla final, para incluir las particiones (su nombre sigue al de la tabla)
+            cursor.execute(
+                "SELECT COUNT(*), COALESCE(SUM(DATA_SIZE), 0) FROM information_schema.INNODB_BUFFER_PAGE "
+                "WHERE TABLE_NAME LIKE CONCAT('`', DATABASE(), '`.`', %s, '%%')", (table,)
+            )
+            pages, data_size = cursor.fetchone()
+            result['buffer_pool_pages'] = pages
+            result['buffer_pool_mb'] = data_size / 2 ** 20
+    return result
+
+
+def print_footprint(name, result):
+    pool = (f", {result['buffer_pool_pages']} páginas en el buffer pool ({result['buffer_pool_mb']:.1f} MB)"
+            if result['buffer_pool_pages'] is not None else "")
+    print(f"{name}: ~{result['rows']} filas, {result['avg_row_length']} bytes por fila, "
+          f"{result['data_mb']:.1f} MB de datos y {result['index_mb']:.1f} MB de índices{pool}")
+
+
+def write_schema(proposal, table='player_stats', path=SCHEMA_PATH):
+    """
+    Cambia en schema.sql el tipo de las columnas de la propuesta, para que los DataFrames
+    y la validación de insert_player_stats usen los tipos nuevos.
+    """
+    with open(path, 'r') as f:
+        schema = f.read()
+    start = schema.index(f"CREATE TABLE `{table}`")
+    end = schema.index(") ENGINE", start)
+    block = schema[start:end]
+    for column, (_, _, definition) in proposal.items():
+        block = re.sub(rf"(\n  `{column}` )[^\n]*? (NOT NULL|DEFAULT)", rf"\g<1>{definition} \g<2>", block)
+    with open(path, 'w') as f:
+        f.write(schema[:start] + block + schema[end:])
+
+
+@pooled
+def migrate(connection, table='player_stats', margin=2.0, apply=False, buffer_pool=True):
+    """
+    Muestra el rango de cada estadística y el tipo propuesto; con apply=True aplica los tipos,
+    actualiza schema.sql y compara el tamaño de la tabla antes y después.
+
+    Retorno:
+    - dict: Propuesta de propose.
+    """
+    types = table_types(connection, table)
+    inicio = time.perf_counter()
+    ranges = profile(connection, table, types)
+    print(f"Rangos de {len(ranges)} columnas leídos en {time.perf_counter() - inicio:.1f} s.")
+    proposal = propose(ranges, types, margin)
+
+    antes = sum(type_bytes(sql_type) for column, sql_type in types.items() if column in ranges)
+    despues = sum(type_bytes(proposal[column][1] if column in proposal else sql_type)
+                  for column, sql_type in types.items() if column in ranges)
+    print(f"{'columna':<40} {'mínimo':>8} {'máximo':>8}  {'actual':<20} propuesto")
+    for column, (minimo, maximo) in ranges.items():
+        propuesto = proposal[column][1] if column in proposal else "="
+        print(f"{column:<40} {str(minimo):>8} {str(maximo):>8}  {types[column]:<20} {propuesto}")
+    print(f"{len(proposal)} columnas cambian; las estadísticas pasan de {antes} a {despues} bytes por fila.")
+
+    if not apply or not proposal:
+        return proposal
+
+    print_footprint("Antes", footprint(connection, table, buffer_pool))
+    modify = ", ".join(f"MODIFY {column} {definition} DEFAULT NULL" for column, (_, _, definition) in proposal.items())
+    inicio = time.perf_counter()
+    try:
+        with connection.cursor() as cursor:
+            # ALTER TABLE es DDL: se confirma solo y, en modo estricto, falla si un valor no cabe
+            cursor.execute(f"ALTER TABLE {table} {modify}")
+    except sql.MySQLError as e:
+        print("Error al cambiar los tipos; la tabla queda como estaba:", e)
+        return proposal
+    print(f"Tipos aplicados en {time.perf_counter() - inicio:.1f} s.")
+    write_schema(proposal, table)
+    print("schema.sql actualizado.")
+    print_footprint("Después", footprint(connection, table, buffer_pool))
+    return proposal
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Propone y aplica tipos más angostos para las estadísticas de player_stats.")
+    parser.add_argument("--apply", action="store_true", help="Aplica los tipos propuestos y actualiza schema.sql.")
+    parser.add_argument("--margin", type=float, default=2.0, help="El tipo debe admitir el máximo observado multiplicado por este margen.")
+    parser.add_argument("--no-buffer-pool", action="store_true", help="No lee INNODB_BUFFER_PAGE (recorre todo el buffer pool).")
+    args = parser.parse_args()
+    migrate(get_pool(), margin=args.margin, apply=args.apply, buffer_pool=not args.no_buffer_pool)
@@ -1,31 +1,34 @@
 from datetime import datetime
 import gc
-import json
 
 import pandas as pd
 import pymysql as sql
 
+from modules.aggregates import affected_players, refresh_player_totals, upsert_results
+from modules.bulk_loader import MAX_DIAGNOSTICOS, bulk_insert, frame_rows
+from modules.database import get_config, pooled
 from modules.dataframe_builder import (
     create_player_dataframe, 
     dataframe_stats_match,
     dataframe_teams
 )
+from modules.manifest import IngestManifest
+from modules.match_record import load_records
+from modules.partitions import ensure_season_partition, truncate_season
+from modules.staging import out_of_range, out_of_range_rows, propose, table_types, type_ranges
+from modules.stat_catalog import KEY_COLUMNS, get_catalog
+from modules.stats_cache import invalidate
+from modules.utils_dataframe import reporte_normalizacion
 
 # pd.set_option('display.max_columns', None)
 # pd.set_option('display.max_rows', None)
 
-with open('/home/sp3767/Documents/files/credentials.json') as f:
-    config = json.load(f)
-
-connection = sql.connect(
-    user=config['DB_USER'],
-    password=config['DB_PASSWORD'],
-    host=config['DB_HOST'],
-    database=config['DB_NAME']
-    )
+# Las funciones que reciben `connection` aceptan también el pool (o None): en ese caso
+# usan una conexión del pool compartido durante la llamada (ver modules.database.pooled).
 
 # Competition 
 
+@pooled
 def insert_competitions(connection, league):
     # Paso 1: Formatear el nombre de la liga
     formatted_league = league.lower().replace(' ', '_')
@@ -48,6 +51,7 @@ def insert_competitions(connection, league):
 
 # Season 
 
+@pooled
 def insert_season(connection, competition_id, season_name):
     cursor = connection.cursor()
     insert_query = """
@@ -59,6 +63,8 @@ def insert_season(connection, competition_id, season_name):
         cursor.execute(insert_query, (competition_id, season_name))
         connection.commit()
         print(f"Se ha agregado la temporada {season_name} para la competencia con ID {competition_id}.")
+        # player_stats y football_game reciben la temporada en su propia partición
+        ensure_season_partition(connection, cursor.lastrowid)
         
     except Exception as e:
         print(f"Error al insertar la temporada: {e}")
@@ -68,6 +74,7 @@ def insert_season(connection, competition_id, season_name):
         print(f"Temporada '{season_name.replace('_', '/')}' ha sido creada exitosamente.")
 
 # Teams
+@pooled
 def insert_teams(connection, competition_name, season_name, season_id):
     """
     Inserta datos del DataFrame `teams` en la tabla `team` usando pymysql.
@@ -110,6 +117,7 @@ def insert_teams(connection, competition_name, season_name, season_id):
         
 # MatchDays
 
+@pooled
 def insert_matchdays(connection, weeks, season_id):
     try:
         # Crear cursor
@@ -138,56 +146,57 @@ def insert_matchdays(connection, weeks, season_id):
 
 # Players.
 
-def insert_players(connection, player_data):
+@pooled
+def insert_players(connection, player_data, mode='insert', batch_size=1000, commit=True):
     """
-    Inserta un DataFrame en una tabla SQL. Maneja duplicados verificando los IDs existentes en la base de datos.
+    Inserta un DataFrame en una tabla SQL. Los jugadores que ya existen con ese equipo
+    (clave player_id, team_id) se dejan como están; la base de datos resuelve los duplicados,
+    sin traer la tabla completa.
     
     Parámetros:
     - connection: Conexión a la base de datos.
     - player_data (pd.DataFrame): DataFrame a insertar.
+    - mode (str): 'insert' (INSERT de varias filas por lote) o 'load_data' (LOAD DATA LOCAL INFILE).
+    - batch_size (int): Filas por INSERT.
+    - commit (bool): Si es False no hace commit, para cargar varias tablas en una sola transacción.
     """
-    # Crear un cursor
-    cursor = connection.cursor()
-
-    # Obtener IDs existentes
-    existing_ids_query = "SELECT player_id FROM player"
-    cursor.execute(existing_ids_query)
-    existing_ids = set(row[0] for row in cursor.fetchall())
-
-    # Filtrar el DataFrame para eliminar duplicados
-    player_data = player_data[~player_data['player_id'].isin(existing_ids)]
-
-    insert_query = """
-    INSERT INTO player (team_id, player_id, player_name, jersey_number, position, season_id)  # Reemplaza con las columnas correctas
-    VALUES (%s, %s, %s, %s, %s, %s)
-    """
+    columns = ['team_id', 'player_id', 'player_name', 'jersey_number', 'position', 'season_id']
 
     try:
-        for index, row in player_data.iterrows():
-            try:
-                cursor.execute(insert_query, (row['team_id'], row['player_id'], row['player_name'], row['jersey_number'], row['position'], row['season_id']))  # Ajusta según sea necesario
-            except Exception as e:
-                print(f"Error al insertar el jugador con ID {row['player_id']}: {e}")
-
-        connection.commit()
-        print(f"{len(player_data)} filas insertadas correctamente en la tabla players.")
+        # Los jugadores que fallan se reportan en el diagnóstico y el resto se inserta, pero la carga no está completa
+        report = bulk_insert(connection, 'player', columns, frame_rows(player_data, columns),
+                             mode, batch_size, key_columns=['player_id', 'team_id'], on_duplicate='ignore')
+        if commit:
+            connection.commit()
+        print(f"{report['new']} filas insertadas correctamente en la tabla players.")
+        return not report['errors']
 
     except Exception as e:
         print(f"Error general al insertar los datos: {e}")
         connection.rollback()
+        return False
 
-    finally:
-        cursor.close()
-        print("Cursor cerrado.")
-
-def insert_player_stats(connection, dataframe):
+@pooled
+def insert_player_stats(connection, dataframe, mode='insert', batch_size=1000, commit=True):
     """
-    Inserta los datos de un DataFrame en la tabla 'player_stats' de la base de datos,
-    verificando previamente la existencia de registros y eliminando duplicados internos.
+    Inserta o actualiza los datos de un DataFrame en la tabla 'player_stats' de la base de datos,
+    eliminando duplicados internos. Las filas que ya existen (misma temporada, partido, jugador
+    y equipo) se actualizan, así que volver a cargar un partido no duplica ni falla.
+    Las filas de jugadores que no están en player (misma clave player_id, team_id) se omiten y se
+    listan antes de insertar, y las que fallan al insertarse también se listan. En los dos casos
+    el resto se guarda pero se retorna False, para que esos archivos queden pendientes.
+    Las filas con algún valor que no cabe en el tipo de su columna en la base de datos conectada
+    (information_schema, no schema.sql) se omiten y se listan, junto con el ALTER TABLE que amplía
+    esas columnas; el resto se inserta, pero se retorna False para que esos archivos queden pendientes.
+    Los totales de temporada (player_season_stats) de los jugadores cargados se recalculan en la misma transacción.
 
     Parámetros:
     - connection: Conexión a la base de datos usando pymysql.
     - dataframe: DataFrame de pandas que contiene los datos a insertar.
+    - mode (str): 'insert' (INSERT de varias filas por lote) o 'load_data' (LOAD DATA LOCAL INFILE).
+    - batch_size (int): Filas por INSERT.
+    - commit (bool): Si es False no hace commit, para cargar varias tablas en una sola transacción.
+      Quien confirma debe llamar después a stats_cache.invalidate con las temporadas cargadas.
     """
     try:
         # Asegurarse de que NaNs son reemplazados con 0
@@ -197,98 +206,92 @@ def insert_player_stats(connection, dataframe):
         if 'season_id' not in dataframe.columns:
             raise ValueError("La columna 'season_id' no está presente en el DataFrame.")
 
-        cursor = connection.cursor()
-
-        # Obtener combinaciones válidas (player_id, team_id) de la tabla player
-        cursor.execute("SELECT player_id, team_id FROM player")
-        valid_players = set(cursor.fetchall())
-        
-        # Filtrar el DataFrame para conservar solo combinaciones válidas
-        dataframe['key'] = list(zip(dataframe['player_id'], dataframe['team_id']))
-        dataframe = dataframe[dataframe['key'].isin(valid_players)]
-        dataframe.drop(columns=['key'], inplace=True)
-        
         # Eliminar duplicados internos en el DataFrame basado en las claves primarias
-        dataframe.drop_duplicates(subset=['player_id', 'team_id', 'match_id'], inplace=True)
-
-        # Obtener registros ya existentes en la base de datos para evitar duplicados
-        cursor.execute("SELECT player_id, team_id, match_id FROM player_stats")
-        existing_stats = set(cursor.fetchall())
-        
-        # Filtrar filas en `dataframe` que no están en los registros existentes
-        dataframe['key'] = list(zip(dataframe['player_id'], dataframe['team_id'], dataframe['match_id']))
-        dataframe = dataframe[~dataframe['key'].isin(existing_stats)]
-        dataframe.drop(columns=['key'], inplace=True)
+        dataframe = dataframe.drop_duplicates(subset=['player_id', 'team_id', 'match_id'])
+
+        # Cualquier fila omitida deja la carga incompleta: se retorna False para que sus archivos queden pendientes
+        completo = True
+
+        # Semi-join con player: solo se cargan los jugadores registrados con ese equipo
+        team_ids = [int(team_id) for team_id in dataframe['team_id'].unique()]
+        if team_ids:
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT player_id, team_id FROM player WHERE team_id IN ({', '.join(['%s'] * len(team_ids))})",
+                               team_ids)
+                valid_players = pd.DataFrame(list(cursor.fetchall()), columns=['player_id', 'team_id'], dtype='int64')
+            # (player_id, team_id) es la clave de player, así que el merge no repite filas
+            registrado = (dataframe[['player_id', 'team_id']].astype('int64')
+                          .merge(valid_players, how='left', indicator=True)['_merge'] == 'both').to_numpy()
+            if not registrado.all():
+                omitidos = dataframe.loc[~registrado, ['player_id', 'team_id']].drop_duplicates()
+                print(f"Se omiten {(~registrado).sum()} filas de {len(omitidos)} jugadores que no están en player: "
+                      f"{list(omitidos.itertuples(index=False, name=None))[:MAX_DIAGNOSTICOS]}")
+                dataframe = dataframe[registrado]
+                completo = False
+
+        # Sin modo estricto la base de datos recortaría estos valores al máximo del tipo sin avisar.
+        # Se validan con los tipos de la base de datos conectada, que puede no estar migrada como schema.sql
+        tipos = table_types(connection, 'player_stats')
+        fuera_de_rango = out_of_range(dataframe, 'player_stats', type_ranges(tipos))
+        if fuera_de_rango:
+            completo = False
+            for column, minimo, maximo, (low, high) in fuera_de_rango:
+                print(f"player_stats.{column}: valores entre {minimo} y {maximo}, el tipo admite de {low} a {high}.")
+            ampliar = propose({column: (minimo, maximo) for column, minimo, maximo, _ in fuera_de_rango}, tipos)
+            fuera = out_of_range_rows(dataframe, fuera_de_rango)
+            omitidas = dataframe.loc[fuera, ['match_id', 'player_id', 'team_id']]
+            print(f"Se omiten {fuera.sum()} filas con valores fuera de rango: "
+                  f"{list(omitidas.itertuples(index=False, name=None))[:MAX_DIAGNOSTICOS]}")
+            if ampliar:
+                print("Sus archivos quedan pendientes. Para cargarlas, amplíe las columnas en la base de datos y en schema.sql:")
+                print("ALTER TABLE player_stats " + ", ".join(
+                    f"MODIFY {column} {definition} DEFAULT NULL" for column, (_, _, definition) in ampliar.items()) + ";")
+            dataframe = dataframe[~fuera]
 
-                
         if not dataframe.empty:
-            insert_query = """
-            INSERT INTO player_stats (player_id, team_id, match_id, goles, asistencias, pases_claves, season_id, big_chances_scored, centros, centros_totales, chances_perdidas,
-             despejes, faltas_cometidas, faltas_recibidas, fueras_de_juego, goles_esperados,
-            goles_recibidos, grandes_chances, intercepciones, minutes, pases_completados,
-            pases_en_el_ultimo_tercio, pases_hacia_atras, pases_largos_completados, pases_largos_totales,
-            pases_totales, pelotas_al_poste, penal_fallado, penales_atajados, penales_cometidos,
-            penales_ganados, penales_totales, regateado, regates, regates_totales, remates_a_puerta,
-            remates_bloqueados, remates_fuera, salvadas_de_portero, toques, total_remates)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            columnas_ordenadas = ['player_id', 'team_id', 'match_id', 'goles', 'asistencias', 'pases_claves', 'season_id', 'big_chances_scored', 'centros', 'centros_totales',
-                'chances_perdidas', 'despejes','faltas_cometidas', 'faltas_recibidas', 'fueras_de_juego', 'goles_esperados', 'goles_recibidos',
-                'grandes_chances', 'intercepciones', 'minutes', 'pases_completados',
-                'pases_en_el_ultimo_tercio', 'pases_hacia_atras', 'pases_largos_completados',
-                'pases_largos_totales', 'pases_totales', 'pelotas_al_poste', 'penal_fallado',
-                'penales_atajados', 'penales_cometidos', 'penales_ganados', 'penales_totales'
-            , 'regateado', 'regates', 'regates_totales', 'remates_a_puerta', 'remates_bloqueados', 'remates_fuera', 'salvadas_de_portero', 'toques', 'total_remates' ]
-            dataframe = dataframe[columnas_ordenadas]
-            data_to_insert = dataframe.values.tolist()
-            cursor.executemany(insert_query, data_to_insert)
-            connection.commit()
+            # Columnas del catálogo que existen en schema.sql y vienen en el DataFrame
+            columnas_ordenadas = get_catalog().insert_columns(dataframe.columns)
+            report = bulk_insert(connection, 'player_stats', columnas_ordenadas, frame_rows(dataframe, columnas_ordenadas),
+                                 mode, batch_size, key_columns=['player_id', 'team_id', 'match_id'],
+                                 on_duplicate=[column for column in columnas_ordenadas if column not in KEY_COLUMNS])
+            for season_id, rows in dataframe.groupby('season_id'):
+                refresh_player_totals(connection, season_id, rows['player_id'].unique())
+            if commit:
+                connection.commit()
+                # Las estadísticas detalladas en memoria de esas temporadas ya no están al día
+                invalidate(dataframe['season_id'].dropna().unique())
+            return completo and not report['errors']
         else:
-            print("No hay filas nuevas para insertar en 'player_stats'.")
+            print("No hay filas para insertar en 'player_stats'.")
+        return completo
 
     except sql.IntegrityError as ie:
         print("Error de integridad de datos (posiblemente un duplicado o falta de referencia). Detalles:", ie)
         connection.rollback()
+        return False
     except Exception as e:
         print(f"Error al insertar los datos: {e}")
         connection.rollback()
-    finally:
-        cursor.close()
+        return False
 
 
 # Match Stats
 
+@pooled
 def delete_season_data(connection, season_id):
+    """
+    Elimina los datos cargados de una temporada: estadísticas, partidos, agregados y jugadores.
+    player_stats y football_game se vacían con TRUNCATE PARTITION, que tarda lo mismo sin importar
+    cuántas filas tenga la temporada. Es DDL y se confirma en el acto, así que si después falla
+    el borrado de agregados o jugadores las estadísticas y partidos ya no se recuperan con rollback.
+    """
     try:
+        truncate_season(connection, season_id)
         with connection.cursor() as cursor:
-            delete_player_stats = """
-            DELETE FROM player_stats
-            WHERE match_id IN (
-                SELECT match_id 
-                FROM football_game
-                WHERE matchday_id IN (
-                    SELECT matchday_id
-                    FROM matchday
-                    WHERE season_id = %s
-                )
-            );
-            """
-            cursor.execute(delete_player_stats, (season_id,))
-
-            delete_football_game = """
-            DELETE FROM football_game
-            WHERE matchday_id IN (
-                SELECT matchday_id
-                FROM matchday
-                WHERE season_id = %s
-            );
-            """
-            cursor.execute(delete_football_game, (season_id,))
+            cursor.execute("DELETE FROM player_season_stats WHERE season_id = %s", (season_id,))
+            cursor.execute("DELETE FROM team_matchday_results WHERE season_id = %s", (season_id,))
 
-            # Paso 3: Eliminar datos de player
+            # Eliminar datos de player
             delete_player = """
             DELETE FROM player
             WHERE team_id IN (
@@ -302,57 +305,129 @@ def delete_season_data(connection, season_id):
             connection.commit()
             print("Datos eliminados exitosamente para la temporada y competición especificadas.")
     
-    except pymysql.MySQLError as e:
+    except sql.MySQLError as e:
         # Si ocurre un error, hacer rollback y mostrar el error
         connection.rollback()
         print("Error al eliminar los datos:", e)
+    finally:
+        # TRUNCATE PARTITION ya se confirmó aunque el resto falle
+        invalidate([season_id])
+
+@pooled
+def delete_matches(connection, match_ids, commit=True, season_id=None):
+    """
+    Elimina las estadísticas y los partidos de una lista de match_id, para volver a cargarlos
+    cuando su archivo de match_data fue corregido. Los totales de temporada de sus jugadores se recalculan.
+
+    Parámetros:
+    - connection: Conexión a la base de datos.
+    - match_ids (iterable): match_id a eliminar.
+    - commit (bool): Si es False no hace commit ni rollback, para borrar y recargar en una sola transacción.
+      Quien confirma debe llamar después a stats_cache.invalidate con las temporadas de los partidos.
+    - season_id (int): Temporada de los partidos, si se conoce. Limita los borrados a su partición.
+
+    Retorno:
+    - bool: True si se eliminaron (o no había nada que eliminar).
+    """
+    if not match_ids:
+        return True
+    match_ids = list(match_ids)
+    placeholders = ", ".join(["%s"] * len(match_ids))
+    where = f"match_id IN ({placeholders})"
+    params = match_ids
+    if season_id is not None:
+        where += " AND season_id = %s"
+        params = match_ids + [season_id]
+    try:
+        affected = affected_players(connection, match_ids, season_id)
+        # Sin claves foráneas en las tablas particionadas, cada tabla se borra explícitamente
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM player_stats WHERE {where}", params)
+            cursor.execute(f"DELETE FROM team_matchday_results WHERE {where}", params)
+            cursor.execute(f"DELETE FROM football_game WHERE {where}", params)
+        for season_id, player_ids in affected.items():
+            refresh_player_totals(connection, season_id, player_ids)
+        if commit:
+            connection.commit()
+            invalidate(affected.keys())
+        print(f"{len(match_ids)} partidos eliminados para recargarlos.")
+        return True
+    except sql.MySQLError as e:
+        if commit:
+            connection.rollback()
+        print("Error al eliminar los partidos:", e)
+        return False
+
+@pooled
+def get_matchday_match_ids(connection, matchday_id, lock=False, season_id=None):
+    """
+    Devuelve los match_id cargados de una jornada.
 
-def insert_match_details(connection, dataframe):
+    Parámetros:
+    - connection: Conexión a la base de datos.
+    - matchday_id (int): ID de la jornada (roundNum + season_id * 50).
+    - lock (bool): Bloquea los partidos de la jornada hasta el fin de la transacción (SELECT ... FOR UPDATE),
+      para que nadie cargue partidos en esa jornada mientras se reemplaza.
+    - season_id (int): Temporada de la jornada, si se conoce. La consulta solo lee su partición.
+
+    Retorno:
+    - set: match_id de la jornada.
+    """
+    query = "SELECT match_id FROM football_game WHERE matchday_id = %s"
+    params = (matchday_id,)
+    if season_id is not None:
+        query += " AND season_id = %s"
+        params = (matchday_id, season_id)
+    with connection.cursor() as cursor:
+        cursor.execute(query + (" FOR UPDATE" if lock else ""), params)
+        return {row[0] for row in cursor.fetchall()}
+
+@pooled
+def insert_match_details(connection, dataframe, mode='insert', batch_size=1000, commit=True):
     """
     Inserta un DataFrame en una tabla SQL. Maneja duplicados eliminándolos en el DataFrame 
-    y utiliza inserciones individuales para evitar problemas con claves primarias duplicadas.
+    y actualizando los partidos que ya existen (un partido corregido conserva su match_id).
+    Si un lote falla se reintenta fila por fila y se reportan los partidos con error; en ese
+    caso se retorna False.
+    Los resultados por equipo y jornada (team_matchday_results) se actualizan en la misma transacción.
     
     Parámetros:
     - connection: Conexión a la base de datos.
     - dataframe (pd.DataFrame): DataFrame a insertar.
+    - mode (str): 'insert' (INSERT de varias filas por lote) o 'load_data' (LOAD DATA LOCAL INFILE).
+    - batch_size (int): Filas por INSERT.
+    - commit (bool): Si es False no hace commit, para cargar varias tablas en una sola transacción.
+      Quien confirma debe llamar después a stats_cache.invalidate con las temporadas cargadas.
     """
     # Eliminar duplicados en el DataFrame basado en la clave primaria
     dataframe = dataframe.drop_duplicates(subset=["match_id"])
 
-    # Crear un cursor
-    cursor = connection.cursor()
-
-    insert_query = """
-    INSERT INTO football_game (match_id, matchday_id, home_team_id, away_team_id, home_score, away_score, duration , season_id )  # Reemplaza con las columnas correctas
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)  
-    """
+    columns = ['match_id', 'matchday_id', 'home_team_id', 'away_team_id', 'home_score', 'away_score', 'duration', 'season_id']
 
     try:
-        # Convertir valores NaN a None para SQL
-        dataframe = dataframe.where(pd.notnull(dataframe), None)
-
-        for index, row in dataframe.iterrows():
-            try:
-                cursor.execute(insert_query, (row['match_id'], row['matchday_id'], row['home_team_id'], row['away_team_id'], row['home_score'], row['away_score'], row['duration'], row['season_id']))  # Ajusta las columnas según sea necesario
-            except Exception as e:
-                print((row['match_id'], row['matchday_id'], row['home_team_id'], row['away_team_id'], row['home_score'], row['away_score'], row['duration'], row['season_id']))
-                print(f"Error al insertar el partido con ID {row['match_id']}: {e}")
-        
-        connection.commit()  # Confirmar los cambios en la base de datos
-        print("Todos los datos insertados correctamente en la tabla football_game.")
+        # Los NaN se convierten a None para SQL
+        report = bulk_insert(connection, 'football_game', columns, frame_rows(dataframe, columns),
+                             mode, batch_size, key_columns=['match_id'], on_duplicate=columns[1:-1])
+        # Los partidos con error no tienen resultados que guardar
+        fallidos = {error['key']['match_id'] for error in report['errors'] if error['key']}
+        upsert_results(connection, dataframe[~dataframe['match_id'].isin(fallidos)], mode, batch_size)
+        if commit:
+            connection.commit()  # Confirmar los cambios en la base de datos
+            invalidate(dataframe['season_id'].dropna().unique())
+        print(f"{report['new']} partidos nuevos y {report['updated']} actualizados en la tabla football_game.")
+        # Con algún partido sin cargar la carga no está completa y sus archivos deben quedar pendientes
+        return not report['errors']
 
     except Exception as e:
         print(f"Error general al insertar los datos: {e}")
         connection.rollback()  # Revertir cambios en caso de error
-
-    finally:
-        cursor.close()
-        print("Cursor cerrado.")
+        return False
 
 ## Extraction functions
 
 # Competition
 
+@pooled
 def get_competitions(connection):
     cursor = connection.cursor()
     select_query = "SELECT * FROM competition"
@@ -363,6 +438,7 @@ def get_competitions(connection):
 
 # Season
     
+@pooled
 def get_seasons(connection, competition_id):
     ## PENDIENTE, POSIBLE BORRADO.
     cursor = connection.cursor()
@@ -374,21 +450,59 @@ def get_seasons(connection, competition_id):
     cursor.close()
     return list(seasons)
     
-def update_season( connection, competition_name, season_name, season_id, matchday):
-    cursor = connection.cursor()
-    dataframe_players = create_player_dataframe(competition_name, season_name, season_id, matchday)
-    stats, match = dataframe_stats_match(competition_name,season_name, season_id, matchday)
-    insert_players(connection, dataframe_players)
-    insert_match_details(connection, match) 
-    insert_player_stats(connection, stats)
-    cursor.close()
+@pooled
+def update_season(connection, competition_name, season_name, season_id, matchday):
+    """
+    Carga en la base de datos los archivos de match_data nuevos o modificados de la temporada.
+    El manifest de la temporada registra el hash y el estado de cada archivo, así que una
+    corrección de un solo partido solo vuelve a procesar ese partido. El borrado de los partidos
+    reemplazados y las inserciones se confirman juntos en una sola transacción.
+    """
+    config = get_config()
+    # Antes de abrir la transacción de carga: crear la partición confirma lo pendiente
+    ensure_season_partition(connection, season_id)
+    season_path = f"/home/sp3767/Documents/football_data/{competition_name}/{season_name}"
+    manifest = IngestManifest(f"{season_path}/manifest.json")
+    files = manifest.pending(f"{season_path}/match_data", loaded_matchday=matchday)
+    if not files:
+        manifest.save()
+        print("No hay partidos nuevos ni modificados.")
+        return
+    print(f"{len(files)} archivos nuevos o modificados.")
+
+    # Cada archivo se parsea una sola vez y todos los constructores usan el mismo registro
+    vectorized = config.get('vectorized_stats', False)
+    records = load_records(files, config.get('parse_processes', 1), long_stats=vectorized)
+    catalog = get_catalog()
+    catalog.update([record for record in records.values()], season_name)
+    catalog.save()
+    dataframe_players = create_player_dataframe(competition_name, season_name, season_id, matchday, files, records)
+    stats, match = dataframe_stats_match(competition_name,season_name, season_id, matchday, files, manifest, records, vectorized=vectorized)
+    reporte_normalizacion()
+    bulk = {'mode': config.get('bulk_mode', 'insert'), 'batch_size': config.get('bulk_batch_size', 1000)}
+    # Borrar los partidos reemplazados y cargar todo en una sola transacción, como la etapa load
+    # del pipeline: nadie ve la temporada a medio cargar y si algo falla los borrados se deshacen
+    loaded = (delete_matches(connection, manifest.replaced_match_ids(files), commit=False, season_id=season_id)
+              and insert_players(connection, dataframe_players, commit=False, **bulk)
+              and insert_match_details(connection, match, commit=False, **bulk)
+              and insert_player_stats(connection, stats, commit=False, **bulk))
+    if loaded:
+        connection.commit()
+        invalidate([season_id])
+        manifest.mark_loaded(files)
+    else:
+        connection.rollback()
+        print("La carga no se completó: se deshizo y los archivos quedan pendientes.")
+    manifest.save()
     del dataframe_players
     del stats
     del match
+    del records
     gc.collect()
 
 # Matchdays
 
+@pooled
 def get_matchday(connection, season_id):
     cursor = connection.cursor()
     try:
@@ -402,6 +516,7 @@ def get_matchday(connection, season_id):
     finally:
         cursor.close()
 
+@pooled
 def get_matchday_information(connection, season_id):
     """
     Obtiene el último matchday registrado, su fecha de inserción más reciente,
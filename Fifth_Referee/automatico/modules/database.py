@@ -0,0 +1,159 @@
+from contextlib import contextmanager
+from functools import wraps
+import json
+from threading import Condition
+
+import pymysql as sql
+
+CREDENTIALS_PATH = '/home/sp3767/Documents/files/credentials.json'
+
+_config = None
+_pool = None
+
+
+def get_config():
+    """
+    Devuelve la configuración de credentials.json, leyéndola la primera vez que se necesita.
+    """
+    global _config
+    if _config is None:
+        with open(CREDENTIALS_PATH) as f:
+            _config = json.load(f)
+    return _config
+
+
+class ConnectionPool:
+    """
+    Pool acotado de conexiones pymysql compartido por todos los módulos.
+
+    Las conexiones se abren la primera vez que se piden, nunca al importar. Antes de entregar
+    una conexión libre se le hace ping y, si el servidor la cerró, se reconecta. Una conexión
+    la usa un solo hilo a la vez: quien la pide cuando todas están ocupadas espera a que se libere.
+
+    Uso:
+        with get_pool().connection() as connection:
+            get_competitions(connection)
+
+    Parámetros:
+    - size (int): Máximo de conexiones abiertas a la vez.
+    - timeout (float): Segundos de espera por una conexión libre; None espera sin límite.
+    """
+    def __init__(self, size=4, timeout=None):
+        self.size = size
+        self.timeout = timeout
+        self._idle = []
+        self._open = 0
+        self._closed = False
+        self._condition = Condition()
+
+    def _connect(self):
+        config = get_config()
+        return sql.connect(
+            user=config['DB_USER'],
+            password=config['DB_PASSWORD'],
+            host=config['DB_HOST'],
+            database=config['DB_NAME'],
+            local_infile=config.get('bulk_mode') == 'load_data'
+            )
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._condition:
+            self._open -= 1
+            self._condition.notify()
+
+    def acquire(self):
+        """
+        Toma una conexión del pool (o abre una nueva si hay cupo) y comprueba que siga viva.
+        Hay que devolverla con release; connection() lo hace solo.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._closed or self._idle or self._open < self.size, self.timeout):
+                raise TimeoutError(f"No hay conexiones libres en el pool ({self.size} en uso).")
+            if self._closed:
+                raise RuntimeError("El pool de conexiones está cerrado.")
+            connection = self._idle.pop() if self._idle else None
+            if connection is None:
+                self._open += 1
+
+        if connection is None:
+            try:
+                return self._connect()
+            except Exception:
+                with self._condition:
+                    self._open -= 1
+                    self._condition.notify()
+                raise
+        try:
+            connection.ping(reconnect=True)
+        except Exception:
+            self._discard(connection)
+            raise
+        return connection
+
+    def release(self, connection):
+        """
+        Devuelve una conexión al pool. Lo que no se confirmó con commit se descarta, para que
+        el siguiente usuario no herede una transacción abierta. Si el pool ya se cerró, la conexión se cierra.
+        """
+        try:
+            connection.rollback()
+        except Exception:
+            self._discard(connection)
+            return
+        with self._condition:
+            if not self._closed:
+                self._idle.append(connection)
+                self._condition.notify()
+                return
+        self._discard(connection)
+
+    @contextmanager
+    def connection(self):
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def close(self):
+        """
+        Cierra las conexiones libres. Las que están en uso se cierran al devolverse y no se
+        entregan más conexiones.
+        """
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            # Quienes esperan una conexión reciben el error en lugar de abrir otra
+            self._condition.notify_all()
+        for connection in idle:
+            self._discard(connection)
+
+
+def get_pool():
+    """
+    Devuelve el pool compartido del proceso. El tamaño se lee de db_pool_size en credentials.json (4 por defecto).
+    """
+    global _pool
+    if _pool is None:
+        _pool = ConnectionPool(get_config().get('db_pool_size', 4))
+    return _pool
+
+
+def pooled(function):
+    """
+    Permite pasar el pool (o None) en lugar de una conexión a una función que recibe `connection`
+    como primer argumento: la función usa una conexión del pool durante la llamada y la devuelve al terminar.
+    """
+    @wraps(function)
+    def wrapper(connection, *args, **kwargs):
+        if connection is None:
+            connection = get_pool()
+        if isinstance(connection, ConnectionPool):
+            with connection.connection() as pool_connection:
+                return function(pool_connection, *args, **kwargs)
+        return function(connection, *args, **kwargs)
+    return wrapper
@@ -1,62 +1,79 @@
-import json
 import os
 import gc
-from modules.utils_dataframe import name_stats, reemplazar, reemplazar_categoria, obtener_dataframe_liga, emparejar_equipos
+from modules import staging
+from modules.bundle import match_files
+from modules.match_record import lista_categorias_especiales, load_records, parse_match, parse_stat
+from modules.utils_dataframe import obtener_dataframe_liga, emparejar_equipos, reemplazar, reemplazar_categoria, get_scraper
 
-import LanusStats as ls
 import numpy as np
 import pandas as pd
 
-pd.set_option('display.max_columns', None)
-
-scraper = ls.ThreeSixFiveScores()
+def get_record(file_path, records=None):
+    """
+    Returns the MatchRecord of a file, from the already parsed records when available.
+    """
+    if records is not None and file_path in records:
+        return records[file_path]
+    return parse_match(file_path)
 
-def extract_football_game(file_path, season_id):
+def extract_football_game(file_path, season_id, record=None):
 
     """
     Builds the football_game dataframe with the match details.
     """
-    match_details = pd.DataFrame(columns=['match_id', 'matchday_id', 'home_team_id', 'away_team_id', 'home_score', 'away_score', 'duration'])
-    with open(file_path, 'r') as f:
-        data = json.load(f)
-        match_id = data.get("id")
-        matchday_id = (data.get('roundNum')+ season_id * 50)
-        home_team_id = data.get('homeCompetitor', {}).get('id')
-        away_team_id = data.get('awayCompetitor', {}).get('id')
-        home_score = int(data.get('homeCompetitor', {}).get('score'))       
-        away_score = int(data.get('awayCompetitor', {}).get('score'))
-
-        # Extraer duration desde actualPlayTime -> totalTime["name"]
-        actual_play_time = data.get('actualPlayTime', {}).get("totalTime", {}).get('name', '')
-
-        if actual_play_time:
-            time_parts = actual_play_time.split(' ')[-1]  # Obtiene la parte de tiempo "99:06"
-            minutes, seconds = map(int, time_parts.split(':'))  # Separa minutos y segundos
-            duration = int(minutes + seconds / 60.0)  # Convierte a minutos con decimal
-        else: 
-            duration = int(data.get("gameTime"))
-    match_details.loc[0] = [match_id, matchday_id, home_team_id, away_team_id, home_score, away_score, duration]
-    return match_details
+    game = (record or parse_match(file_path)).game
+    matchday_id = (game['round_num'] + season_id * 50)
+    row = [game['match_id'], matchday_id, game['home_team_id'], game['away_team_id'], game['home_score'], game['away_score'], game['duration']]
+    return pd.DataFrame([row], columns=['match_id', 'matchday_id', 'home_team_id', 'away_team_id', 'home_score', 'away_score', 'duration'])
+
+def matches_by_matchday(files):
+    '''
+    Groups match_data files (match_data/<matchday>/<n>.json) by matchday.
+    parameter: files (list).
+    return: dict {matchday: set of match numbers}.
+    '''
+    selected = {}
+    for file_path in files:
+        folder_name = os.path.basename(os.path.dirname(file_path))
+        match_number = int(os.path.splitext(os.path.basename(file_path))[0])
+        selected.setdefault(int(folder_name), set()).add(match_number)
+    return selected
 
 ## player dataframe & team dataframe
 
 # Constructor de positions y players dataframe. Players está perfecto.
 
-def players(file):
+def concat_frames(frames):
+    '''
+    Concatenates the accumulated frames once, instead of growing a DataFrame inside the loop.
+    parameter: frames (list).
+    return: Dataframe.
+    '''
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, axis=0)
+
+def players(file, match_numbers=None, scraper=None):
     '''
     Extracts player_names, teams id, player id and jersey number from a matchday.
     parameter: text file. (str)
+    parameter: match_numbers, only these lines (starting at 1) are read if given. (set)
+    parameter: scraper, object with get_players_info(url); the shared scraper if None.
     return: Dataframe.
     '''
-    df_concat = pd.DataFrame()
+    scraper = scraper or get_scraper()
+    frames = []
     with open(file, 'r') as reader:
-        for line in reader:
+        for idx, line in enumerate(reader, start=1):
+            if match_numbers is not None and idx not in match_numbers:
+                continue
             if line:
                 match = scraper.get_players_info(line)
                 df = pd.DataFrame(match)
                 df = df.drop(df.columns[[2, 4, 6, 7]], axis=1)
-                df_concat = pd.concat([df_concat, df], axis=0)
+                frames.append(df)
         reader.close()
+    df_concat = concat_frames(frames)
 
     if 'jerseyNumber' in df_concat.columns:
         df_concat['jerseyNumber'].fillna(0)
@@ -66,219 +83,309 @@ def players(file):
         print("Advertencia: 'jerseyNumber' no se encuentra en df_concat")
         return pd.DataFrame(columns=['competitorId', 'id', 'name', 'jerseyNumber'])
 
-def dataframe_players(folder_path, matchday):
+def dataframe_players(folder_path, matchday, files=None):
     '''
         Applies the function players_in_match to all the files in a folder.
         parameter: folder (str).
+        parameter: files, match_data json files to process instead of every matchday > matchday. (list)
         return: Dataframe.
     '''
-    df_concat = pd.DataFrame()
+    frames = []
+    selected = matches_by_matchday(files) if files is not None else None
 
     for file_name in os.listdir(folder_path):        
         file_matchday = int(os.path.splitext(file_name)[0])  
-        if file_matchday > matchday and file_name.endswith('.txt'):
+        if selected is not None:
+            if file_matchday not in selected:
+                continue
+        elif file_matchday <= matchday:
+            continue
+        if file_name.endswith('.txt'):
             file_path = os.path.join(folder_path, file_name)
             if os.path.isfile(file_path):
                 try:
-                    player_data = players(file_path)
+                    player_data = players(file_path, selected[file_matchday] if selected is not None else None)
                     print(f"Dataframe {file_name} recorrido. ")
                     if not player_data.empty:
-                        df_concat = pd.concat([df_concat, player_data], axis=0)
+                        frames.append(player_data)
                 except Exception as e:
                     print(f"Error procesando {file_path}: {e}")
 
+    df_concat = concat_frames(frames)
     df_unique = df_concat.drop_duplicates(subset=['id'])
     df_unique.rename(columns={'competitorId': 'team_id'}, inplace=True)
 
     return df_unique
 
-def positions (file_path):
+def positions (file_path, record=None):
     '''
     Extracts player_id, and position from a json file.
     parameter: json file. (str)
+    parameter: record, MatchRecord already parsed from the file. (MatchRecord)
     return: Dataframe.
     '''
-    positions_df = pd.DataFrame(columns=['id', 'position'])
-    with open(file_path, 'r') as f:
-        data = json.load(f)
-        home_competitor = data.get('homeCompetitor', {})
-        away_competitor = data.get('awayCompetitor', {})
-        teams = [home_competitor, away_competitor]
-        for team in teams:
-            for player in team.get('lineups', {}).get('members', []):
-                player_id = player.get('id')
-                position = player.get('position', {}).get('shortName')
-                if position == None:
-                    position = "Couch"
-                positions_df.loc[len(positions_df)] = [player_id, position]
-    return positions_df
-def extract_stats(file_path):
+    return pd.DataFrame((record or parse_match(file_path)).positions, columns=['id', 'position'])
+def extract_stats(file_path, record=None):
     """
     Extrae estadísticas de jugadores de cada equipo en homeCompetitor y awayCompetitor de un archivo JSON.
 
     Parámetro:
         - file_path (str): Ruta del archivo JSON.
+        - record (MatchRecord): Registro ya parseado del archivo. Si es None se lee el archivo.
 
     Retorna:
         - pd.DataFrame: Un DataFrame con estadísticas de jugadores.
     """
-    # Categorías especiales y todas las posibles estadísticas
-    lista_categorias_especiales = [
-        'barridas_ganadas', 'centros', 'duelos_aereos_ganados',
-        'pases_completados', 'pases_largos_completados',
-        'duelos_en_el_suelo_ganados', 'regates', "penales_atajados"
-    ]
-    lista_categorias = name_stats(file_path) 
-    lista_categorias.extend(lista_categorias_especiales)
-    player_stats = pd.DataFrame(columns=lista_categorias)  # DataFrame principal
-
-    # Cargar el archivo JSON
-    with open(file_path, 'r') as f:
-        data = json.load(f)
-
-    match_id = int(data.get('id', 0))  # ID del partido
-    for competitor in ['homeCompetitor', 'awayCompetitor']:
-        if competitor in data:
-            team_id = int(data[competitor].get('id', 0))  # ID del equipo
-            members = data[competitor].get('lineups', {}).get("members", [])
-            
-            for member in members:
-                player_data = dict.fromkeys(lista_categorias, 0)  # Inicializar con 0
-                player_data.update({
-                    'player_id': member.get('id'),
-                    'team_id': team_id,
-                    'match_id': match_id
-                })
-
-                stats = member.get('stats', [])
-                for stat_data in stats:
-                    stat_name = reemplazar(stat_data.get('name', ''))
-                    stat_value = stat_data.get('value', 0)
-
-                    if stat_name in lista_categorias_especiales and isinstance(stat_value, str) and '/' in stat_value:
-                        try:
-                            values = stat_value.split('/')
-                            player_data[stat_name] = int(values[0])
-                            player_data[reemplazar_categoria(stat_name)] = int(values[1].split()[0])
-                        except ValueError:
-                            player_data[stat_name] = 0
-                            player_data[reemplazar_categoria(stat_name)] = 0
-                    elif stat_name == 'minutes':
-                        try:
-                            player_data[stat_name] = int(stat_value.replace("'", ""))
-                        except ValueError:
-                            player_data[stat_name] = 0
-                    elif stat_name == 'goles':
-                        try:
-                            player_data[stat_name] = int(stat_value.split("(")[0])
-                        except ValueError:
-                            player_data[stat_name] = 0
-                    else:
-                        try:
-                            player_data[stat_name] = float(stat_value)
-                        except ValueError:
-                            player_data[stat_name] = 0
-
-                # Crear DataFrame temporal y concatenar
-                player_df = pd.DataFrame([player_data])
-                player_stats = pd.concat([player_stats, player_df], ignore_index=True)
+    record = record or parse_match(file_path)
+    player_stats = pd.DataFrame(columns=record.stat_columns)  # DataFrame principal
+
+    # Todas las filas del partido se convierten en un solo DataFrame y se concatenan una vez
+    player_df = pd.DataFrame(record.player_stats)
+    player_stats = pd.concat([player_stats, player_df], ignore_index=True)
     return player_stats.fillna(0)  # Retornar DataFrame final
 
-extract_stats("/home/sp3767/Documents/football_data/bundesliga/2024_2025/match_data/1/1.json")
+# Formatos habituales de 365scores que se convierten sin pasar por parse_stat
+PATRON_ESPECIAL = r"^\s*([0-9]{1,15})\s*/\s*([0-9]{1,15})(?:\s[^/]*)?$"
+PATRON_MINUTOS = r"^\s*([0-9]{1,15})'?\s*$"
+PATRON_GOLES = r"^\s*([0-9]{1,15})\s*(?:\([^\n]*)?$"
+PATRON_DECIMAL = r"^\s*-?[0-9]{1,15}(?:\.[0-9]+)?\s*$"
+# float() nunca acepta estos caracteres: el valor es 0, como en el except ValueError
+PATRON_NO_NUMERICO = r"['/(%:]"
+
+def convert_stat_values(names, values):
+    """
+    Convierte pares (nombre normalizado, valor) de estadísticas con operaciones vectorizadas.
+    Los formatos habituales se resuelven con expresiones regulares sobre toda la columna y el
+    resto pasa por parse_stat, así que el resultado es el mismo que en extract_stats.
+
+    Parámetros:
+    - names (pd.Series): Nombres ya normalizados (o la excepción que dio reemplazar).
+    - values (pd.Series): Valores tal como vienen en el JSON, con dtype object.
+
+    Retorno:
+    - tuple: (DataFrame con code, position, column, value, is_int; {code: excepción}).
+      code es la posición del par en la entrada y position 0 o 1 (columna de totales).
+    """
+    codes = pd.Series(range(len(values)))
+    is_str = values.map(type).eq(str)
+    text = values.where(is_str)
+    is_name = names.map(type).eq(str)
+    special = is_name & names.isin(lista_categorias_especiales) & is_str & text.str.contains('/', regex=False).fillna(False).astype(bool)
+    minutes = is_name & ~special & names.eq('minutes')
+    goles = is_name & ~special & ~minutes & names.eq('goles')
+    other = is_name & ~special & ~minutes & ~goles
+
+    parts = []
+    fast = pd.Series(False, index=values.index)
+
+    split = text[special].str.extract(PATRON_ESPECIAL).dropna()
+    totales = names[split.index].map({stat: reemplazar_categoria(stat) for stat in names[split.index].unique()})
+    parts.append(pd.DataFrame({'code': codes[split.index], 'position': 0, 'column': names[split.index],
+                               'value': split[0].astype('int64'), 'is_int': True}))
+    parts.append(pd.DataFrame({'code': codes[split.index], 'position': 1, 'column': totales,
+                               'value': split[1].astype('int64'), 'is_int': True}))
+    fast[split.index] = True
+
+    for mask, patron in ((minutes, PATRON_MINUTOS), (goles, PATRON_GOLES)):
+        number = text[mask & is_str].str.extract(patron)[0].dropna()
+        parts.append(pd.DataFrame({'code': codes[number.index], 'position': 0, 'column': names[number.index],
+                                   'value': number.astype('int64'), 'is_int': True}))
+        fast[number.index] = True
+
+    numeric = other & values.map(type).isin([int, float])
+    decimal = other & is_str & text.str.match(PATRON_DECIMAL).fillna(False).astype(bool)
+    index = values.index[numeric | decimal]
+    parts.append(pd.DataFrame({'code': codes[index], 'position': 0, 'column': names[index],
+                               'value': pd.to_numeric(values[index].astype(str)).astype('float64'), 'is_int': False}))
+    fast[index] = True
+
+    invalid = other & is_str & ~decimal & text.str.contains(PATRON_NO_NUMERICO).fillna(False).astype(bool)
+    index = values.index[invalid]
+    parts.append(pd.DataFrame({'code': codes[index], 'position': 0, 'column': names[index], 'value': 0, 'is_int': True}))
+    fast[index] = True
+
+    # El resto (formatos raros o valores inválidos) se convierte como en extract_stats
+    lento = []
+    errors = {}
+    for code in values.index[~fast]:
+        try:
+            if isinstance(names[code], Exception):
+                raise names[code]
+            for position, (column, value) in enumerate(parse_stat(names[code], values[code])):
+                lento.append((code, position, column, value, isinstance(value, int)))
+        except Exception as e:
+            errors[code] = e
+    parts.append(pd.DataFrame(lento, columns=['code', 'position', 'column', 'value', 'is_int']))
+    return pd.concat(parts, ignore_index=True), errors
+
+def extract_stats_vectorized(files, records):
+    """
+    Construye player_stats de varios partidos a la vez a partir de MatchRecords con long_stats=True.
+
+    Todas las estadísticas se juntan en una tabla larga (jugador, nombre, valor) y los formatos
+    habituales ("x/y", minutos con ', goles "n (pen)" y decimales) se convierten con operaciones
+    vectorizadas; los valores con otro formato pasan por parse_stat, igual que en extract_stats.
+    Después se pivota a una fila por jugador con las mismas columnas y valores que extract_stats.
+
+    Parámetros:
+    - files (list): Rutas de los partidos, en el orden del resultado.
+    - records (dict): MatchRecords por ruta.
+
+    Retorno:
+    - tuple: (DataFrame de player_stats, {ruta: excepción} de los archivos que fallaron).
+    """
+    errors = {}
+    stat_columns = None
+    members = []
+    member_files = []
+    stats = []
+    stat_files = []
+    for file_index, file_path in enumerate(files):
+        try:
+            columns, file_members, file_stats = get_record(file_path, records).stat_long
+        except Exception as e:
+            errors[file_path] = e
+            continue
+        stat_columns = stat_columns or columns
+        offset = len(members)
+        members.extend(file_members)
+        member_files.extend([file_index] * len(file_members))
+        stats.extend((offset + row, raw_name, raw_value) for row, raw_name, raw_value in file_stats)
+        stat_files.extend([file_index] * len(file_stats))
+
+    if not members:
+        return pd.DataFrame(columns=stat_columns or []), errors
+
+    members = pd.DataFrame(members, columns=['player_id', 'team_id', 'match_id']).assign(file=member_files)
+    # object para conservar None y los tipos originales de 365scores
+    rows, raw_names, raw_values = zip(*stats) if stats else ((), (), ())
+    long = pd.DataFrame({
+        'row': pd.Series(rows, dtype='int64'),
+        'raw_name': pd.Series(raw_names, dtype=object),
+        'raw_value': pd.Series(raw_values, dtype=object),
+        'file': pd.Series(stat_files, dtype='int64'),
+    })
+    long['seq'] = range(len(long))
+
+    # El vocabulario de nombres es pequeño: se normaliza una vez por nombre distinto
+    nombres = {}
+    for raw_name in long['raw_name'].unique():
+        try:
+            nombres[raw_name] = reemplazar(raw_name)
+        except Exception as e:
+            nombres[raw_name] = e
+    long['name'] = long['raw_name'].map(nombres)
+
+    # Los valores también se repiten mucho: se convierte cada par (nombre, valor) distinto una sola vez
+    try:
+        codes, uniques = pd.factorize(pd.Series(list(zip(long['name'], long['raw_value'])), dtype=object))
+        unique_names = pd.Series([key[0] for key in uniques], dtype=object)
+        unique_values = pd.Series([key[1] for key in uniques], dtype=object)
+    except TypeError:
+        # Valores no hashables (listas, dicts): se convierte fila por fila
+        codes = np.arange(len(long))
+        unique_names = long['name'].reset_index(drop=True)
+        unique_values = long['raw_value'].reset_index(drop=True)
+    converted, value_errors = convert_stat_values(unique_names, unique_values)
+
+    # Igual que en extract_stats, un archivo con un valor inválido se descarta completo
+    long['code'] = codes
+    for code, file_index in long.loc[long['code'].isin(list(value_errors)), ['code', 'file']].itertuples(index=False):
+        errors.setdefault(files[file_index], value_errors[code])
+    failed = [files.index(file_path) for file_path in errors if file_path in files]
+    members = members[~members['file'].isin(failed)]
+
+    cells = long[['row', 'seq', 'code']].merge(converted, on='code')
+    cells['seq'] = cells['seq'] * 2 + cells['position']
+    cells = cells.sort_values('seq', kind='stable')
+    cells = cells[cells['row'].isin(members.index)]
+    cells = cells.drop_duplicates(subset=['row', 'column'], keep='last')
+    cells['file'] = members.loc[cells['row'], 'file'].values
+
+    # Orden de columnas de extract_stats: iniciales, team_id y luego por primera aparición
+    extras = [column for column in cells['column'].drop_duplicates() if column not in stat_columns and column != 'team_id']
+    columns = list(stat_columns) + (['team_id'] if 'team_id' not in stat_columns else []) + extras
+
+    wide = cells.pivot(index='row', columns='column', values='value').reindex(index=members.index, columns=columns)
+    for column in ('player_id', 'team_id', 'match_id'):
+        wide[column] = members[column]
+
+    # Las columnas iniciales valen 0 si faltan; las demás solo en los partidos donde aparecen
+    wide[list(stat_columns)] = wide[list(stat_columns)].fillna(0)
+    present = cells[cells['column'].isin(extras)].groupby(['file', 'column']).size().unstack(fill_value=0).gt(0)
+    if not present.empty:
+        present = present.reindex(index=members['file'].unique(), columns=extras, fill_value=False)
+        mask = present.loc[members['file']].values
+        wide[extras] = wide[extras].mask(wide[extras].isna() & mask, 0)
+
+    # Columnas enteras si todos sus valores lo son, como en la construcción por diccionarios
+    float_columns = set(cells.loc[~cells['is_int'].astype(bool), 'column'])
+    for column in columns:
+        if column not in float_columns and not wide[column].isna().any():
+            wide[column] = wide[column].astype('int64')
+        else:
+            wide[column] = wide[column].astype('float64')
+
+    wide.index = members.groupby('file').cumcount().values
+    wide.columns.name = None
+    return wide, errors
 
 # Constructor de team dataframe
-def teams(file_path, season_id):
+def teams(file_path, season_id, record=None):
     '''
     Extracts football team names and ids from a file.
     parameter: json file. (str)
+    parameter: record, MatchRecord already parsed from the file. (MatchRecord)
     return: Dataframe.
     '''
-    teams_df = pd.DataFrame(columns=['team_id', 'team_name',"season_id"])
-    with open(file_path, 'r') as f:
-        data = json.load(f)
-        home_competitor = data.get('homeCompetitor', {})
-        away_competitor = data.get('awayCompetitor', {})
-        home_id = int(home_competitor.get('id'))
-        away_id = int(away_competitor.get('id'))
-        home_team = str(home_competitor.get('name'))
-        away_team = str(away_competitor.get('name'))
-        teams_df.loc[len(teams_df)] = [home_id, home_team, season_id]
-        teams_df.loc[len(teams_df)] = [away_id, away_team, season_id]
-
-def teams(file_path, season_id):
-    '''
-    Extracts football team names and ids from a file.
-    parameter: json file. (str)
-    return: Dataframe.
-    '''
-    teams_df = pd.DataFrame(columns=['team_id', 'team_name', "season_id"])
-    with open(file_path, 'r') as f:
-        data = json.load(f)
-
-        # Extraer datos de los equipos
-        home_competitor = data.get('homeCompetitor', {})
-        away_competitor = data.get('awayCompetitor', {})
-        
-        home_id = int(home_competitor.get('id', 0))  # Valor por defecto si no existe
-        away_id = int(away_competitor.get('id', 0))
-        home_team = str(home_competitor.get('name', 'Unknown'))
-        away_team = str(away_competitor.get('name', 'Unknown'))
-        
-        teams_df.loc[len(teams_df)] = [home_id, home_team, season_id]
-        teams_df.loc[len(teams_df)] = [away_id, away_team, season_id]
-        
-        # Obtener league_name de forma segura
-        league_name = data.get('competitionDisplayName', None)
-        
-        if isinstance(league_name, str):  # Solo procesar si es una cadena
-            league_name = league_name.split()[-1]
-        else:
-            print(f"Clave 'competitionDisplayName' no es una cadena en el archivo {file_path}")
-            league_name = "Unknown"
+    record = record or parse_match(file_path)
+    teams_df = pd.DataFrame([(team_id, team_name, season_id) for team_id, team_name in record.teams], columns=['team_id', 'team_name', "season_id"])
+
+    if not isinstance(record.competition_name, str):
+        print(f"Clave 'competitionDisplayName' no es una cadena en el archivo {file_path}")
 
     return teams_df
 
 
+def match_data_files(folder_path, matchday, files=None):
+    '''
+    Lists the json files of the matchday folders (or bundles) greater than matchday, or the given files.
+    parameter: folder (str), matchday (int), files (list).
+    return: list of paths.
+    '''
+    if files is not None:
+        return list(files)
+
+    # Partidos sueltos y en bundles, procesando solo las jornadas mayores al matchday dado
+    return [file_path for file_path in match_files(folder_path)
+            if int(os.path.basename(os.path.dirname(file_path))) > matchday]
+
 # Teams and positions Check if they work:
  
-def dataframe_positions(folder_path, matchday):
+def dataframe_positions(folder_path, matchday, files=None, records=None):
     '''
         Applies the function positions to all the files in a folder.
         parameter: folder (str).
+        parameter: files, json files to process instead of every matchday > matchday. (list)
+        parameter: records, already parsed MatchRecords by path. (dict)
         return: Dataframe.
     '''
-    df_concat_positions = pd.DataFrame()
+    frames = []
 
-    # Recorrer las carpetas en el directorio base
-    for folder_name in sorted(os.listdir(folder_path)):
+    for file_path in match_data_files(folder_path, matchday, files):
         try:
-            # Intentar convertir el nombre de la carpeta en un entero
-            folder_matchday = int(folder_name)
-        except ValueError:
-            # Si no es un número, ignorar esta carpeta
-            continue
+            # Procesar el archivo JSON
+            frames.append(positions(file_path, get_record(file_path, records)))
+        except Exception as e:
+            print(f"Error procesando {file_path}: {e}")
 
-        # Procesar solo carpetas cuyo matchday sea mayor al dado
-        if folder_matchday > matchday:
-            folder_full_path = os.path.join(folder_path, folder_name)
-            
-            if os.path.isdir(folder_full_path):
-                # Recorrer los archivos JSON en la carpeta
-                for file_name in os.listdir(folder_full_path):
-                    if file_name.endswith('.json'):
-                        file_path = os.path.join(folder_full_path, file_name)
-                        try:
-                            # Procesar el archivo JSON
-                            position_data = positions(file_path)
-                            df_concat_positions = pd.concat([df_concat_positions, position_data], axis=0)
-                        except Exception as e:
-                            print(f"Error procesando {file_path}: {e}")
+    df_concat_positions = concat_frames(frames)
 
     # Eliminar duplicados basado en el ID del equipo
     df_concat_positions.drop_duplicates(subset=['id'], inplace=True)
     return df_concat_positions
 
-def dataframe_teams(folder_path, season_id, league_name):
+def dataframe_teams(folder_path, season_id, league_name, records=None):
     '''
     Processes all JSON files in a folder to extract team information,
     updates city and stadium data with matched team names, and merges both DataFrames.
@@ -287,22 +394,21 @@ def dataframe_teams(folder_path, season_id, league_name):
         folder_path (str): Path to the folder containing JSON files.
         season_id (int): Season ID for the data being processed.
         league_name (str): Name of the league for API lookup.
+        records (dict): Already parsed MatchRecords by path.
 
     Returns:
         pd.DataFrame: Final merged DataFrame with team_id, team_name, season_id, city, and stadium.
     '''
     # Paso 1: Crear DataFrame vacío y extraer equipos desde archivos JSON
-    df_concat_teams = pd.DataFrame()
+    frames = []
 
-    for root, _, files in os.walk(folder_path):
-        for file_name in files:
-            if file_name.endswith('.json'):
-                file_path = os.path.join(root, file_name)
-                try:
-                    team_data = teams(file_path, season_id)
-                    df_concat_teams = pd.concat([df_concat_teams, team_data], axis=0)
-                except Exception as e:
-                    print(f"Error procesando {file_path}: {e}")
+    for file_path in match_files(folder_path):
+        try:
+            frames.append(teams(file_path, season_id, get_record(file_path, records)))
+        except Exception as e:
+            print(f"Error procesando {file_path}: {e}")
+
+    df_concat_teams = concat_frames(frames)
 
     df_concat_teams.drop_duplicates(subset=['team_id'], inplace=True)
     df_city_stadium = obtener_dataframe_liga(league_name.replace("_", " "))
@@ -321,39 +427,50 @@ def dataframe_teams(folder_path, season_id, league_name):
     df_teams = df_teams.drop_duplicates(subset=['team_id', 'season_id'])
     return df_teams
 
-def create_player_dataframe(competition_name, season_name, season_id, matchday):
+def build_player_frame(players, positions, season_id):
+    '''
+    Joins the players (dataframe_players or players) with their positions and adapts the columns to the player table.
+    parameter: players, positions (Dataframe), season_id (int).
+    return: Dataframe.
+    '''
+    # Comprobar que ambos DataFrames tienen la columna 'id'
+    if 'id' not in positions.columns:
+        raise KeyError("El DataFrame 'positions' no contiene la columna 'id'.")
+    if 'id' not in players.columns:
+        raise KeyError("El DataFrame 'players' no contiene la columna 'id'.")
+
+    # Merge de DataFrames
+    player_df = pd.merge(players, positions, on='id', how='left')
+    player_df['season_id'] = season_id
+
+    # Renombrar columnas para adaptarse al esquema de la base de datos
+    player_df.rename(columns={
+        'id': 'player_id',
+        'jerseyNumber': 'jersey_number',
+        'name': 'player_name',
+        "competitorId": "team_id"
+    }, inplace=True)
+
+    # Manejo de valores nulos y conversión de columnas relevantes a enteros
+    player_df = player_df.where(pd.notnull(player_df), None)
+    player_df[['team_id', 'player_id', 'jersey_number', "season_id"]] = (
+        player_df[['team_id', 'player_id', 'jersey_number', "season_id"]]
+        .fillna(0)
+        .astype(int)
+    )
+
+    # Eliminar duplicados basados en la clave primaria; un jugador que cambió de equipo queda una vez por equipo
+    return player_df.drop_duplicates(subset=['player_id', 'team_id'])
+
+def create_player_dataframe(competition_name, season_name, season_id, matchday, files=None, records=None, from_staging=False):
+    if from_staging:
+        # Jugadores ya tipados desde el staging en Parquet, sin volver a parsear ni llamar al scraper
+        return staging.read_table(competition_name, season_name, 'player', matchday)
     try:
         # Obtener los DataFrames de posiciones y jugadores
-        positions = dataframe_positions(f"/home/sp3767/Documents/football_data/{competition_name}/{season_name}/match_data", matchday)
-        players = dataframe_players(f'/home/sp3767/Documents/football_data/{competition_name}/{season_name}/jornadas', matchday)
-        # Comprobar que ambos DataFrames tienen la columna 'id'
-        if 'id' not in positions.columns:
-            raise KeyError("El DataFrame 'positions' no contiene la columna 'id'.")
-        if 'id' not in players.columns:
-            raise KeyError("El DataFrame 'players' no contiene la columna 'id'.")
-
-        # Merge de DataFrames
-        player_df = pd.merge(players, positions, on='id', how='left')
-        player_df['season_id'] = season_id
-
-        # Renombrar columnas para adaptarse al esquema de la base de datos
-        player_df.rename(columns={
-            'id': 'player_id',
-            'jerseyNumber': 'jersey_number',
-            'name': 'player_name',
-            "competitorId": "team_id"
-        }, inplace=True)
-
-        # Manejo de valores nulos y conversión de columnas relevantes a enteros
-        player_df = player_df.where(pd.notnull(player_df), None)
-        player_df[['team_id', 'player_id', 'jersey_number', "season_id"]] = (
-            player_df[['team_id', 'player_id', 'jersey_number', "season_id"]]
-            .fillna(0)
-            .astype(int)
-        )
-
-        # Eliminar duplicados basados en la columna clave primaria
-        player_df = player_df.drop_duplicates(subset=['player_id'])
+        positions = dataframe_positions(f"/home/sp3767/Documents/football_data/{competition_name}/{season_name}/match_data", matchday, files, records)
+        players = dataframe_players(f'/home/sp3767/Documents/football_data/{competition_name}/{season_name}/jornadas', matchday, files)
+        player_df = build_player_frame(players, positions, season_id)
         print("Dataframe de players creado con éxito.")
         del players
         del positions
@@ -369,7 +486,7 @@ def create_player_dataframe(competition_name, season_name, season_id, matchday):
         return None
 #match details and player stats
 
-def dataframe_stats_match(competition_name, season_name, season_id, matchday):
+def dataframe_stats_match(competition_name, season_name, season_id, matchday, files=None, manifest=None, records=None, processes=1, from_staging=False, vectorized=False):
     """
     Recolecta datos de estadísticas de partidos y partidos de fútbol desde carpetas numeradas mayores al matchday dado.
     
@@ -377,44 +494,108 @@ def dataframe_stats_match(competition_name, season_name, season_id, matchday):
     - folder_path (str): Ruta base donde se encuentran las carpetas numeradas por matchday.
     - season_id (int): ID de la temporada.
     - matchday (int): Matchday de referencia. Solo se procesarán carpetas con nombres mayores a este número.
+    - files (list): Archivos a procesar en lugar de las carpetas mayores al matchday.
+    - manifest (IngestManifest): Si se da, registra el estado de parseo de cada archivo.
+    - records (dict): MatchRecords ya parseados por ruta, compartidos con los demás constructores.
+    - processes (int): Si no se dan records, parsea los archivos en paralelo con este número de procesos.
+    - from_staging (bool): Si es True, lee las jornadas mayores al matchday desde el staging en Parquet.
+    - vectorized (bool): Convierte las estadísticas de todos los archivos a la vez con extract_stats_vectorized.
+      Los records deben crearse con long_stats=True.
 
     Retorno:
     - tuple: DataFrames (df_concat_match_stats, df_concat_football_game).
     """
-    df_concat_match_stats = pd.DataFrame()
-    df_concat_football_game = pd.DataFrame()
+    if from_staging:
+        return (staging.read_table(competition_name, season_name, 'player_stats', matchday),
+                staging.read_table(competition_name, season_name, 'football_game', matchday))
+
+    match_stats_frames = []
+    football_game_frames = []
     folder_path = f"/home/sp3767/Documents/football_data/{competition_name}/{season_name}/match_data"
-    # Recorrer las carpetas en el directorio base
-    for folder_name in sorted(os.listdir(folder_path)):
+    files = match_data_files(folder_path, matchday, files)
+    if records is None and (processes != 1 or vectorized):
+        records = load_records(files, processes, long_stats=vectorized)
+
+    parsed = []
+    for file_path in files:
         try:
-            # Intentar convertir el nombre de la carpeta en un entero
-            folder_matchday = int(folder_name)
-        except ValueError:
-            # Si no es un número, ignorar esta carpeta
+            # Procesar datos de fútbol y estadísticas del partido
+            record = get_record(file_path, records)
+            football_game = extract_football_game(file_path, season_id, record)
+            if not vectorized:
+                match_stats_frames.append(extract_stats(file_path, record))
+            parsed.append((file_path, football_game))
+        except Exception as e:
+            print(f"Error procesando {file_path}: {e}")
+            if manifest is not None:
+                manifest.mark_parse_error(file_path, e)
+
+    stats_errors = {}
+    if vectorized:
+        # Las estadísticas de todos los partidos válidos se convierten de una vez
+        df_concat_match_stats, stats_errors = extract_stats_vectorized([file_path for file_path, _ in parsed], records)
+    else:
+        df_concat_match_stats = concat_frames(match_stats_frames)
+
+    for file_path, football_game in parsed:
+        if file_path in stats_errors:
+            print(f"Error procesando {file_path}: {stats_errors[file_path]}")
+            if manifest is not None:
+                manifest.mark_parse_error(file_path, stats_errors[file_path])
             continue
+        football_game_frames.append(football_game)
+        if manifest is not None:
+            manifest.mark_parsed(file_path, int(football_game['match_id'].iloc[0]))
 
-        # Procesar solo carpetas cuyo matchday sea mayor al dado
-        if folder_matchday > matchday:
-            folder_full_path = os.path.join(folder_path, folder_name)
-
-            if os.path.isdir(folder_full_path):
-                # Recorrer los archivos JSON en la carpeta
-                for file_name in os.listdir(folder_full_path):
-                    if file_name.endswith('.json'):
-                        file_path = os.path.join(folder_full_path, file_name)
-                        try:
-                            # Procesar datos de fútbol y estadísticas del partido
-                            football_game = extract_football_game(file_path, season_id)
-                            match_stats = extract_stats(file_path)
-
-                            df_concat_football_game = pd.concat([df_concat_football_game, football_game], axis=0)
-                            df_concat_match_stats = pd.concat([df_concat_match_stats, match_stats], axis=0)
-                        except Exception as e:
-                            print(f"Error procesando {file_path}: {e}")
+    # Construir cada DataFrame final una sola vez
+    df_concat_football_game = concat_frames(football_game_frames)
 
     # Añadir el ID de la temporada a los DataFrames
     df_concat_football_game["season_id"] = season_id
     df_concat_match_stats["season_id"] = season_id
 
-    return df_concat_match_stats, df_concat_football_game
+    # Los tipos de schema.sql (UInt8, float32...) en lugar de int64/float64
+    dtypes = staging.schema_dtypes()
+    return (staging.narrow_frame(df_concat_match_stats, 'player_stats', dtypes),
+            staging.narrow_frame(df_concat_football_game, 'football_game', dtypes))
 
+def stage_season(competition_name, season_name, season_id, matchday=0, processes=1):
+    """
+    Convierte cada jornada de match_data mayor al matchday dado en tablas Parquet de staging
+    (football_game, team, player y player_stats), tipadas según schema.sql.
+
+    Parámetros:
+    - matchday (int): Solo se procesan las jornadas mayores a este número.
+    - processes (int): Procesos para parsear los archivos de cada jornada.
+
+    Retorno:
+    - list: Jornadas guardadas en staging.
+    """
+    folder_path = f"/home/sp3767/Documents/football_data/{competition_name}/{season_name}/match_data"
+    by_matchday = {}
+    for file_path in match_data_files(folder_path, matchday):
+        by_matchday.setdefault(int(os.path.basename(os.path.dirname(file_path))), []).append(file_path)
+
+    staged = []
+    for file_matchday, files in sorted(by_matchday.items()):
+        files.sort(key=lambda path: int(os.path.splitext(os.path.basename(path))[0]))
+        records = load_records(files, processes)
+        stats, football_game = dataframe_stats_match(competition_name, season_name, season_id, matchday, files, records=records)
+        team_frames = []
+        for file_path in files:
+            try:
+                team_frames.append(teams(file_path, season_id, get_record(file_path, records)))
+            except Exception as e:
+                print(f"Error procesando {file_path}: {e}")
+        frames = {
+            'football_game': football_game,
+            'team': concat_frames(team_frames).drop_duplicates(subset=['team_id']) if team_frames else None,
+            'player': create_player_dataframe(competition_name, season_name, season_id, matchday, files, records),
+            'player_stats': stats,
+        }
+        if staging.write_matchday(competition_name, season_name, file_matchday, frames):
+            staged.append(file_matchday)
+            print(f"Jornada {file_matchday} guardada en staging.")
+        del records
+        gc.collect()
+    return staged
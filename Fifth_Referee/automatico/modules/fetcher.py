@@ -0,0 +1,114 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from threading import Lock, Semaphore
+from urllib.parse import urlparse
+import json
+import os
+import time
+
+
+class HostLimiter:
+    """
+    Limita la cantidad de solicitudes simultáneas y el intervalo mínimo entre solicitudes por host.
+
+    Parámetros:
+    - max_per_host (int): Máximo de solicitudes en curso contra un mismo host.
+    - min_interval (float): Segundos mínimos entre el inicio de dos solicitudes al mismo host.
+    """
+    def __init__(self, max_per_host=2, min_interval=0.0):
+        self.max_per_host = max_per_host
+        self.min_interval = min_interval
+        self._lock = Lock()
+        self._semaphores = {}
+        self._last_request = {}
+
+    def _host(self, url):
+        return urlparse(url.strip()).netloc or "local"
+
+    @contextmanager
+    def slot(self, url):
+        host = self._host(url)
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = Semaphore(self.max_per_host)
+                self._last_request[host] = 0.0
+            semaphore = self._semaphores[host]
+
+        with semaphore:
+            if self.min_interval > 0:
+                with self._lock:
+                    # Reservar el siguiente turno libre del host
+                    start = max(time.monotonic(), self._last_request[host] + self.min_interval)
+                    self._last_request[host] = start
+                wait = start - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+            yield
+
+
+def atomic_write_json(data, output_file):
+    """
+    Escribe un JSON con indent=4 en un archivo temporal y lo renombra al destino,
+    de forma que nunca quede un archivo a medio escribir en match_data.
+    """
+    tmp_path = f"{output_file}.tmp"
+    try:
+        with open(tmp_path, 'w') as archivo:
+            json.dump(data, archivo, indent=4)
+        os.replace(tmp_path, output_file)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def fetch_matches(scraper, jobs, workers=1, limiter=None):
+    """
+    Descarga una lista de partidos y guarda cada uno en su archivo JSON.
+
+    Parámetros:
+    - scraper: Objeto con el método get_match_data(url) (ThreeSixFiveScores o un sustituto local).
+    - jobs (list): Tuplas (url, output_file). Las carpetas de destino deben existir.
+    - workers (int): Número de descargas simultáneas. Con 1 se descarga en orden.
+    - limiter (HostLimiter): Límite de cortesía por host. Si es None no se limita.
+
+    Retorno:
+    - list: Rutas de los archivos que no se pudieron descargar.
+    """
+    def descargar(line, output_file):
+        if limiter is None:
+            match = scraper.get_match_data(line)
+        else:
+            with limiter.slot(line):
+                match = scraper.get_match_data(line)
+        atomic_write_json(match, output_file)
+
+    fallidos = []
+    if workers <= 1:
+        for line, output_file in jobs:
+            try:
+                descargar(line, output_file)
+            except Exception as e:
+                print(f"Error descargando {line.strip()}: {e}")
+                fallidos.append(output_file)
+        return fallidos
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futuros = [(executor.submit(descargar, line, output_file), line, output_file) for line, output_file in jobs]
+        for futuro, line, output_file in futuros:
+            try:
+                futuro.result()
+            except Exception as e:
+                print(f"Error descargando {line.strip()}: {e}")
+                fallidos.append(output_file)
+    return fallidos
+
+
+def matchday_jobs(file_path, output_folder):
+    """
+    Lee el archivo .txt de una jornada y devuelve las tuplas (url, output_file) a descargar,
+    numerando los partidos desde 1 en el orden del archivo.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    with open(file_path, 'r') as reader:
+        return [(line, os.path.join(output_folder, f"{idx}.json")) for idx, line in enumerate(reader, start=1)]
@@ -0,0 +1,139 @@
+import json
+import os
+
+from modules.bundle import match_files, match_hash, match_stat
+
+
+def _orden(file_path):
+    """
+    (jornada, número de partido) de una ruta match_data/<jornada>/<n>.json.
+    """
+    number = os.path.splitext(os.path.basename(file_path))[0]
+    return int(os.path.basename(os.path.dirname(file_path))), int(number) if number.isdigit() else 0
+
+
+class IngestManifest:
+    """
+    Registro persistente de los archivos de match_data de una temporada.
+
+    Cada archivo tiene una entrada con su hash, su estado de parseo y su estado de carga
+    en la base de datos, de modo que update_season solo procesa lo nuevo o lo modificado.
+
+    Parámetros:
+    - path (str): Ruta del manifest.json (normalmente en la carpeta de la temporada).
+    """
+    def __init__(self, path):
+        self.path = path
+        self.base_path = os.path.dirname(path)
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.entries = json.load(f)
+
+    def _key(self, file_path):
+        return os.path.relpath(file_path, self.base_path)
+
+    def entry(self, file_path):
+        """
+        Devuelve la entrada de un archivo de match_data (sha1, match_id, estados...), o None si
+        el manifest no lo registró.
+        """
+        return self.entries.get(self._key(file_path))
+
+    def pending(self, folder_path, loaded_matchday=0):
+        """
+        Devuelve los archivos JSON de match_data que son nuevos, cambiaron o no llegaron a cargarse,
+        ordenados por jornada y número de partido. Los partidos guardados en bundles se devuelven
+        con su ruta lógica match_data/<jornada>/<n>.json.
+
+        Parámetros:
+        - folder_path (str): Carpeta match_data con subcarpetas numeradas por jornada.
+        - loaded_matchday (int): Última jornada ya cargada antes de existir el manifest. Los archivos
+          sin entrada de jornadas menores o iguales se registran como cargados.
+
+        Retorno:
+        - list: Rutas de los archivos pendientes.
+        """
+        pending_files = []
+        for file_path in sorted(match_files(folder_path), key=_orden):
+            if self.track(file_path, loaded_matchday):
+                pending_files.append(file_path)
+        return pending_files
+
+    def track(self, file_path, loaded_matchday=0):
+        """
+        Registra o actualiza la entrada de un archivo de match_data (ver pending).
+
+        Retorno:
+        - bool: True si el archivo está pendiente de cargar.
+        """
+        matchday = _orden(file_path)[0]
+        key = self._key(file_path)
+        size, mtime_ns = match_stat(file_path)
+        entry = self.entries.get(key)
+
+        # Si tamaño y fecha no cambiaron no hace falta recalcular el hash
+        if entry and entry['size'] == size and entry['mtime_ns'] == mtime_ns:
+            return entry['load_status'] != 'loaded'
+
+        sha1 = match_hash(file_path)
+        if entry and entry['sha1'] == sha1:
+            entry['size'], entry['mtime_ns'] = size, mtime_ns
+            return entry['load_status'] != 'loaded'
+
+        new_entry = {
+            'sha1': sha1,
+            'size': size,
+            'mtime_ns': mtime_ns,
+            'matchday': matchday,
+            'match_id': None,
+            'parse_status': 'pending',
+            'load_status': 'pending',
+        }
+        if entry is None and matchday <= loaded_matchday:
+            new_entry.update(parse_status='ok', load_status='loaded')
+            self.entries[key] = new_entry
+            return False
+        # Un archivo ya cargado que cambió reemplaza las filas de su partido
+        if entry and (entry['load_status'] == 'loaded' or entry.get('reload')):
+            new_entry['reload'] = True
+            new_entry['replaces'] = entry['match_id'] if entry['load_status'] == 'loaded' else entry.get('replaces')
+        self.entries[key] = new_entry
+        return True
+
+    def mark_parsed(self, file_path, match_id):
+        entry = self.entries[self._key(file_path)]
+        entry['match_id'] = match_id
+        entry['parse_status'] = 'ok'
+        entry.pop('error', None)
+
+    def mark_parse_error(self, file_path, error):
+        entry = self.entries[self._key(file_path)]
+        entry['parse_status'] = 'error'
+        entry['error'] = str(error)
+
+    def mark_loaded(self, files):
+        for file_path in files:
+            entry = self.entries[self._key(file_path)]
+            if entry['parse_status'] == 'ok':
+                entry['load_status'] = 'loaded'
+                entry.pop('reload', None)
+                entry.pop('replaces', None)
+
+    def replaced_match_ids(self, files):
+        """
+        Devuelve los match_id ya cargados cuyos archivos cambiaron y deben reemplazarse.
+        Se llama después del parseo, cuando se conoce el match_id actual de cada archivo.
+        """
+        match_ids = set()
+        for file_path in files:
+            entry = self.entries[self._key(file_path)]
+            if entry.get('reload'):
+                match_ids.update(m for m in (entry['match_id'], entry.get('replaces')) if m is not None)
+        return match_ids
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f, indent=4, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,257 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+import time
+
+from modules.bundle import read_match
+from modules.stat_catalog import get_catalog, lista_categorias_especiales
+from modules.utils_dataframe import reemplazar, reemplazar_categoria
+
+
+def parse_stat(stat_name, stat_value):
+    """
+    Convierte el valor de una estadística ya normalizada en las columnas de player_stats.
+
+    Retorno:
+    - list: Tuplas (columna, valor). Las estadísticas "x/y" devuelven la columna base y su columna de totales.
+    """
+    if stat_name in lista_categorias_especiales and isinstance(stat_value, str) and '/' in stat_value:
+        try:
+            values = stat_value.split('/')
+            base = int(values[0])
+            return [(stat_name, base), (reemplazar_categoria(stat_name), int(values[1].split()[0]))]
+        except ValueError:
+            return [(stat_name, 0), (reemplazar_categoria(stat_name), 0)]
+    elif stat_name == 'minutes':
+        try:
+            return [(stat_name, int(stat_value.replace("'", "")))]
+        except ValueError:
+            return [(stat_name, 0)]
+    elif stat_name == 'goles':
+        try:
+            return [(stat_name, int(stat_value.split("(")[0]))]
+        except ValueError:
+            return [(stat_name, 0)]
+    else:
+        try:
+            return [(stat_name, float(stat_value))]
+        except ValueError:
+            return [(stat_name, 0)]
+
+
+class MatchRecord:
+    """
+    Filas extraídas de un archivo de partido, leyendo y parseando el JSON una sola vez.
+
+    Atributos (cada uno se calcula por separado; si falla, el error se lanza al acceder a él,
+    igual que antes fallaba solo el constructor que lo leía):
+    - game (dict): Fila de football_game sin season_id; matchday es el roundNum del archivo.
+    - teams (list): Tuplas (team_id, team_name) de local y visitante.
+    - positions (list): Tuplas (player_id, position).
+    - stat_columns (list): Columnas iniciales de player_stats.
+    - player_stats (list): Diccionarios por jugador con sus estadísticas ya convertidas.
+    - stat_names (list): Nombres de estadísticas normalizados encontrados en el archivo.
+    - stat_long (tuple): Solo con long_stats=True, en lugar de player_stats: columnas iniciales,
+      tuplas (player_id, team_id, match_id) por jugador y tuplas (jugador, nombre, valor) sin convertir.
+    """
+    def __init__(self, file_path, data, long_stats=False):
+        self.file_path = file_path
+        self.competition_name = data.get('competitionDisplayName', None)
+        self._parts = {}
+        stats_part = ('stat_long', self._build_stat_long) if long_stats else ('player_stats', self._build_player_stats)
+        for name, builder in (
+            ('game', self._build_game),
+            ('teams', self._build_teams),
+            ('positions', self._build_positions),
+            stats_part,
+            ('stat_names', self._build_stat_names),
+        ):
+            try:
+                self._parts[name] = builder(data)
+            except Exception as e:
+                self._parts[name] = e
+
+    def _part(self, name):
+        part = self._parts[name]
+        if isinstance(part, Exception):
+            raise part
+        return part
+
+    @property
+    def game(self):
+        return self._part('game')
+
+    @property
+    def teams(self):
+        return self._part('teams')
+
+    @property
+    def positions(self):
+        return self._part('positions')
+
+    @property
+    def player_stats(self):
+        return self._part('player_stats')[1]
+
+    @property
+    def stat_columns(self):
+        return self._part('player_stats')[0]
+
+    @property
+    def stat_names(self):
+        return self._part('stat_names')
+
+    @property
+    def stat_long(self):
+        return self._part('stat_long')
+
+    def _build_game(self, data):
+        match_id = data.get("id")
+        round_num = data.get('roundNum')
+        home_team_id = data.get('homeCompetitor', {}).get('id')
+        away_team_id = data.get('awayCompetitor', {}).get('id')
+        home_score = int(data.get('homeCompetitor', {}).get('score'))
+        away_score = int(data.get('awayCompetitor', {}).get('score'))
+
+        # Extraer duration desde actualPlayTime -> totalTime["name"]
+        actual_play_time = data.get('actualPlayTime', {}).get("totalTime", {}).get('name', '')
+
+        if actual_play_time:
+            time_parts = actual_play_time.split(' ')[-1]  # Obtiene la parte de tiempo "99:06"
+            minutes, seconds = map(int, time_parts.split(':'))  # Separa minutos y segundos
+            duration = int(minutes + seconds / 60.0)  # Convierte a minutos con decimal
+        else:
+            duration = int(data.get("gameTime"))
+        return {
+            'match_id': match_id,
+            'round_num': round_num,
+            'home_team_id': home_team_id,
+            'away_team_id': away_team_id,
+            'home_score': home_score,
+            'away_score': away_score,
+            'duration': duration,
+        }
+
+    def _build_teams(self, data):
+        home_competitor = data.get('homeCompetitor', {})
+        away_competitor = data.get('awayCompetitor', {})
+        return [
+            (int(home_competitor.get('id', 0)), str(home_competitor.get('name', 'Unknown'))),
+            (int(away_competitor.get('id', 0)), str(away_competitor.get('name', 'Unknown'))),
+        ]
+
+    def _build_positions(self, data):
+        rows = []
+        for team in [data.get('homeCompetitor', {}), data.get('awayCompetitor', {})]:
+            for player in team.get('lineups', {}).get('members', []):
+                position = player.get('position', {}).get('shortName')
+                if position == None:
+                    position = "Couch"
+                rows.append((player.get('id'), position))
+        return rows
+
+    def _build_player_stats(self, data):
+        # Columnas iniciales desde el catálogo de estadísticas, sin recorrer match_data
+        lista_categorias = get_catalog().initial_columns()
+        lista_categorias.extend(lista_categorias_especiales)
+        rows = []
+
+        match_id = int(data.get('id', 0))  # ID del partido
+        for competitor in ['homeCompetitor', 'awayCompetitor']:
+            if competitor in data:
+                team_id = int(data[competitor].get('id', 0))  # ID del equipo
+                members = data[competitor].get('lineups', {}).get("members", [])
+
+                for member in members:
+                    player_data = dict.fromkeys(lista_categorias, 0)  # Inicializar con 0
+                    player_data.update({
+                        'player_id': member.get('id'),
+                        'team_id': team_id,
+                        'match_id': match_id
+                    })
+
+                    stats = member.get('stats', [])
+                    for stat_data in stats:
+                        stat_name = reemplazar(stat_data.get('name', ''))
+                        player_data.update(parse_stat(stat_name, stat_data.get('value', 0)))
+                    rows.append(player_data)
+        return lista_categorias, rows
+
+    def _build_stat_long(self, data):
+        # Columnas iniciales desde el catálogo de estadísticas, sin recorrer match_data
+        lista_categorias = get_catalog().initial_columns()
+        lista_categorias.extend(lista_categorias_especiales)
+        members = []
+        stats = []
+
+        match_id = int(data.get('id', 0))  # ID del partido
+        for competitor in ['homeCompetitor', 'awayCompetitor']:
+            if competitor in data:
+                team_id = int(data[competitor].get('id', 0))  # ID del equipo
+                for member in data[competitor].get('lineups', {}).get("members", []):
+                    for stat_data in member.get('stats', []):
+                        stats.append((len(members), stat_data.get('name', ''), stat_data.get('value', 0)))
+                    members.append((member.get('id'), team_id, match_id))
+        return lista_categorias, members, stats
+
+    def _build_stat_names(self, data):
+        stats_names = []
+        for competitor in ['homeCompetitor', 'awayCompetitor']:
+            if competitor in data:
+                for member in data[competitor].get('lineups', {}).get("members", []):
+                    for stat_data in member.get('stats', {}):
+                        stat_name = reemplazar(stat_data.get('name'))
+                        if stat_name:
+                            stats_names.append(stat_name)
+        return stats_names
+
+
+def parse_match(file_path, long_stats=False):
+    """
+    Lee un partido una sola vez (archivo suelto o bundle de la jornada) y devuelve su MatchRecord.
+    Con long_stats=True las estadísticas se guardan sin convertir, para el parseo vectorizado.
+    """
+    return MatchRecord(file_path, read_match(file_path), long_stats)
+
+
+def _parse_worker(file_path, long_stats=False):
+    inicio = time.perf_counter()
+    try:
+        record, error = parse_match(file_path, long_stats), None
+    except Exception as e:
+        record, error = None, e
+    return file_path, record, error, os.getpid(), time.perf_counter() - inicio
+
+
+def load_records(files, processes=1, long_stats=False):
+    """
+    Parsea una lista de archivos de partido y devuelve {ruta: MatchRecord}.
+    Los archivos que no se pueden leer se reportan y se omiten.
+
+    Parámetros:
+    - files (list): Rutas de los archivos JSON.
+    - processes (int): Procesos para parsear en paralelo. Con None se usan todos los núcleos.
+      El resultado no depende del número de procesos: se devuelve en el orden de `files`.
+    - long_stats (bool): Guardar las estadísticas sin convertir (ver MatchRecord.stat_long).
+    """
+    processes = processes or os.cpu_count()
+    if processes > 1 and len(files) > 1:
+        chunksize = max(1, len(files) // (processes * 4))
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(_parse_worker, files, [long_stats] * len(files), chunksize=chunksize))
+    else:
+        results = [_parse_worker(file_path, long_stats) for file_path in files]
+
+    records = {}
+    workers = {}
+    for file_path, record, error, pid, elapsed in results:
+        if error is not None:
+            print(f"Error procesando {file_path}: {error}")
+        else:
+            records[file_path] = record
+        count, total = workers.get(pid, (0, 0.0))
+        workers[pid] = (count + 1, total + elapsed)
+
+    if processes > 1 and len(files) > 1:
+        for pid, (count, total) in sorted(workers.items()):
+            print(f"Proceso {pid}: {count} archivos en {total:.2f} s ({count / total if total else 0:.1f} archivos/s)")
+    return records
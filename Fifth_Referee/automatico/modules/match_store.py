@@ -0,0 +1,256 @@
+"""
+Partidos de una o varias temporadas guardados por columnas en arrays de NumPy.
+
+En lugar de un objeto Match por partido en la lista de cada equipo, la temporada guarda una
+columna por dato (match_id, jornada, índice del equipo local y visitante, goles, duración),
+ordenada por jornada. Los partidos de un equipo son una máscara sobre esas columnas y los totales
+(victorias, goles, puntos) se suman con np.add.at, sin recorrer objetos en Python, también con
+varias temporadas cargadas juntas (MatchStore.concat).
+
+Uso:
+    store = MatchStore(cursor.fetchall(), season_id)
+    store.team_results(team_id)   # partidos jugados de un equipo, por jornada
+    store.records()               # totales de cada equipo, de local y de visitante
+"""
+import numpy as np
+import pandas as pd
+
+from modules.standings import RESULT_COLUMNS
+
+# Columnas de la consulta a football_game, en orden
+MATCH_COLUMNS = ['match_id', 'matchday_id', 'home_team_id', 'away_team_id', 'home_score', 'away_score', 'duration']
+
+# Totales de records(), en el orden de la última dimensión
+RECORD_COLUMNS = ['PJ', 'PG', 'PE', 'PP', 'GF', 'GC', 'Pts']
+
+# Marcador o duración que no está en la base de datos (partido sin jugar)
+MISSING = -1
+
+# Arrays de cada partido en el store (home y away son índices en team_ids)
+STORE_COLUMNS = ['match_id', 'matchday_id', 'season_id', 'home', 'away', 'home_score', 'away_score', 'duration']
+
+
+def _column(values, dtype):
+    return np.where(np.isnan(values), MISSING, values).astype(dtype)
+
+
+class MatchStore:
+    """
+    Columnas de los partidos, ordenadas por jornada y match_id.
+
+    Parámetros:
+    - rows (list): Filas (match_id, matchday_id, home_team_id, away_team_id, home_score, away_score, duration);
+      las que no tienen alguno de los dos equipos se omiten.
+    - season_id (int): Temporada de las filas.
+
+    Atributos:
+    - team_ids (np.ndarray): team_id de cada índice de equipo; home y away son índices en este array.
+    - played (np.ndarray): True en los partidos con marcador.
+    """
+    def __init__(self, rows=(), season_id=None):
+        # Todas las filas pasan juntas a un arreglo float64 (None queda como NaN); los id caben sin pérdida
+        data = np.array(list(rows), dtype='float64').reshape(-1, len(MATCH_COLUMNS))
+        # Un partido sin alguno de los equipos no se puede asignar a nadie
+        data = data[~np.isnan(data[:, 2]) & ~np.isnan(data[:, 3])]
+        match_id, matchday_id, home_team_id, away_team_id, home_score, away_score, duration = data.T
+        team_ids = home_team_id.astype('int64'), away_team_id.astype('int64')
+        self.team_ids = np.unique(np.concatenate(team_ids))
+        self._set(
+            match_id=_column(match_id, 'int64'),
+            matchday_id=_column(matchday_id, 'int32'),
+            season_id=np.full(len(data), MISSING if season_id is None else season_id, dtype='int32'),
+            home=np.searchsorted(self.team_ids, team_ids[0]).astype('int32'),
+            away=np.searchsorted(self.team_ids, team_ids[1]).astype('int32'),
+            home_score=_column(home_score, 'int16'),
+            away_score=_column(away_score, 'int16'),
+            duration=_column(duration, 'int16'),
+        )
+
+    def _set(self, **columns):
+        order = np.lexsort((columns['match_id'], columns['matchday_id']))
+        for name, values in columns.items():
+            setattr(self, name, values[order])
+        self.played = (self.home_score != MISSING) & (self.away_score != MISSING)
+        self.index = {team_id: i for i, team_id in enumerate(self.team_ids.tolist())}
+        self._team_positions = None
+
+    def _group_by_team(self):
+        # Posiciones de los partidos agrupadas por índice de equipo (local y visitante juntos), en
+        # orden de jornada dentro de cada grupo; se calcula una vez por store en lugar de una máscara por equipo
+        positions = np.tile(np.arange(len(self), dtype='int64'), 2)
+        teams = np.concatenate([self.home, self.away])
+        order = np.lexsort((positions, teams))
+        self._team_positions = positions[order]
+        self._team_bounds = np.searchsorted(teams[order], np.arange(len(self.team_ids) + 1))
+
+    @classmethod
+    def concat(cls, stores):
+        """
+        Une los partidos de varias temporadas en un solo MatchStore; los índices de equipo se
+        recalculan sobre la unión de los team_id.
+        """
+        stores = list(stores)
+        store = cls.__new__(cls)
+        store.team_ids = np.unique(np.concatenate([s.team_ids for s in stores] or [np.empty(0, dtype='int64')]))
+        columns = {name: np.concatenate([getattr(s, name) for s in stores] or [np.empty(0, dtype=dtype)])
+                   for name, dtype in [('match_id', 'int64'), ('matchday_id', 'int32'), ('season_id', 'int32'),
+                                       ('home_score', 'int16'), ('away_score', 'int16'), ('duration', 'int16')]}
+        for venue in ('home', 'away'):
+            columns[venue] = np.concatenate(
+                [np.searchsorted(store.team_ids, s.team_ids[getattr(s, venue)]) for s in stores] or [np.empty(0)]
+            ).astype('int32')
+        store._set(**columns)
+        return store
+
+    def __len__(self):
+        return len(self.match_id)
+
+    def take(self, positions):
+        """
+        Nuevo MatchStore con solo los partidos de esas posiciones (los índices de equipo no cambian).
+        """
+        store = MatchStore.__new__(MatchStore)
+        store.team_ids = self.team_ids
+        store._set(**{name: getattr(self, name)[positions] for name in STORE_COLUMNS})
+        return store
+
+    def has_match(self, match_ids):
+        """
+        True por cada match_id que ya está en el store.
+        """
+        return np.isin(np.asarray(match_ids, dtype='int64'), self.match_id)
+
+    def team_rows(self, team_id):
+        """
+        Posiciones de los partidos de un equipo (de local o de visitante), por jornada.
+        """
+        i = self.index.get(team_id)
+        if i is None:
+            return np.empty(0, dtype='int64')
+        if self._team_positions is None:
+            self._group_by_team()
+        return self._team_positions[self._team_bounds[i]:self._team_bounds[i + 1]]
+
+    def row(self, position):
+        """
+        Un partido como tupla en el orden de MATCH_COLUMNS, con None en lo que falta.
+        """
+        values = [self.match_id[position], self.matchday_id[position], self.team_ids[self.home[position]],
+                  self.team_ids[self.away[position]], self.home_score[position], self.away_score[position],
+                  self.duration[position]]
+        values = [int(value) for value in values]
+        return tuple(values[:4]) + tuple(None if value == MISSING else value for value in values[4:])
+
+    def team_results(self, team_id):
+        """
+        Partidos jugados de un equipo, ordenados por jornada.
+
+        Retorno:
+        - dict: Arrays matchday_id, season_id, home (True si jugó de local), goals_for,
+          goals_against, opponent_id, home_score, away_score y outcome (1, 0 o -1).
+        """
+        rows = self.team_rows(team_id)
+        rows = rows[self.played[rows]]
+        home = self.home[rows] == self.index[team_id] if len(rows) else np.empty(0, dtype=bool)
+        home_score = self.home_score[rows].astype('int64')
+        away_score = self.away_score[rows].astype('int64')
+        goals_for = np.where(home, home_score, away_score)
+        goals_against = np.where(home, away_score, home_score)
+        return {
+            'matchday_id': self.matchday_id[rows],
+            'season_id': self.season_id[rows],
+            'home': home,
+            'goals_for': goals_for,
+            'goals_against': goals_against,
+            'opponent_id': self.team_ids[np.where(home, self.away[rows], self.home[rows])],
+            'home_score': home_score,
+            'away_score': away_score,
+            'outcome': np.sign(goals_for - goals_against),
+        }
+
+    def results(self):
+        """
+        Una fila por equipo y partido jugado, con las columnas de team_matchday_results que usa Standings.
+        """
+        played = self.played
+        home_score = self.home_score[played].astype('int64')
+        away_score = self.away_score[played].astype('int64')
+        return pd.DataFrame({
+            'team_id': np.concatenate([self.team_ids[self.home[played]], self.team_ids[self.away[played]]]),
+            'matchday_id': np.tile(self.matchday_id[played], 2),
+            'home': np.repeat([1, 0], len(home_score)),
+            'goals_for': np.concatenate([home_score, away_score]),
+            'goals_against': np.concatenate([away_score, home_score]),
+        }, columns=RESULT_COLUMNS)
+
+    def records(self, mask=None):
+        """
+        Totales de cada equipo en los partidos jugados (opcionalmente solo los de una máscara,
+        p. ej. store.season_id == 6 o store.matchday_id <= jornada).
+
+        Retorno:
+        - np.ndarray: (equipos, 2, len(RECORD_COLUMNS)); la segunda dimensión es local y
+          visitante, y las filas siguen el orden de team_ids.
+        """
+        rows = self.played if mask is None else self.played & mask
+        home_score = self.home_score[rows].astype('int64')
+        away_score = self.away_score[rows].astype('int64')
+        totals = np.zeros((len(self.team_ids), 2, len(RECORD_COLUMNS)), dtype='int64')
+        for venue, team, goals_for, goals_against in ((0, self.home[rows], home_score, away_score),
+                                                      (1, self.away[rows], away_score, home_score)):
+            win, draw, loss = goals_for > goals_against, goals_for == goals_against, goals_for < goals_against
+            values = np.column_stack([np.ones(len(team), dtype='int64'), win, draw, loss,
+                                      goals_for, goals_against, 3 * win + draw])
+            np.add.at(totals[:, venue], team, values)
+        return totals
+
+    def records_frame(self, mask=None, names=None):
+        """
+        records() como DataFrame indexado por team_id, con las columnas de local (sufijo _local),
+        de visitante (_visitante) y totales.
+        """
+        totals = self.records(mask)
+        data = {}
+        for i, name in enumerate(RECORD_COLUMNS):
+            data[name] = totals[:, 0, i] + totals[:, 1, i]
+        for venue, suffix in ((0, 'local'), (1, 'visitante')):
+            for i, name in enumerate(RECORD_COLUMNS):
+                data[f"{name}_{suffix}"] = totals[:, venue, i]
+        frame = pd.DataFrame(data, index=pd.Index(self.team_ids, name='team_id'))
+        if names is not None:
+            frame.insert(0, 'Nombre', [names.get(team_id, "Desconocido") for team_id in self.team_ids.tolist()])
+        return frame
+
+
+class MatchView:
+    """
+    Partidos de un equipo vistos como secuencia de objetos Match, creados al leerlos.
+
+    Parámetros:
+    - store (MatchStore): Columnas de la temporada.
+    - rows (np.ndarray): Posiciones de los partidos del equipo en el store.
+    - factory (callable): Constructor del objeto de cada partido (classes.Match).
+    - append (callable): Función que agrega un partido (Team.add_match); None para una vista de solo lectura.
+    """
+    def __init__(self, store, rows, factory, append=None):
+        self.store = store
+        self.rows = rows
+        self.factory = factory
+        self._append = append
+
+    def append(self, match):
+        if self._append is None:
+            raise TypeError("Esta vista de partidos es de solo lectura; use Season.add_matches.")
+        self._append(match)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self.rows)))]
+        return self.factory(*self.store.row(self.rows[i]))
+
+    def __iter__(self):
+        for position in self.rows:
+            yield self.factory(*self.store.row(position))
@@ -0,0 +1,144 @@
+"""
+Particiones por temporada de player_stats y football_game.
+
+Las dos tablas se particionan con LIST (season_id): cada temporada tiene su partición p<season_id>
+y pdefault recibe las filas de temporadas que todavía no tienen la suya. Las consultas con
+season_id = X solo leen la partición de X, y borrar o recargar una temporada es un
+TRUNCATE PARTITION en lugar de un DELETE fila por fila.
+
+MariaDB no admite claves foráneas en tablas particionadas, así que la migración las quita de
+player_stats y football_game (y la de team_matchday_results que apuntaba a football_game).
+Los borrados que antes hacía ON DELETE CASCADE los hacen delete_matches y delete_season_data.
+Toda clave única debe incluir season_id, por eso la clave primaria de football_game pasa a
+ser (match_id, season_id).
+
+Uso, una sola vez en una base de datos creada con el schema.sql anterior:
+    python -m modules.partitions
+"""
+import time
+
+from modules.database import get_pool, pooled
+
+PARTITIONED_TABLES = ('football_game', 'player_stats')
+
+# Claves foráneas que impiden particionar: (tabla, nombre)
+FOREIGN_KEYS = [
+    ('player_stats', 'player_stats_ibfk_1'),
+    ('player_stats', 'player_stats_ibfk_2'),
+    ('player_stats', 'player_stats_ibfk_3'),
+    ('team_matchday_results', 'team_matchday_results_ibfk_1'),
+    ('football_game', 'football_game_ibfk_1'),
+    ('football_game', 'football_game_ibfk_2'),
+    ('football_game', 'football_game_ibfk_3'),
+]
+
+DEFAULT_PARTITION = 'pdefault'
+
+
+def partition_name(season_id):
+    return f"p{int(season_id)}"
+
+
+def table_partitions(connection, table):
+    """
+    Devuelve las particiones de una tabla como lista de (nombre, valores); vacía si la tabla no está particionada.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL",
+            (table,)
+        )
+        return list(cursor.fetchall())
+
+
+def season_partitions(partitions):
+    """
+    {season_id: nombre de la partición} de las particiones dedicadas a una sola temporada.
+    """
+    return {int(description): name for name, description in partitions
+            if name != DEFAULT_PARTITION and description and description.isdigit()}
+
+
+@pooled
+def ensure_season_partition(connection, season_id):
+    """
+    Crea la partición de una temporada en las tablas particionadas que no la tengan, separándola
+    de pdefault. Es DDL: MariaDB confirma la transacción en curso, así que no se debe llamar a
+    mitad de una carga.
+
+    Retorno:
+    - list: Tablas en las que se creó la partición.
+    """
+    creadas = []
+    for table in PARTITIONED_TABLES:
+        partitions = table_partitions(connection, table)
+        if not partitions or season_id in season_partitions(partitions):
+            continue
+        with connection.cursor() as cursor:
+            # Las filas de la temporada que hubiera en pdefault pasan a su partición
+            cursor.execute(
+                f"ALTER TABLE {table} REORGANIZE PARTITION {DEFAULT_PARTITION} INTO ("
+                f"PARTITION {partition_name(season_id)} VALUES IN ({int(season_id)}), "
+                f"PARTITION {DEFAULT_PARTITION} DEFAULT)"
+            )
+        creadas.append(table)
+    if creadas:
+        print(f"Partición {partition_name(season_id)} creada en {', '.join(creadas)}.")
+    return creadas
+
+
+def truncate_season(connection, season_id):
+    """
+    Vacía las filas de una temporada en player_stats y football_game. Si la tabla tiene la
+    partición de la temporada se usa TRUNCATE PARTITION (DDL, confirma la transacción en curso);
+    si no, un DELETE por season_id.
+    """
+    for table in ('player_stats', 'football_game'):
+        partition = season_partitions(table_partitions(connection, table)).get(season_id)
+        with connection.cursor() as cursor:
+            if partition:
+                cursor.execute(f"ALTER TABLE {table} TRUNCATE PARTITION {partition}")
+            else:
+                cursor.execute(f"DELETE FROM {table} WHERE season_id = %s", (season_id,))
+
+
+@pooled
+def migrate(connection):
+    """
+    Quita las claves foráneas, cambia la clave primaria de football_game y particiona
+    player_stats y football_game con una partición por cada temporada de la tabla season.
+    Las tablas que ya están particionadas se dejan como están.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT TABLE_NAME, CONSTRAINT_NAME FROM information_schema.TABLE_CONSTRAINTS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND CONSTRAINT_TYPE = 'FOREIGN KEY'"
+        )
+        existing = set(cursor.fetchall())
+        for table, name in FOREIGN_KEYS:
+            if (table, name) in existing:
+                cursor.execute(f"ALTER TABLE {table} DROP FOREIGN KEY {name}")
+                print(f"Clave foránea {name} eliminada de {table}.")
+
+        cursor.execute("SELECT season_id FROM season ORDER BY season_id")
+        season_ids = [row[0] for row in cursor.fetchall()]
+        partitions = ", ".join(
+            [f"PARTITION {partition_name(season_id)} VALUES IN ({int(season_id)})" for season_id in season_ids]
+            + [f"PARTITION {DEFAULT_PARTITION} DEFAULT"]
+        )
+
+        for table in PARTITIONED_TABLES:
+            if table_partitions(connection, table):
+                print(f"{table} ya está particionada.")
+                continue
+            inicio = time.perf_counter()
+            if table == 'football_game':
+                cursor.execute("ALTER TABLE football_game MODIFY season_id int(11) NOT NULL, "
+                               "DROP PRIMARY KEY, ADD PRIMARY KEY (match_id, season_id)")
+            cursor.execute(f"ALTER TABLE {table} PARTITION BY LIST (season_id) ({partitions})")
+            print(f"{table} particionada en {len(season_ids) + 1} particiones en {time.perf_counter() - inicio:.1f} s.")
+
+
+if __name__ == "__main__":
+    migrate(get_pool())
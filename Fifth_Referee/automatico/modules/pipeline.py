@@ -0,0 +1,601 @@
+"""
+Ingesta en flujo de una temporada: descarga, parseo y carga como tres etapas concurrentes.
+
+Cada partido pasa por las etapas de uno en uno. Entre etapas hay colas acotadas: si la carga
+en la base de datos se atrasa, las colas se llenan y el parseo y la descarga esperan, así que
+la memoria depende del tamaño de las colas y no del largo de la temporada. Los partidos se
+agrupan por jornada antes de cargarse y cada jornada se confirma en su propia transacción.
+
+Uso:
+    stream_season("premier_league", "2023_2024", season_id, matchday)
+
+Para volver a cargar una sola jornada desde match_data en una transacción:
+    python -m modules.pipeline <competición> <temporada> <season_id> <jornada>
+"""
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import argparse
+from queue import Queue
+from threading import Event, Lock, Thread
+import os
+import resource
+import time
+
+from modules.bundle import match_files, pack_matchday
+from modules.connector import (
+    delete_matches,
+    get_matchday_match_ids,
+    insert_match_details,
+    insert_player_stats,
+    insert_players
+)
+from modules.database import get_config, get_pool
+from modules.dataframe_builder import (
+    build_player_frame,
+    concat_frames,
+    extract_football_game,
+    extract_stats,
+    players,
+    positions
+)
+from modules.fetcher import HostLimiter, atomic_write_json, matchday_jobs
+from modules.manifest import IngestManifest
+from modules.match_record import parse_match
+from modules.partitions import ensure_season_partition
+from modules.staging import narrow_frame, schema_dtypes
+from modules.stat_catalog import get_catalog
+from modules.stats_cache import invalidate
+from modules.utils_dataframe import get_scraper
+
+DATA_PATH = "/home/sp3767/Documents/football_data"
+
+# Marca de fin de cola: cada etapa la pasa a la siguiente cuando terminan todos sus hilos
+_FIN = object()
+
+
+class MatchItem:
+    """
+    Un partido en tránsito por el pipeline.
+
+    Atributos:
+    - matchday (int), number (int): Jornada y número del partido en el .txt de la jornada.
+    - file_path (str): Ruta lógica match_data/<jornada>/<n>.json.
+    - txt_path (str): .txt de la jornada, para pedir los jugadores del partido.
+    - url (str): Línea del .txt a descargar; None si el archivo ya existe.
+    - players, player_frame, game, stats (pd.DataFrame): Se llenan en las etapas de descarga y parseo.
+    - error (Exception): Si una etapa falló, el partido sigue hasta la carga para cerrar su jornada.
+    """
+    def __init__(self, matchday, number, file_path, txt_path, url=None):
+        self.matchday = matchday
+        self.number = number
+        self.file_path = file_path
+        self.txt_path = txt_path
+        self.url = url
+        self.players = None
+        self.player_frame = None
+        self.game = None
+        self.stats = None
+        self.error = None
+
+    def __repr__(self):
+        return self.file_path
+
+
+class MatchdayBatch:
+    """
+    Partidos de una jornada listos para cargarse juntos. Con replace=True la carga
+    reemplaza todos los partidos que la jornada tenga en la base de datos.
+    """
+    def __init__(self, matchday, items, replace=False):
+        self.matchday = matchday
+        self.items = items
+        self.replace = replace
+        self.error = None
+
+    def __repr__(self):
+        return f"jornada {self.matchday}"
+
+
+class Stage:
+    """
+    Etapa del pipeline: `workers` hilos toman elementos de `inbox`, les aplican `function` y los
+    ponen en `outbox`. Un elemento que ya trae error pasa sin procesarse. Al recibir _FIN cada hilo
+    termina y el último la pasa a `outbox`.
+
+    Parámetros:
+    - name (str): Nombre de la etapa en el reporte.
+    - function: Recibe un elemento y lo devuelve procesado.
+    - inbox, outbox (Queue): Colas de entrada y salida; outbox puede ser None en la última etapa.
+    - workers (int): Hilos de la etapa.
+    """
+    def __init__(self, name, function, inbox, outbox=None, workers=1):
+        self.name = name
+        self.function = function
+        self.inbox = inbox
+        self.outbox = outbox
+        self.workers = workers
+        self.count = 0
+        self.errors = 0
+        self.busy = 0.0
+        self._lock = Lock()
+        self._alive = workers
+        self._threads = []
+
+    def start(self):
+        for n in range(self.workers):
+            thread = Thread(target=self._run, name=f"{self.name}-{n}")
+            thread.start()
+            self._threads.append(thread)
+
+    def join(self):
+        for thread in self._threads:
+            thread.join()
+
+    def _run(self):
+        while True:
+            item = self.inbox.get()
+            if item is _FIN:
+                # Se devuelve la marca para los demás hilos de la etapa
+                self.inbox.put(_FIN)
+                with self._lock:
+                    self._alive -= 1
+                    last = self._alive == 0
+                if last and self.outbox is not None:
+                    self.outbox.put(_FIN)
+                return
+
+            inicio = time.perf_counter()
+            failed = False
+            if item.error is None:
+                try:
+                    item = self.function(item)
+                except Exception as e:
+                    print(f"Error en la etapa {self.name} ({item!r}): {e}")
+                    item.error = e
+                    failed = True
+            with self._lock:
+                self.count += 1
+                self.errors += failed
+                self.busy += time.perf_counter() - inicio
+            if self.outbox is not None:
+                self.outbox.put(item)
+
+
+class QueueMonitor:
+    """
+    Muestrea la profundidad de las colas cada `interval` segundos en un hilo aparte.
+    """
+    def __init__(self, queues, interval=0.05):
+        self.queues = queues
+        self.interval = interval
+        self.samples = {name: [0, 0, 0] for name in queues}  # máximo, suma, muestras
+        self._stop = Event()
+        self._thread = Thread(target=self._run, name="queue-monitor")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            for name, queue in self.queues.items():
+                depth = queue.qsize()
+                sample = self.samples[name]
+                sample[0] = max(sample[0], depth)
+                sample[1] += depth
+                sample[2] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def report(self):
+        return {
+            name: {
+                'capacity': self.queues[name].maxsize,
+                'max': maximo,
+                'mean': total / muestras if muestras else 0.0,
+            }
+            for name, (maximo, total, muestras) in self.samples.items()
+        }
+
+
+class SeasonPipeline:
+    """
+    Descarga, parsea y carga los partidos pendientes de una temporada en flujo.
+
+    Un partido se descarga si su jornada es mayor a `matchday` y su archivo no existe, y se
+    procesa si se descargó o si el manifest lo tiene pendiente (nuevo, corregido o con error
+    de carga). Los partidos de una jornada se cargan juntos en una sola transacción.
+
+    Parámetros:
+    - competition_name (str), season_name (str), season_id (int): Temporada a actualizar.
+    - matchday (int): Última jornada cargada en la base de datos.
+    - fetch_workers, parse_workers, load_workers (int): Hilos de cada etapa. Con más de un hilo
+      de carga varias jornadas se cargan a la vez en conexiones distintas del pool.
+    - parse_processes (int): Si es mayor a 1, el parseo de los JSON se hace en procesos aparte
+      (el parseo es código Python y con hilos lo limita el GIL).
+    - queue_size (int): Partidos como máximo en cada cola entre etapas.
+    - scraper: Objeto con get_match_data(url) y get_players_info(url); el compartido si es None.
+    - pool (ConnectionPool): Pool de conexiones; el compartido si es None.
+    - data_path (str): Carpeta base de football_data.
+    - limiter (HostLimiter): Límite de cortesía por host para las descargas.
+    - bulk (dict): mode y batch_size de los INSERT (ver bulk_insert).
+    - storage (str): 'bundle' empaqueta cada jornada al terminar de cargarla.
+    """
+    def __init__(self, competition_name, season_name, season_id, matchday, fetch_workers=4, parse_workers=2,
+                 load_workers=1, parse_processes=1, queue_size=20, scraper=None, pool=None, data_path=DATA_PATH,
+                 limiter=None, bulk=None, storage='files'):
+        self.season_name = season_name
+        self.season_id = season_id
+        self.matchday = matchday
+        self.fetch_workers = fetch_workers
+        self.parse_workers = max(parse_workers, parse_processes)
+        self.load_workers = load_workers
+        self.parse_processes = parse_processes
+        self.queue_size = queue_size
+        self.scraper = scraper
+        self.pool = pool
+        self.limiter = limiter
+        self.bulk = bulk or {}
+        self.storage = storage
+        season_path = os.path.join(data_path, competition_name, season_name)
+        self.jornadas_path = os.path.join(season_path, "jornadas")
+        self.match_data_path = os.path.join(season_path, "match_data")
+        self.manifest = IngestManifest(os.path.join(season_path, "manifest.json"))
+        # El manifest se modifica desde las tres etapas
+        self.manifest_lock = Lock()
+        self.catalog = get_catalog()
+        # Tipos de schema.sql para las filas de cada partido (UInt8, float32...)
+        self.dtypes = schema_dtypes()
+        self._executor = None
+        self.loaded_matches = 0
+
+    def jobs(self):
+        """
+        Lista de MatchItem a procesar, ordenada por jornada y número de partido.
+        """
+        os.makedirs(self.match_data_path, exist_ok=True)
+        with self.manifest_lock:
+            pending = self.manifest.pending(self.match_data_path, loaded_matchday=self.matchday)
+        existing = set(match_files(self.match_data_path))
+
+        items = {}
+        for file_name in os.listdir(self.jornadas_path):
+            try:
+                file_matchday = int(os.path.splitext(file_name)[0])
+            except ValueError:
+                continue
+            if file_matchday <= self.matchday or not file_name.endswith('.txt'):
+                continue
+            txt_path = os.path.join(self.jornadas_path, file_name)
+            output_folder = os.path.join(self.match_data_path, str(file_matchday))
+            for number, (line, output_file) in enumerate(matchday_jobs(txt_path, output_folder), start=1):
+                if output_file not in existing:
+                    items[output_file] = MatchItem(file_matchday, number, output_file, txt_path, line)
+
+        for file_path in pending:
+            if file_path not in items:
+                file_matchday = int(os.path.basename(os.path.dirname(file_path)))
+                number = int(os.path.splitext(os.path.basename(file_path))[0])
+                txt_path = os.path.join(self.jornadas_path, f"{file_matchday}.txt")
+                items[file_path] = MatchItem(file_matchday, number, file_path, txt_path)
+        return sorted(items.values(), key=lambda item: (item.matchday, item.number))
+
+    def fetch(self, item):
+        """
+        Etapa de descarga: baja el partido si hace falta y pide sus jugadores.
+        """
+        if item.url is not None:
+            if self.limiter is None:
+                data = self.scraper.get_match_data(item.url)
+            else:
+                with self.limiter.slot(item.url):
+                    data = self.scraper.get_match_data(item.url)
+            atomic_write_json(data, item.file_path)
+            with self.manifest_lock:
+                self.manifest.track(item.file_path, self.matchday)
+        item.players = players(item.txt_path, {item.number}, scraper=self.scraper)
+        return item
+
+    def parse(self, item):
+        """
+        Etapa de parseo: lee el JSON una vez y construye las filas de player, football_game y player_stats.
+        """
+        try:
+            if self._executor is not None:
+                record = self._executor.submit(parse_match, item.file_path).result()
+            else:
+                record = parse_match(item.file_path)
+            item.player_frame = build_player_frame(item.players, positions(item.file_path, record), self.season_id)
+            item.game = extract_football_game(item.file_path, self.season_id, record)
+            item.game["season_id"] = self.season_id
+            item.game = narrow_frame(item.game, 'football_game', self.dtypes)
+            item.stats = extract_stats(item.file_path, record)
+            item.stats["season_id"] = self.season_id
+            item.stats = narrow_frame(item.stats, 'player_stats', self.dtypes)
+        except Exception as e:
+            with self.manifest_lock:
+                self.manifest.mark_parse_error(item.file_path, e)
+            raise
+        self.catalog.update([record], self.season_name)
+        with self.manifest_lock:
+            self.manifest.mark_parsed(item.file_path, int(item.game['match_id'].iloc[0]))
+        item.players = None
+        return item
+
+    def load(self, batch):
+        """
+        Etapa de carga: borra los partidos que se reemplazan, inserta los de la jornada y confirma
+        la transacción una sola vez, así que nadie ve la jornada a medio cargar. Si algo falla se
+        deshace la jornada completa y sus partidos quedan pendientes.
+        """
+        items = [item for item in batch.items if item.error is None]
+        if not items:
+            print(f"Jornada {batch.matchday}: ningún partido para cargar.")
+            return batch
+        files = [item.file_path for item in items]
+        player_frame = concat_frames([item.player_frame for item in items]).drop_duplicates(subset=['player_id', 'team_id'])
+        game = concat_frames([item.game for item in items])
+        stats = concat_frames([item.stats for item in items])
+        # La lista de trabajos conserva los MatchItem: sus filas se sueltan al cargarse la jornada
+        for item in items:
+            item.player_frame = item.game = item.stats = None
+        with self.manifest_lock:
+            replaced = self.manifest.replaced_match_ids(files)
+
+        with self.pool.connection() as connection:
+            if batch.replace:
+                # Todo lo que la jornada tenga cargado, además de los partidos que se recargan
+                matchday_id = batch.matchday + self.season_id * 50
+                replaced |= (get_matchday_match_ids(connection, matchday_id, lock=True, season_id=self.season_id)
+                             | set(game['match_id'].tolist()))
+            loaded = (delete_matches(connection, replaced, commit=False, season_id=self.season_id)
+                      and insert_players(connection, player_frame, commit=False, **self.bulk)
+                      and insert_match_details(connection, game, commit=False, **self.bulk)
+                      and insert_player_stats(connection, stats, commit=False, **self.bulk))
+            if loaded:
+                connection.commit()
+                # Con commit=False las funciones de carga no invalidan: se hace después de confirmar
+                invalidate([self.season_id])
+            else:
+                connection.rollback()
+
+        with self.manifest_lock:
+            if loaded:
+                self.manifest.mark_loaded(files)
+            if self.storage == 'bundle':
+                try:
+                    pack_matchday(self.match_data_path, batch.matchday, self.manifest)
+                except Exception as e:
+                    print(f"Error guardando el bundle de la jornada {batch.matchday}: {e}")
+            self.manifest.save()
+        self.catalog.save()
+        if not loaded:
+            raise RuntimeError(f"no se pudo cargar; {len(files)} partidos quedan pendientes")
+        self.loaded_matches += len(files)
+        print(f"Jornada {batch.matchday}: {len(files)} partidos cargados.")
+        return batch
+
+    def reingest(self, matchday):
+        """
+        Vuelve a cargar una jornada desde match_data: borra sus partidos de football_game y
+        player_stats y los inserta de nuevo en una sola transacción, sin tocar las demás jornadas.
+        Se recargan los archivos de match_data/<jornada>/ y los de otras carpetas cuyo partido
+        está cargado en esta jornada (por ejemplo, partidos aplazados). Si algún archivo no se
+        puede leer no se modifica la base de datos.
+
+        Retorno:
+        - bool: True si la jornada se reemplazó.
+        """
+        inicio = time.perf_counter()
+        self.scraper = self.scraper or get_scraper()
+        self.pool = self.pool or get_pool()
+        with self.pool.connection() as connection:
+            ensure_season_partition(connection, self.season_id)
+            loaded_ids = get_matchday_match_ids(connection, matchday + self.season_id * 50, season_id=self.season_id)
+
+        existing = match_files(self.match_data_path)
+        files = []
+        with self.manifest_lock:
+            for file_path in existing:
+                if int(os.path.basename(os.path.dirname(file_path))) == matchday:
+                    self.manifest.track(file_path)
+                    files.append(file_path)
+                    continue
+                entry = self.manifest.entry(file_path)
+                if entry is not None and entry['match_id'] in loaded_ids:
+                    files.append(file_path)
+
+        items = []
+        for file_path in files:
+            file_matchday = int(os.path.basename(os.path.dirname(file_path)))
+            number = int(os.path.splitext(os.path.basename(file_path))[0])
+            txt_path = os.path.join(self.jornadas_path, f"{file_matchday}.txt")
+            items.append(MatchItem(file_matchday, number, file_path, txt_path))
+        if not items:
+            print(f"No hay archivos de la jornada {matchday} en match_data.")
+            return False
+
+        def preparar(item):
+            try:
+                return self.parse(self.fetch(item))
+            except Exception as e:
+                print(f"Error procesando {item!r}: {e}")
+                item.error = e
+                return item
+
+        with ThreadPoolExecutor(max_workers=self.fetch_workers) as executor:
+            items = list(executor.map(preparar, items))
+        fallidos = [item for item in items if item.error is not None]
+        if fallidos:
+            with self.manifest_lock:
+                self.manifest.save()
+            print(f"La jornada {matchday} no se modificó: {len(fallidos)} archivos con errores.")
+            return False
+
+        parsed_ids = {int(item.game['match_id'].iloc[0]) for item in items}
+        sin_archivo = loaded_ids - parsed_ids
+        if sin_archivo:
+            print(f"{len(sin_archivo)} partidos de la jornada {matchday} no tienen archivo en match_data y se eliminan: "
+                  f"{sorted(sin_archivo)}")
+        try:
+            self.load(MatchdayBatch(matchday, items, replace=True))
+        except Exception as e:
+            print(f"La jornada {matchday} no se modificó: {e}")
+            return False
+        print(f"Jornada {matchday} recargada en {time.perf_counter() - inicio:.2f} s.")
+        return True
+
+    def _produce(self, jobs, outbox):
+        for item in jobs:
+            outbox.put(item)
+        outbox.put(_FIN)
+
+    def _collect(self, inbox, outbox, expected):
+        """
+        Agrupa los partidos parseados por jornada y pasa cada jornada completa a la carga.
+        """
+        grupos = {}
+        while True:
+            item = inbox.get()
+            if item is _FIN:
+                break
+            grupo = grupos.setdefault(item.matchday, [])
+            grupo.append(item)
+            if len(grupo) == expected[item.matchday]:
+                del grupos[item.matchday]
+                outbox.put(MatchdayBatch(item.matchday, grupo))
+        for file_matchday in sorted(grupos):
+            outbox.put(MatchdayBatch(file_matchday, grupos[file_matchday]))
+        outbox.put(_FIN)
+
+    def run(self):
+        """
+        Ejecuta el pipeline e imprime el rendimiento de cada etapa y la profundidad de las colas.
+
+        Retorno:
+        - dict: seconds, matches, loaded_matches, stages, queues y peak_rss_mb; None si no había partidos.
+        """
+        inicio = time.perf_counter()
+        jobs = self.jobs()
+        if not jobs:
+            with self.manifest_lock:
+                self.manifest.save()
+            print("No hay partidos nuevos ni modificados.")
+            return None
+        print(f"{len(jobs)} partidos para descargar o cargar.")
+        self.scraper = self.scraper or get_scraper()
+        self.pool = self.pool or get_pool()
+        # Es DDL: se crea antes de que la etapa de carga abra transacciones
+        with self.pool.connection() as connection:
+            ensure_season_partition(connection, self.season_id)
+        expected = Counter(item.matchday for item in jobs)
+
+        queues = {
+            'descarga': Queue(self.queue_size),
+            'parseo': Queue(self.queue_size),
+            'jornadas': Queue(self.queue_size),
+            'carga': Queue(self.load_workers),
+        }
+        stages = [
+            Stage('descarga', self.fetch, queues['descarga'], queues['parseo'], self.fetch_workers),
+            Stage('parseo', self.parse, queues['parseo'], queues['jornadas'], self.parse_workers),
+            Stage('carga', self.load, queues['carga'], None, self.load_workers),
+        ]
+        threads = [
+            Thread(target=self._produce, args=(jobs, queues['descarga']), name="productor"),
+            Thread(target=self._collect, args=(queues['jornadas'], queues['carga'], expected), name="jornadas"),
+        ]
+        monitor = QueueMonitor(queues)
+        if self.parse_processes > 1:
+            self._executor = ProcessPoolExecutor(max_workers=self.parse_processes)
+        try:
+            monitor.start()
+            for thread in threads:
+                thread.start()
+            for stage in stages:
+                stage.start()
+            for stage in stages:
+                stage.join()
+            for thread in threads:
+                thread.join()
+        finally:
+            monitor.stop()
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+        segundos = time.perf_counter() - inicio
+
+        report = {
+            'seconds': segundos,
+            'matches': len(jobs),
+            'loaded_matches': self.loaded_matches,
+            'stages': {
+                stage.name: {
+                    'items': stage.count,
+                    'errors': stage.errors,
+                    'busy': stage.busy,
+                    'per_sec': stage.count / segundos if segundos else 0.0,
+                }
+                for stage in stages
+            },
+            'queues': monitor.report(),
+            # ru_maxrss está en KB en Linux
+            'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        }
+        print(f"{self.loaded_matches} de {len(jobs)} partidos cargados en {segundos:.2f} s.")
+        for name, stage in report['stages'].items():
+            print(f"  etapa {name}: {stage['items']} elementos, {stage['errors']} errores, "
+                  f"{stage['per_sec']:.1f}/s, {stage['busy']:.2f} s ocupados")
+        for name, queue in report['queues'].items():
+            print(f"  cola {name}: máximo {queue['max']}/{queue['capacity']}, media {queue['mean']:.1f}")
+        print(f"  memoria máxima del proceso: {report['peak_rss_mb']:.0f} MB")
+        return report
+
+
+def _options(kwargs):
+    """
+    Opciones de SeasonPipeline: las de credentials.json (fetch_workers, parse_workers, load_workers,
+    parse_processes, pipeline_queue_size, bulk_mode, bulk_batch_size y storage), reemplazadas por kwargs.
+    """
+    config = get_config()
+    options = {
+        'fetch_workers': config.get('fetch_workers', 4),
+        'parse_workers': config.get('parse_workers', 2),
+        'load_workers': config.get('load_workers', 1),
+        'parse_processes': config.get('parse_processes', 1),
+        'queue_size': config.get('pipeline_queue_size', 20),
+        'bulk': {'mode': config.get('bulk_mode', 'insert'), 'batch_size': config.get('bulk_batch_size', 1000)},
+        'storage': config.get('storage', 'files'),
+    }
+    options.update(kwargs)
+    if 'limiter' not in options and options['fetch_workers'] > 1:
+        options['limiter'] = HostLimiter()
+    return options
+
+
+def stream_season(competition_name, season_name, season_id, matchday, **kwargs):
+    """
+    Descarga y carga en flujo los partidos pendientes de una temporada (ver SeasonPipeline).
+    Las opciones por defecto se leen de credentials.json.
+    """
+    return SeasonPipeline(competition_name, season_name, season_id, matchday, **_options(kwargs)).run()
+
+
+def reingest_matchday(competition_name, season_name, season_id, matchday, **kwargs):
+    """
+    Reemplaza en la base de datos una jornada con el contenido de match_data, en una sola
+    transacción (ver SeasonPipeline.reingest). Las opciones por defecto se leen de credentials.json.
+    """
+    pipeline = SeasonPipeline(competition_name, season_name, season_id, matchday, **_options(kwargs))
+    return pipeline.reingest(matchday)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vuelve a cargar una jornada desde match_data en una sola transacción.")
+    parser.add_argument("competition_name")
+    parser.add_argument("season_name")
+    parser.add_argument("season_id", type=int)
+    parser.add_argument("matchday", type=int)
+    args = parser.parse_args()
+    reingest_matchday(args.competition_name, args.season_name, args.season_id, args.matchday)
@@ -0,0 +1,350 @@
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+STAGING_PATH = "/home/sp3767/Documents/football_data/staging"
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "schema.sql")
+
+# Tablas que se guardan en staging, una por archivo Parquet en cada jornada
+TABLES = ('football_game', 'team', 'player', 'player_stats')
+
+# Tipos de schema.sql y su equivalente en pandas (los enteros admiten nulos como en la base de datos)
+SQL_DTYPES = {
+    'tinyint': 'Int8',
+    'tinyint unsigned': 'UInt8',
+    'smallint': 'Int16',
+    'smallint unsigned': 'UInt16',
+    'mediumint': 'Int32',
+    'mediumint unsigned': 'UInt32',
+    'int': 'Int32',
+    'int unsigned': 'UInt32',
+    'double': 'float64',
+    'float': 'float32',
+    'varchar': 'string',
+}
+
+# Rango de cada tipo entero de pandas; MEDIUMINT usa Int32/UInt32 pero su rango es menor
+INTEGER_RANGES = {
+    'Int8': (-2 ** 7, 2 ** 7 - 1),
+    'UInt8': (0, 2 ** 8 - 1),
+    'Int16': (-2 ** 15, 2 ** 15 - 1),
+    'UInt16': (0, 2 ** 16 - 1),
+    'Int32': (-2 ** 31, 2 ** 31 - 1),
+    'UInt32': (0, 2 ** 32 - 1),
+}
+SQL_RANGES = {
+    'mediumint': (-2 ** 23, 2 ** 23 - 1),
+    'mediumint unsigned': (0, 2 ** 24 - 1),
+}
+
+# Tipos enteros de menor a mayor, con el ancho que escribe mysqldump
+INTEGER_TYPES = [
+    ('tinyint unsigned', 'tinyint(3) unsigned'),
+    ('tinyint', 'tinyint(4)'),
+    ('smallint unsigned', 'smallint(5) unsigned'),
+    ('smallint', 'smallint(6)'),
+    ('mediumint unsigned', 'mediumint(8) unsigned'),
+    ('mediumint', 'mediumint(9)'),
+    ('int unsigned', 'int(10) unsigned'),
+    ('int', 'int(11)'),
+]
+
+
+def is_integer_dtype(dtype):
+    return dtype in INTEGER_RANGES
+
+
+def schema_types(path=SCHEMA_PATH):
+    """
+    Lee schema.sql y devuelve el tipo SQL de cada columna ('tinyint unsigned', 'double', ...),
+    sin el ancho de visualización, en el orden de la tabla.
+
+    Retorno:
+    - dict: {tabla: {columna: tipo}}.
+    """
+    types = {}
+    table = None
+    with open(path, 'r') as f:
+        for line in f:
+            match = re.match(r"CREATE TABLE `(\w+)`", line)
+            if match:
+                table = match.group(1)
+                types[table] = {}
+                continue
+            match = re.match(r"\s+`(\w+)` (\w+)(?:\([\d,]+\))?( unsigned)?", line)
+            if table and match:
+                types[table][match.group(1)] = match.group(2) + (match.group(3) or "")
+    return types
+
+
+def schema_dtypes(path=SCHEMA_PATH):
+    """
+    Lee schema.sql y devuelve los tipos de pandas de cada columna, en el orden de la tabla.
+    Las columnas que asigna la base de datos (insert_date) se omiten.
+
+    Retorno:
+    - dict: {tabla: {columna: dtype}}.
+    """
+    return {table: {column: SQL_DTYPES[sql_type] for column, sql_type in columns.items() if sql_type in SQL_DTYPES}
+            for table, columns in schema_types(path).items()}
+
+
+def type_ranges(types):
+    """
+    Rango (mínimo, máximo) de cada columna entera de {columna: tipo SQL}; las demás se omiten.
+    """
+    ranges = {}
+    for column, sql_type in types.items():
+        dtype = SQL_DTYPES.get(sql_type)
+        if is_integer_dtype(dtype):
+            ranges[column] = SQL_RANGES.get(sql_type, INTEGER_RANGES[dtype])
+    return ranges
+
+
+def column_ranges(table, path=SCHEMA_PATH):
+    """
+    Devuelve el rango (mínimo, máximo) de cada columna entera de una tabla según schema.sql.
+    """
+    return type_ranges(schema_types(path)[table])
+
+
+def table_types(connection, table='player_stats'):
+    """
+    Tipo actual de cada columna en la base de datos (que puede no coincidir con schema.sql si
+    la tabla todavía no se migró), sin el ancho de visualización: {columna: 'tinyint unsigned'}.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COLUMN_NAME, COLUMN_TYPE FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY ORDINAL_POSITION", (table,)
+        )
+        return {column: re.sub(r"\(\d+\)", "", column_type.lower()) for column, column_type in cursor.fetchall()}
+
+
+def type_range(sql_type):
+    return SQL_RANGES.get(sql_type) or INTEGER_RANGES[SQL_DTYPES[sql_type]]
+
+
+def propose(ranges, types, margin=2.0):
+    """
+    Elige el tipo más angosto de cada columna: para los enteros, el primero de INTEGER_TYPES cuyo
+    rango cubre el mínimo y el máximo multiplicados por el margen; DOUBLE pasa a FLOAT.
+    Una columna sin valores conserva su tipo.
+
+    Retorno:
+    - dict: {columna: (tipo actual, tipo propuesto, definición para ALTER TABLE)}; solo las que cambian.
+    """
+    proposal = {}
+    for column, (minimo, maximo) in ranges.items():
+        current = types[column]
+        if minimo is None:
+            continue
+        if current in ('double', 'float'):
+            if current == 'double':
+                proposal[column] = (current, 'float', 'float')
+            continue
+        low, high = min(0, minimo * margin), maximo * margin
+        for sql_type, definition in INTEGER_TYPES:
+            type_low, type_high = type_range(sql_type)
+            if type_low <= low and high <= type_high:
+                if sql_type != current:
+                    proposal[column] = (current, sql_type, definition)
+                break
+    return proposal
+
+
+def out_of_range(dataframe, table, ranges=None):
+    """
+    Busca valores que no caben en las columnas enteras de la tabla. La base de datos los
+    rechazaría (o, sin modo estricto, los recortaría al máximo del tipo sin avisar).
+    Sin ranges se usan los tipos de schema.sql; para validar contra la base de datos conectada,
+    pasar type_ranges(table_types(connection, table)).
+
+    Retorno:
+    - list: (columna, mínimo, máximo, rango permitido) de cada columna con valores fuera de rango.
+    """
+    problemas = []
+    for column, (low, high) in (column_ranges(table) if ranges is None else ranges).items():
+        if column not in dataframe.columns:
+            continue
+        values = pd.to_numeric(dataframe[column], errors='coerce')
+        minimo, maximo = values.min(), values.max()
+        if pd.notna(minimo) and (minimo < low or maximo > high):
+            problemas.append((column, minimo, maximo, (low, high)))
+    return problemas
+
+
+def out_of_range_rows(dataframe, problemas):
+    """
+    Marca las filas con algún valor fuera del rango de su columna, según lo que reportó out_of_range.
+
+    Retorno:
+    - np.ndarray: Un booleano por fila del DataFrame.
+    """
+    mask = np.zeros(len(dataframe), dtype=bool)
+    for column, _, _, (low, high) in problemas:
+        values = pd.to_numeric(dataframe[column], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        mask |= (values < low) | (values > high)
+    return mask
+
+
+def narrow_frame(dataframe, table, dtypes=None):
+    """
+    Devuelve el DataFrame con las columnas que existen en la tabla en los tipos de schema.sql,
+    sin agregar ni quitar columnas: uint8 para un TINYINT UNSIGNED, float32 para un FLOAT...
+    Los enteros con nulos usan el tipo de pandas que los admite (UInt8, Int32...).
+    Las columnas con valores que no caben en su tipo se dejan como están para que
+    out_of_range las reporte al insertarlas.
+    """
+    columns = (dtypes or schema_dtypes())[table]
+    targets = [column for column in dataframe.columns if columns.get(column, 'string') != 'string']
+    if not targets:
+        return dataframe
+    # Todas las columnas pasan juntas a un solo arreglo float64; astype columna por columna
+    # (sobre todo a los tipos con nulos de pandas) es varias veces más lento
+    try:
+        values = dataframe[targets].to_numpy(dtype='float64', na_value=np.nan)
+    except (TypeError, ValueError):
+        values = dataframe[targets].apply(pd.to_numeric, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    mask = np.isnan(values)
+
+    data = {column: dataframe[column] for column in dataframe.columns}
+    for i, column in enumerate(targets):
+        dtype = columns[column]
+        if not is_integer_dtype(dtype):
+            data[column] = values[:, i].astype(dtype)
+            continue
+        column_values, column_mask = np.round(values[:, i]), mask[:, i]
+        present = column_values[~column_mask]
+        low, high = INTEGER_RANGES[dtype]
+        if len(present) and (present.min() < low or present.max() > high):
+            continue
+        if column_mask.any():
+            column_values[column_mask] = 0
+            data[column] = pd.arrays.IntegerArray(column_values.astype(dtype.lower()), column_mask)
+        else:
+            data[column] = column_values.astype(dtype.lower())
+    # Un DataFrame nuevo agrupa las columnas del mismo tipo en un solo bloque
+    return pd.DataFrame(data, index=dataframe.index)
+
+
+def typed_frame(dataframe, table, dtypes=None):
+    """
+    Devuelve un DataFrame con las columnas y tipos de la tabla en schema.sql.
+    Las columnas que faltan quedan nulas y las que no existen en la tabla se descartan.
+
+    Parámetros:
+    - dataframe (pd.DataFrame): Datos construidos por dataframe_builder.
+    - table (str): Nombre de la tabla en schema.sql.
+    - dtypes (dict): Resultado de schema_dtypes, para no leer schema.sql en cada llamada.
+    """
+    columns = (dtypes or schema_dtypes())[table]
+    dataframe = dataframe.reset_index(drop=True)
+    sobrantes = [column for column in dataframe.columns if column not in columns]
+    if sobrantes:
+        print(f"Columnas de {table} que no están en schema.sql y no se guardan: {', '.join(map(str, sobrantes))}")
+
+    data = {}
+    for column, dtype in columns.items():
+        if column in dataframe.columns:
+            values = dataframe[column]
+        else:
+            values = pd.Series([pd.NA] * len(dataframe), dtype='object')
+        if dtype == 'string':
+            data[column] = values.astype('string')
+        elif is_integer_dtype(dtype):
+            data[column] = pd.to_numeric(values, errors='coerce').round().astype(dtype)
+        else:
+            data[column] = pd.to_numeric(values, errors='coerce').astype(dtype)
+    return pd.DataFrame(data, index=pd.RangeIndex(len(dataframe)))
+
+
+def matchday_path(competition_name, season_name, matchday):
+    """
+    Carpeta de staging de una jornada: staging/competition=<c>/season=<s>/matchday=<n>.
+    """
+    return os.path.join(STAGING_PATH, f"competition={competition_name}", f"season={season_name}", f"matchday={int(matchday)}")
+
+
+def staged_matchdays(competition_name, season_name):
+    """
+    Devuelve las jornadas de la temporada que ya están en staging, en orden.
+    """
+    season_path = os.path.dirname(matchday_path(competition_name, season_name, 0))
+    if not os.path.isdir(season_path):
+        return []
+    matchdays = []
+    for folder_name in os.listdir(season_path):
+        value = folder_name.split('=', 1)[-1]
+        if folder_name.startswith('matchday=') and value.isdigit():
+            matchdays.append(int(value))
+    return sorted(matchdays)
+
+
+def write_matchday(competition_name, season_name, matchday, frames):
+    """
+    Guarda las tablas de una jornada en Parquet, con los tipos de schema.sql.
+    Cada archivo se escribe en un temporal y se renombra, igual que los JSON de match_data.
+
+    Parámetros:
+    - frames (dict): {tabla: DataFrame} con las tablas de TABLES a guardar.
+
+    Retorno:
+    - bool: True si se guardaron todas las tablas.
+    """
+    if pyarrow is None:
+        print("pyarrow no está instalado; no se puede escribir el staging en Parquet.")
+        return False
+
+    folder = matchday_path(competition_name, season_name, matchday)
+    os.makedirs(folder, exist_ok=True)
+    dtypes = schema_dtypes()
+    for table, dataframe in frames.items():
+        if dataframe is None:
+            print(f"Jornada {matchday}: no hay datos de {table} para staging.")
+            continue
+        output_file = os.path.join(folder, f"{table}.parquet")
+        tmp_path = f"{output_file}.tmp"
+        try:
+            typed_frame(dataframe, table, dtypes).to_parquet(tmp_path, engine='pyarrow', index=False)
+            os.replace(tmp_path, output_file)
+        except Exception as e:
+            print(f"Error guardando {table} de la jornada {matchday} en staging: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+    return True
+
+
+def read_table(competition_name, season_name, table, matchday=0):
+    """
+    Lee una tabla de staging para las jornadas mayores a matchday.
+
+    Parámetros:
+    - table (str): Una de TABLES.
+    - matchday (int): Solo se leen las jornadas mayores a este número.
+
+    Retorno:
+    - pd.DataFrame: Tabla tipada según schema.sql (vacía si no hay jornadas en staging).
+    """
+    dtypes = schema_dtypes()
+    vacio = pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in dtypes[table].items()})
+    if pyarrow is None:
+        print("pyarrow no está instalado; no se puede leer el staging en Parquet.")
+        return vacio
+
+    frames = []
+    for staged in staged_matchdays(competition_name, season_name):
+        file_path = os.path.join(matchday_path(competition_name, season_name, staged), f"{table}.parquet")
+        if staged > matchday and os.path.exists(file_path):
+            frames.append(pd.read_parquet(file_path, engine='pyarrow'))
+    if not frames:
+        return vacio
+    return pd.concat(frames, ignore_index=True)
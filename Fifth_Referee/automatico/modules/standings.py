@@ -0,0 +1,131 @@
+"""
+Tabla de posiciones por jornada a partir de una tabla acumulada equipos × jornadas.
+
+Los resultados de la temporada se recorren una sola vez: cada partido suma sus PJ, PG, PE, PP,
+GF, GC y puntos en la celda (equipo, jornada) de local o de visitante, y una suma acumulada por
+jornadas deja en cada celda los totales hasta esa jornada. El orden de la tabla de cada jornada
+también se calcula al construirla, así que la tabla a cualquier jornada (total, de local o de
+visitante) es una lectura de una fila por equipo, sin volver a recorrer los partidos.
+
+Uso:
+    standings = Standings(results, teams)
+    standings.table()                       # última jornada
+    standings.table(matchday_id, 'local')   # solo partidos de local hasta esa jornada
+"""
+import numpy as np
+import pandas as pd
+
+# Estadísticas acumuladas, en el orden de la tercera dimensión de la tabla
+STAT_COLUMNS = ['PJ', 'PG', 'PE', 'PP', 'GF', 'GC', 'Pts']
+
+# Primera dimensión de la tabla: partidos de local, de visitante y todos
+VENUES = {'local': 0, 'visitante': 1, None: 2}
+
+RESULT_COLUMNS = ['team_id', 'matchday_id', 'home', 'goals_for', 'goals_against']
+
+
+def results_from_matches(matches):
+    """
+    Convierte una lista de objetos Match en las filas que usa Standings: una por equipo y partido,
+    con el mismo formato que team_matchday_results. Los partidos repetidos (cada partido está en
+    la lista de sus dos equipos) y los que no tienen marcador se omiten.
+    """
+    rows = []
+    seen = set()
+    for match in matches:
+        if match.match_id in seen or match.home_score is None or match.away_score is None:
+            continue
+        seen.add(match.match_id)
+        rows.append((match.home_team_id, match.matchday_id, 1, match.home_score, match.away_score))
+        rows.append((match.away_team_id, match.matchday_id, 0, match.away_score, match.home_score))
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+
+class Standings:
+    """
+    Tabla acumulada de una temporada y la clasificación a cada jornada.
+
+    El orden es por puntos, diferencia de goles y goles a favor; los empates se deshacen por
+    nombre del equipo.
+
+    Parámetros:
+    - results (pd.DataFrame): Una fila por equipo y partido con team_id, matchday_id, home,
+      goals_for y goals_against (team_matchday_results, MatchStore.results o results_from_matches).
+    - teams (dict): {team_id: nombre} de los equipos de la temporada. Los resultados de otros equipos se ignoran.
+    """
+    def __init__(self, results, teams):
+        names = sorted(teams.items(), key=lambda team: (str(team[1]), team[0]))
+        self.team_ids = np.array([team_id for team_id, _ in names])
+        self.team_names = np.array([name for _, name in names], dtype=object)
+        self.index = {team_id: i for i, team_id in enumerate(self.team_ids)}
+
+        results = results[results['team_id'].isin(self.index)]
+        self.matchdays = np.unique(results['matchday_id'].to_numpy(dtype='int64'))
+        team = results['team_id'].map(self.index).to_numpy()
+        matchday = np.searchsorted(self.matchdays, results['matchday_id'].to_numpy(dtype='int64'))
+        venue = np.where(results['home'].to_numpy(dtype='int64') == 1, VENUES['local'], VENUES['visitante'])
+        goals_for = results['goals_for'].to_numpy(dtype='int64')
+        goals_against = results['goals_against'].to_numpy(dtype='int64')
+        win, draw, loss = goals_for > goals_against, goals_for == goals_against, goals_for < goals_against
+        values = np.column_stack([np.ones(len(results), dtype='int64'), win, draw, loss,
+                                  goals_for, goals_against, 3 * win + draw])
+
+        # Una sola pasada por los resultados y una suma acumulada por jornadas
+        increments = np.zeros((len(VENUES), len(self.team_ids), len(self.matchdays), len(STAT_COLUMNS)), dtype='int32')
+        np.add.at(increments, (venue, team, matchday), values)
+        increments[VENUES[None]] = increments[VENUES['local']] + increments[VENUES['visitante']]
+        self.cumulative = increments.cumsum(axis=2)
+
+        # Orden de cada jornada: np.lexsort ordena por la última clave y desempata con las anteriores
+        points = self.cumulative[..., STAT_COLUMNS.index('Pts')]
+        goals_for = self.cumulative[..., STAT_COLUMNS.index('GF')]
+        difference = goals_for - self.cumulative[..., STAT_COLUMNS.index('GC')]
+        name_order = np.arange(len(self.team_ids))
+        self.order = np.empty((len(VENUES), len(self.matchdays), len(self.team_ids)), dtype='int64')
+        for v in range(len(VENUES)):
+            for m in range(len(self.matchdays)):
+                self.order[v, m] = np.lexsort((name_order, -goals_for[v, :, m], -difference[v, :, m], -points[v, :, m]))
+
+    def _position(self, matchday_id):
+        """
+        Columna de la tabla acumulada con los partidos hasta matchday_id (incluida); -1 si es
+        anterior a la primera jornada. Una jornada sin partidos usa la anterior.
+        """
+        if matchday_id is None:
+            return len(self.matchdays) - 1
+        return int(np.searchsorted(self.matchdays, matchday_id, side='right')) - 1
+
+    def table(self, matchday_id=None, venue=None):
+        """
+        Clasificación con los partidos hasta una jornada.
+
+        Parámetros:
+        - matchday_id (int): Jornada real (roundNum + season_id * 50). None para la última.
+        - venue (str): 'local' o 'visitante' para contar solo esos partidos; None para todos.
+
+        Retorno:
+        - pd.DataFrame: Posicion, Equipo (team_id), Nombre, PJ, PG, PE, PP, GF, GC, DG y Pts.
+        """
+        column = self._position(matchday_id)
+        if column < 0:
+            order = np.arange(len(self.team_ids))
+            totals = np.zeros((len(self.team_ids), len(STAT_COLUMNS)), dtype='int32')
+        else:
+            order = self.order[VENUES[venue], column]
+            totals = self.cumulative[VENUES[venue], order, column]
+        data = {'Posicion': np.arange(1, len(order) + 1), 'Equipo': self.team_ids[order], 'Nombre': self.team_names[order]}
+        for i, name in enumerate(STAT_COLUMNS[:-1]):
+            data[name] = totals[:, i]
+        data['DG'] = totals[:, STAT_COLUMNS.index('GF')] - totals[:, STAT_COLUMNS.index('GC')]
+        data['Pts'] = totals[:, STAT_COLUMNS.index('Pts')]
+        # Un solo constructor: armar la tabla columna por columna cuesta más que leerla
+        return pd.DataFrame(data)
+
+    def team_totals(self, team_id, matchday_id=None, venue=None):
+        """
+        Totales de un equipo hasta una jornada: {'PJ': ..., 'Pts': ...}.
+        """
+        column = self._position(matchday_id)
+        if column < 0:
+            return dict.fromkeys(STAT_COLUMNS, 0)
+        return dict(zip(STAT_COLUMNS, self.cumulative[VENUES[venue], self.index[team_id], column].tolist()))
@@ -0,0 +1,150 @@
+import json
+import os
+from threading import RLock
+
+from modules.staging import is_integer_dtype, schema_dtypes
+from modules.utils_dataframe import reemplazar_categoria
+
+CATALOG_PATH = "/home/sp3767/Documents/football_data/stat_catalog.json"
+
+# Estadísticas "x/y" que se separan en la columna base y su columna de totales
+lista_categorias_especiales = [
+    'barridas_ganadas', 'centros', 'duelos_aereos_ganados',
+    'pases_completados', 'pases_largos_completados',
+    'duelos_en_el_suelo_ganados', 'regates', "penales_atajados"
+]
+
+# Columnas de player_stats que no son estadísticas
+KEY_COLUMNS = ['player_id', 'team_id', 'match_id', 'season_id']
+
+
+class StatCatalog:
+    """
+    Catálogo persistente de las estadísticas de player_stats.
+
+    Cada estadística canónica guarda su tipo ('int' o 'float'), su columna de totales si es
+    una estadística "x/y", la primera temporada en que apareció y si existe en schema.sql.
+    Se inicializa con las columnas de schema.sql y se amplía con los nombres de cada archivo
+    nuevo, de modo que los constructores y los INSERT no necesitan recorrer match_data.
+    Se puede compartir entre hilos (el pipeline lo actualiza mientras otros hilos parsean y cargan).
+
+    Parámetros:
+    - path (str): Ruta del archivo JSON del catálogo.
+    """
+    def __init__(self, path=CATALOG_PATH):
+        self.path = path
+        self.stats = {}
+        self.changed = False
+        self._lock = RLock()
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.stats = json.load(f)['stats']
+        else:
+            self._seed()
+
+    def _seed(self):
+        columns = schema_dtypes()['player_stats']
+        for name, dtype in columns.items():
+            if name not in KEY_COLUMNS:
+                self.stats[name] = {
+                    'type': 'int' if is_integer_dtype(dtype) else 'float',
+                    'totales': None,
+                    'first_season': None,
+                    'in_schema': True,
+                }
+        for name in lista_categorias_especiales:
+            self.add(name, None)
+            self.add(reemplazar_categoria(name), None)
+        self.changed = True
+
+    def add(self, name, season_name):
+        """
+        Registra una estadística normalizada si no está en el catálogo.
+
+        Retorno:
+        - bool: True si era nueva.
+        """
+        special = name in lista_categorias_especiales
+        with self._lock:
+            entry = self.stats.get(name)
+            if entry is not None:
+                if special and entry['totales'] is None:
+                    entry['totales'] = reemplazar_categoria(name)
+                    self.changed = True
+                return False
+            self.stats[name] = {
+                'type': 'int' if special or name in ('minutes', 'goles') else 'float',
+                'totales': reemplazar_categoria(name) if special else None,
+                'first_season': season_name,
+                'in_schema': False,
+            }
+            self.changed = True
+            return True
+
+    def update(self, records, season_name):
+        """
+        Añade las estadísticas nuevas de una lista de MatchRecords.
+
+        Retorno:
+        - list: Nombres que no estaban en el catálogo.
+        """
+        nuevas = []
+        with self._lock:
+            for record in records:
+                try:
+                    names = record.stat_names
+                except Exception:
+                    continue
+                for name in dict.fromkeys(names):
+                    if self.add(name, season_name):
+                        nuevas.append(name)
+                        if self.stats[name]['totales']:
+                            self.add(self.stats[name]['totales'], season_name)
+        if nuevas:
+            print(f"Estadísticas nuevas en {season_name}: {', '.join(nuevas)}")
+        return nuevas
+
+    def initial_columns(self):
+        """
+        Columnas con las que empieza cada fila de player_stats en los constructores:
+        las claves player_id y match_id y las columnas de totales, en orden alfabético.
+        """
+        with self._lock:
+            totales = [entry['totales'] for entry in self.stats.values() if entry['totales']]
+        return sorted(set(['player_id', 'match_id'] + totales))
+
+    def insert_columns(self, available=None):
+        """
+        Columnas del INSERT en player_stats: las claves y las estadísticas que existen en schema.sql,
+        limitadas a las presentes en `available` si se da.
+        """
+        with self._lock:
+            columns = KEY_COLUMNS + [name for name, entry in self.stats.items() if entry['in_schema']]
+        if available is not None:
+            available = set(available)
+            columns = [column for column in columns if column in available]
+        return columns
+
+    def save(self):
+        with self._lock:
+            if not self.changed:
+                return
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'stats': self.stats}, f, indent=4, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self.changed = False
+
+
+_catalog = None
+
+
+def get_catalog():
+    """
+    Devuelve el catálogo compartido del proceso, leyéndolo del disco la primera vez.
+    """
+    global _catalog
+    if _catalog is None:
+        _catalog = StatCatalog()
+    return _catalog
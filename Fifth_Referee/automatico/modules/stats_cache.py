@@ -0,0 +1,121 @@
+"""
+Caché en memoria de las estadísticas detalladas de los jugadores de una temporada.
+
+Ver las estadísticas de un plantel jugador por jugador hacía una consulta por jugador. La caché
+lee con una sola consulta los totales de todos los jugadores de la temporada (player_season_stats,
+que ya tiene las sumas de player_stats) y, si se piden, sus filas por partido con otra (solo la
+partición de la temporada). Cada vista de un jugador es después una lectura del DataFrame.
+
+Las cachés se guardan por season_id y connector las invalida después de confirmar la inserción o
+el borrado de partidos o estadísticas de la temporada (con commit=False lo hace quien confirma,
+como pipeline), así que la próxima lectura vuelve a la base de datos. Los cambios hechos por otro
+proceso se ven después de invalidate().
+
+Las lecturas aceptan una conexión, el pool o None (el pool compartido), como las funciones de connector.
+
+Uso:
+    totals = season_stats(season_id).totals(connection)         # un jugador por fila
+    season_stats(season_id).player_totals(connection, player_id, team_id)
+"""
+import pandas as pd
+
+from modules.database import pooled
+from modules.staging import narrow_frame
+
+# Columnas que identifican al jugador; el resto son estadísticas
+PLAYER_KEY = ['player_id', 'team_id']
+
+_caches = {}
+
+
+@pooled
+def _read_frame(connection, query, params):
+    with connection.cursor() as cursor:
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        columns = [column[0] for column in cursor.description]
+    return pd.DataFrame(list(rows), columns=columns)
+
+
+class SeasonStats:
+    """
+    Totales y filas por partido de los jugadores de una temporada, leídos la primera vez que se piden.
+
+    Parámetros:
+    - season_id (int): Temporada.
+    """
+    def __init__(self, season_id):
+        self.season_id = season_id
+        self._totals = None
+        self._matches = None
+
+    def totals(self, connection):
+        """
+        Totales de la temporada de todos los jugadores.
+
+        Retorno:
+        - pd.DataFrame: Indexado por (player_id, team_id), con matches y una columna por estadística
+          (NULL como 0), en los tipos de schema.sql.
+        """
+        if self._totals is None:
+            frame = _read_frame(connection, "SELECT * FROM player_season_stats WHERE season_id = %s", (self.season_id,))
+            frame = narrow_frame(frame.fillna(0), 'player_season_stats')
+            self._totals = frame.drop(columns='season_id').set_index(PLAYER_KEY).sort_index()
+        return self._totals
+
+    def matches(self, connection):
+        """
+        Estadísticas de cada jugador en cada partido de la temporada.
+
+        Retorno:
+        - pd.DataFrame: Indexado por (player_id, team_id), con match_id y las columnas de player_stats
+          en los tipos de schema.sql (Int32, UInt8... las estadísticas pueden ser nulas).
+        """
+        if self._matches is None:
+            frame = _read_frame(connection, "SELECT * FROM player_stats WHERE season_id = %s", (self.season_id,))
+            frame = narrow_frame(frame, 'player_stats')
+            frame = frame.drop(columns=[column for column in ('season_id', 'insert_date') if column in frame.columns])
+            self._matches = frame.set_index(PLAYER_KEY).sort_index(kind='stable')
+        return self._matches
+
+    def player_totals(self, connection, player_id, team_id):
+        """
+        Totales de un jugador como diccionario {columna: valor}; None si no tiene estadísticas en la temporada.
+        """
+        totals = self.totals(connection)
+        key = (player_id, team_id)
+        if key not in totals.index:
+            return None
+        # to_dict conserva el tipo de cada columna (una fila de .loc pasaría los enteros a float)
+        return totals.loc[[key]].to_dict(orient='records')[0]
+
+    def player_matches(self, connection, player_id, team_id):
+        """
+        Filas por partido de un jugador, ordenadas por match_id (vacío si no jugó).
+        """
+        matches = self.matches(connection)
+        key = (player_id, team_id)
+        if key not in matches.index:
+            return matches.iloc[0:0].reset_index(drop=True)
+        return matches.loc[[key]].sort_values('match_id').reset_index(drop=True)
+
+
+def season_stats(season_id):
+    """
+    Caché de una temporada; se crea vacía la primera vez.
+    """
+    cache = _caches.get(season_id)
+    if cache is None:
+        cache = _caches[season_id] = SeasonStats(season_id)
+    return cache
+
+
+def invalidate(season_ids=None):
+    """
+    Descarta la caché de las temporadas indicadas (todas si es None), para que la próxima lectura vaya a la base de datos.
+    """
+    if season_ids is None:
+        _caches.clear()
+        return
+    for season_id in season_ids:
+        _caches.pop(int(season_id), None)
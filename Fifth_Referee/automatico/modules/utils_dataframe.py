@@ -1,33 +1,53 @@
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from collections import deque
-import json
+from functools import lru_cache
 import os
 import re
 import time
 from threading import Lock
 
-import LanusStats as ls 
-import pymysql as sql
 import pandas as pd
 from rapidfuzz import process, fuzz
 import requests
 
-pd.set_option('display.max_columns', None)
-pd.set_option('display.max_rows', None)
+from modules.bundle import BUNDLE_SUFFIX, bundle_members, matchday_of, pack_matchday, read_match
+from modules.cache import CachedScraper, ResponseCache
+from modules.database import get_config
+from modules.fetcher import HostLimiter, fetch_matches, matchday_jobs
 
-scraper = ls.ThreeSixFiveScores()
+# La caché y el scraper se crean la primera vez que se usan, no al importar el módulo
+_response_cache = None
+_scraper = None
 
-with open('/home/sp3767/Documents/files/credentials.json') as f:
-    config = json.load(f)
 
-connection = sql.connect(
-    user=config['DB_USER'],
-    password=config['DB_PASSWORD'],
-    host=config['DB_HOST'],
-    database=config['DB_NAME']
-    )
+def get_response_cache():
+    """
+    Devuelve la caché en disco de las respuestas de 365scores, creándola con credentials.json la primera vez.
+    """
+    global _response_cache
+    if _response_cache is None:
+        config = get_config()
+        _response_cache = ResponseCache(
+            config.get('folder_path_cache', '/home/sp3767/Documents/football_data/.cache'),
+            max_bytes=config.get('cache_max_bytes', 512 * 1024 * 1024),
+            ttl=config.get('cache_ttl', 3600),
+            offline=config.get('cache_offline', False)
+        )
+    return _response_cache
+
 
-def extractor_data_match(competition_name, season_name, folder_path, matchday):
+def get_scraper():
+    """
+    Devuelve el scraper de 365scores. Todas las llamadas pasan por la caché en disco.
+    LanusStats se importa aquí porque tarda en cargar y solo lo necesitan las descargas.
+    """
+    global _scraper
+    if _scraper is None:
+        import LanusStats as ls
+        _scraper = CachedScraper(ls.ThreeSixFiveScores(), get_response_cache())
+    return _scraper
+
+def extractor_data_match(competition_name, season_name, folder_path, matchday, workers=1, max_per_host=2, min_interval=0.0, storage='files'):
     """
     Procesa archivos .txt con nombres mayores al matchday y genera archivos JSON para los datos de los partidos.
 
@@ -36,12 +56,18 @@ def extractor_data_match(competition_name, season_name, folder_path, matchday):
     - season_name (str): Nombre de la temporada.
     - folder_path (str): Ruta de la carpeta donde se encuentran los archivos .txt.
     - matchday (int): Matchday de referencia. Solo se procesan archivos con números mayores.
+    - workers (int): Descargas simultáneas. Con 1 se mantiene la descarga secuencial.
+    - max_per_host (int): Máximo de solicitudes simultáneas contra un mismo host.
+    - min_interval (float): Segundos mínimos entre solicitudes al mismo host.
+    - storage (str): 'files' guarda un JSON por partido; 'bundle' guarda un bundle comprimido por jornada.
 
     Retorno:
     - None: Genera archivos JSON en las carpetas correspondientes.
     """
+    jobs = []
+    jornadas = []
     # Recorrer los archivos en la carpeta
-    for file_name in os.listdir(folder_path):
+    for file_name in sorted(os.listdir(folder_path)):
         # Intentar extraer el número del nombre del archivo
         try:
             file_matchday = int(os.path.splitext(file_name)[0])  # Extraer número antes del .txt
@@ -53,36 +79,40 @@ def extractor_data_match(competition_name, season_name, folder_path, matchday):
             file_path = os.path.join(folder_path, file_name)
             if os.path.isfile(file_path):
                 try:
-                    # Leer el archivo y procesar cada línea
-                    with open(file_path, 'r') as reader:
-                        output_folder = f"/home/sp3767/Documents/football_data/{competition_name}/{season_name}/match_data/{file_matchday}"
-                        os.makedirs(output_folder, exist_ok=True)  # Crear la carpeta si no existe
-
-                        id = 1
-                        for line in reader:
-                            output_file = os.path.join(output_folder, f"{id}.json")
-                            match = scraper.get_match_data(line)
-                            with open(output_file, 'w') as archivo:
-                                json.dump(match, archivo, indent=4)  # Guardar en formato JSON
-                                id += 1
-                        print(f"la jornada {file_matchday} fue extraída exitosamente.")
+                    output_folder = f"/home/sp3767/Documents/football_data/{competition_name}/{season_name}/match_data/{file_matchday}"
+                    jobs.extend(matchday_jobs(file_path, output_folder))
+                    jornadas.append(file_matchday)
                 except Exception as e:
                     print(f"Error procesando {file_path}: {e}")
 
+    # Todas las jornadas comparten el mismo pool para solapar las esperas de red
+    limiter = HostLimiter(max_per_host, min_interval) if workers > 1 else None
+    fallidos = fetch_matches(get_scraper(), jobs, workers=workers, limiter=limiter)
+    carpetas_fallidas = {os.path.basename(os.path.dirname(path)) for path in fallidos}
+    for file_matchday in jornadas:
+        if storage == 'bundle':
+            try:
+                pack_matchday(f"/home/sp3767/Documents/football_data/{competition_name}/{season_name}/match_data", file_matchday)
+            except Exception as e:
+                print(f"Error guardando el bundle de la jornada {file_matchday}: {e}")
+        if str(file_matchday) in carpetas_fallidas:
+            print(f"la jornada {file_matchday} se extrajo con errores.")
+        else:
+            print(f"la jornada {file_matchday} fue extraída exitosamente.")
+    get_response_cache().report()
+
 def extractor_data_match_checker(folder_path):
 
     # Obtener la lista de carpetas dentro del path
     items = os.listdir(folder_path)
-    folders = [item for item in items if os.path.isdir(os.path.join(folder_path, item))]
+    folders = [item for item in items if os.path.isdir(os.path.join(folder_path, item)) or item.endswith(BUNDLE_SUFFIX)]
 
-    # Filtrar las carpetas que son números
+    # Filtrar las carpetas (o bundles de jornada) que son números
     numbered_folders = []
     for folder in folders:
-        try:
-            number = int(folder)  # Intentar convertir el nombre de la carpeta a un número
+        number = matchday_of(folder)
+        if number is not None:
             numbered_folders.append(number)
-        except ValueError:
-            continue  # Ignorar carpetas que no sean números
     # Si no hay carpetas numeradas, devolver None o lanzar una excepción
     if not numbered_folders:
         return 0
@@ -102,30 +132,26 @@ def folder_creation_season(competition_id, season_name):
 
 ## Utilidades:
 
+# Equivale a los reemplazos encadenados que se aplicaban después de lower(): ninguno produce
+# un carácter que otro reemplazo vuelva a cambiar, así que se pueden aplicar de una vez
+TABLA_ESTADISTICAS = str.maketrans({
+    "á": "a", "é": "e", "í": "i", "ó": "o", "ú": "u",
+    "Á": "A", "É": "E", "Í": "I", "Ó": "O", "Ú": "U",
+    "ñ": "n", "Ñ": "N",
+    " ": "_", "(": None, ")": None,
+})
+
+@lru_cache(maxsize=1024)
 def reemplazar(texto):
     """
     Reemplaza caracteres especiales y espacios en blanco por guiones bajos.
+    Hay unos 60 nombres de estadísticas distintos, así que el resultado se memoriza.
     Parametro: texto (str)
     Retorna: texto (str) con los caracteres reemplazados.
     """
-    texto = texto.lower()
-    texto = texto.replace("á", "a")
-    texto = texto.replace("é", "e")
-    texto = texto.replace("í", "i")
-    texto = texto.replace("ó", "o")
-    texto = texto.replace("ú", "u")
-    texto = texto.replace("Á", "A")
-    texto = texto.replace("É", "E")
-    texto = texto.replace("Í", "I")
-    texto = texto.replace("Ó", "O")
-    texto = texto.replace("Ú", "U")
-    texto = texto.replace("ñ", "n")
-    texto = texto.replace("Ñ", "N")
-    texto = texto.replace(" ", "_")
-    texto = texto.replace("(", "")
-    texto = texto.replace(")", "")
-    return texto
+    return texto.lower().translate(TABLA_ESTADISTICAS)
 
+@lru_cache(maxsize=1024)
 def reemplazar_categoria(texto):
     texto = texto.replace("_ganadas","_totales")
     texto = texto.replace("centros","centros_totales")
@@ -135,22 +161,37 @@ def reemplazar_categoria(texto):
     texto = texto.replace("penales_atajados","penales_totales")
     return texto
 
-def extract_stats_names(file_path):
+def reporte_normalizacion():
+    """
+    Imprime y devuelve los aciertos y fallos de las cachés de reemplazar y reemplazar_categoria.
+    """
+    reporte = {}
+    for funcion in (reemplazar, reemplazar_categoria):
+        info = funcion.cache_info()
+        reporte[funcion.__name__] = {'hits': info.hits, 'misses': info.misses, 'size': info.currsize}
+        total = info.hits + info.misses
+        print(f"{funcion.__name__}: {info.hits} aciertos, {info.misses} fallos "
+              f"({info.hits / total * 100 if total else 0:.1f}% aciertos), {info.currsize} nombres")
+    return reporte
+
+def extract_stats_names(file_path, record=None):
     '''
     Extrae los valores bajo la clave "name" dentro de "stats" para cada miembro del equipo en homeCompetitor y awayCompetitor.
     
     Parámetro:
     - file_path (str): La ruta del archivo JSON.
+    - record (MatchRecord): Registro ya parseado del archivo; si se da, no se vuelve a leer.
     
     Retorna:
     - Una lista con todos los valores de la clave "name" encontrados en "stats".
     '''
+    if record is not None:
+        return record.stat_names
 
     stats_names = []
 
-    # Cargar el archivo JSON
-    with open(file_path, 'r') as f:
-        data = json.load(f)
+    # Cargar el partido (archivo suelto o bundle de la jornada)
+    data = read_match(file_path)
 
     # Acceder a homeCompetitor y awayCompetitor
     for competitor in ['homeCompetitor', 'awayCompetitor']:
@@ -168,18 +209,24 @@ def extract_stats_names(file_path):
 
     return stats_names
 
-def name_stats(folder_path):
+def name_stats(folder_path, records=None):
     '''
         Applies the function teams and positions to all the files in a folder.
         parameter: folder (str).
+        parameter: records, already parsed MatchRecords by path. (dict)
         return: Dataframe.
     '''
     all_stats_names = set()
     for root, _, files in os.walk(folder_path):
         for file_name in files:
             if file_name.endswith('.json'):
-                file_path = os.path.join(root, file_name)  # Ruta completa al archivo
-                stats_names = extract_stats_names(file_path)
+                file_paths = [os.path.join(root, file_name)]  # Ruta completa al archivo
+            elif file_name.endswith(BUNDLE_SUFFIX):
+                file_paths = bundle_members(os.path.join(root, file_name))
+            else:
+                continue
+            for file_path in file_paths:
+                stats_names = extract_stats_names(file_path, (records or {}).get(file_path))
                 all_stats_names.update(stats_names)
     final = ["player_id","match_id","barridas_totales","centros_totales", "duelos_aereos_totales","pases_totales","pases_largos_totales", "duelos_en_el_suelo_totales","regates_totales","penales_totales","match_id"]
     all_stats_names.update(final)
@@ -201,11 +248,6 @@ def filter_existing_players(connection, df):
     
     return df_filtered
 
-headers = {
-    "X-Auth-Token": config["X-Auth-Token"]
-}
-url = "https://api.football-data.org/v4/competitions/"
-
 def obtener_dataframe_liga(nombre_liga, max_requests=5, period=60, max_workers=5):
     """
     Extrae un DataFrame con información de los equipos de una liga específica.
@@ -221,7 +263,7 @@ def obtener_dataframe_liga(nombre_liga, max_requests=5, period=60, max_workers=5
         pd.DataFrame: DataFrame con información de los equipos (nombre, ciudad, estadio).
     """
     # Configuración
-    headers = {"X-Auth-Token": config["X-Auth-Token"]}
+    headers = {"X-Auth-Token": get_config()["X-Auth-Token"]}
     timestamps = deque()
     def rate_limit():
         """Gestiona el límite de solicitudes usando una cola de tiempos."""
@@ -43,19 +43,18 @@ CREATE TABLE `football_game` (
   `matchday_id` int(11) DEFAULT NULL,
   `home_team_id` int(11) DEFAULT NULL,
   `away_team_id` int(11) DEFAULT NULL,
-  `season_id` int(11) DEFAULT NULL,
+  `season_id` int(11) NOT NULL,
   `home_score` int(11) DEFAULT NULL,
   `away_score` int(11) DEFAULT NULL,
   `duration` int(11) DEFAULT NULL,
   `insert_date` timestamp NULL DEFAULT current_timestamp(),
-  PRIMARY KEY (`match_id`),
+  PRIMARY KEY (`match_id`,`season_id`),
   KEY `home_team_id` (`home_team_id`,`season_id`),
   KEY `away_team_id` (`away_team_id`,`season_id`),
-  KEY `matchday_id` (`matchday_id`),
-  CONSTRAINT `football_game_ibfk_1` FOREIGN KEY (`home_team_id`, `season_id`) REFERENCES `team` (`team_id`, `season_id`),
-  CONSTRAINT `football_game_ibfk_2` FOREIGN KEY (`away_team_id`, `season_id`) REFERENCES `team` (`team_id`, `season_id`),
-  CONSTRAINT `football_game_ibfk_3` FOREIGN KEY (`matchday_id`) REFERENCES `matchday` (`matchday_id`)
-) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+  KEY `matchday_id` (`matchday_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+ PARTITION BY LIST (`season_id`)
+(PARTITION `pdefault` DEFAULT ENGINE = InnoDB);
 /*!40101 SET character_set_client = @saved_cs_client */;
 
 --
@@ -94,6 +93,82 @@ CREATE TABLE `player` (
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
+--
+-- Table structure for table `player_season_stats`
+--
+
+DROP TABLE IF EXISTS `player_season_stats`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!40101 SET character_set_client = utf8 */;
+CREATE TABLE `player_season_stats` (
+  `player_id` int(11) NOT NULL,
+  `team_id` int(11) NOT NULL,
+  `season_id` int(11) NOT NULL,
+  `matches` int(11) NOT NULL DEFAULT 0,
+  `asistencias` int(11) DEFAULT NULL,
+  `asistencias_esperadas` double DEFAULT NULL,
+  `barridas_ganadas` int(11) DEFAULT NULL,
+  `barridas_totales` int(11) DEFAULT NULL,
+  `big_chances_scored` int(11) DEFAULT NULL,
+  `centros` int(11) DEFAULT NULL,
+  `centros_totales` int(11) DEFAULT NULL,
+  `chances_perdidas` int(11) DEFAULT NULL,
+  `despeje_con_los_punos` int(11) DEFAULT NULL,
+  `despejes` int(11) DEFAULT NULL,
+  `despejes_por_alto` int(11) DEFAULT NULL,
+  `duelos_aereos_ganados` int(11) DEFAULT NULL,
+  `duelos_aereos_totales` int(11) DEFAULT NULL,
+  `duelos_en_el_suelo_ganados` int(11) DEFAULT NULL,
+  `duelos_en_el_suelo_totales` int(11) DEFAULT NULL,
+  `error_que_llevo_al_gol` int(11) DEFAULT NULL,
+  `errores_que_terminan_el_disparo` int(11) DEFAULT NULL,
+  `faltas_cometidas` int(11) DEFAULT NULL,
+  `faltas_recibidas` int(11) DEFAULT NULL,
+  `fueras_de_juego` int(11) DEFAULT NULL,
+  `goles` int(11) DEFAULT NULL,
+  `goles_esperados` double DEFAULT NULL,
+  `goles_esperados_al_arco_concedidos` double DEFAULT NULL,
+  `goles_esperados_de_remates_al_arco` double DEFAULT NULL,
+  `goles_esperados_evitados` double DEFAULT NULL,
+  `goles_recibidos` int(11) DEFAULT NULL,
+  `grandes_chances` int(11) DEFAULT NULL,
+  `intercepciones` int(11) DEFAULT NULL,
+  `jugo_como_libero` int(11) DEFAULT NULL,
+  `minutes` int(11) DEFAULT NULL,
+  `pases_claves` int(11) DEFAULT NULL,
+  `pases_completados` int(11) DEFAULT NULL,
+  `pases_en_el_ultimo_tercio` int(11) DEFAULT NULL,
+  `pases_hacia_atras` int(11) DEFAULT NULL,
+  `pases_largos_completados` int(11) DEFAULT NULL,
+  `pases_largos_totales` int(11) DEFAULT NULL,
+  `pases_totales` int(11) DEFAULT NULL,
+  `pelotas_al_poste` int(11) DEFAULT NULL,
+  `penal_fallado` int(11) DEFAULT NULL,
+  `penales_atajados` int(11) DEFAULT NULL,
+  `penales_cometidos` int(11) DEFAULT NULL,
+  `penales_ganados` int(11) DEFAULT NULL,
+  `penales_totales` int(11) DEFAULT NULL,
+  `posesiones_ganadas_en_el_ultimo_tercio` int(11) DEFAULT NULL,
+  `posesiones_perdidas` int(11) DEFAULT NULL,
+  `recuperacion_de_la_posesion` int(11) DEFAULT NULL,
+  `regateado` int(11) DEFAULT NULL,
+  `regates` int(11) DEFAULT NULL,
+  `regates_totales` int(11) DEFAULT NULL,
+  `remates_a_puerta` int(11) DEFAULT NULL,
+  `remates_bloqueados` int(11) DEFAULT NULL,
+  `remates_fuera` int(11) DEFAULT NULL,
+  `salvadas_de_portero` int(11) DEFAULT NULL,
+  `salvadas_en_el_area` int(11) DEFAULT NULL,
+  `toques` int(11) DEFAULT NULL,
+  `total_remates` int(11) DEFAULT NULL,
+  PRIMARY KEY (`player_id`,`team_id`,`season_id`),
+  KEY `season_id` (`season_id`),
+  KEY `team_id` (`team_id`,`season_id`),
+  CONSTRAINT `player_season_stats_ibfk_1` FOREIGN KEY (`player_id`, `team_id`) REFERENCES `player` (`player_id`, `team_id`) ON DELETE CASCADE,
+  CONSTRAINT `player_season_stats_ibfk_2` FOREIGN KEY (`team_id`, `season_id`) REFERENCES `team` (`team_id`, `season_id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
 --
 -- Table structure for table `player_stats`
 --
@@ -164,11 +239,10 @@ CREATE TABLE `player_stats` (
   `total_remates` int(11) DEFAULT NULL,
   PRIMARY KEY (`player_id`,`team_id`,`season_id`,`match_id`),
   KEY `team_id` (`team_id`,`season_id`),
-  KEY `match_id` (`match_id`),
-  CONSTRAINT `player_stats_ibfk_1` FOREIGN KEY (`player_id`, `team_id`) REFERENCES `player` (`player_id`, `team_id`) ON DELETE CASCADE,
-  CONSTRAINT `player_stats_ibfk_2` FOREIGN KEY (`team_id`, `season_id`) REFERENCES `team` (`team_id`, `season_id`) ON DELETE CASCADE,
-  CONSTRAINT `player_stats_ibfk_3` FOREIGN KEY (`match_id`) REFERENCES `football_game` (`match_id`) ON DELETE CASCADE
-) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+  KEY `match_id` (`match_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+ PARTITION BY LIST (`season_id`)
+(PARTITION `pdefault` DEFAULT ENGINE = InnoDB);
 /*!40101 SET character_set_client = @saved_cs_client */;
 
 --
@@ -204,6 +278,29 @@ CREATE TABLE `team` (
   CONSTRAINT `team_ibfk_1` FOREIGN KEY (`season_id`) REFERENCES `season` (`season_id`) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `team_matchday_results`
+--
+
+DROP TABLE IF EXISTS `team_matchday_results`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!40101 SET character_set_client = utf8 */;
+CREATE TABLE `team_matchday_results` (
+  `team_id` int(11) NOT NULL,
+  `match_id` int(11) NOT NULL,
+  `season_id` int(11) NOT NULL,
+  `matchday_id` int(11) NOT NULL,
+  `home` tinyint(1) NOT NULL,
+  `goals_for` int(11) NOT NULL,
+  `goals_against` int(11) NOT NULL,
+  `points` tinyint(4) NOT NULL,
+  PRIMARY KEY (`team_id`,`match_id`),
+  KEY `season_id` (`season_id`,`matchday_id`),
+  KEY `match_id` (`match_id`),
+  CONSTRAINT `team_matchday_results_ibfk_2` FOREIGN KEY (`team_id`, `season_id`) REFERENCES `team` (`team_id`, `season_id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
 /*!40103 SET TIME_ZONE=@OLD_TIME_ZONE */;
 
 /*!40101 SET SQL_MODE=@OLD_SQL_MODE */;
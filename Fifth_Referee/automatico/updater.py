@@ -1,9 +1,6 @@
-import json
 import os
 from datetime import datetime
 
-import pymysql as sql
-
 from modules.connector import (
     get_competitions,
     get_matchday,
@@ -15,6 +12,8 @@ from modules.connector import (
     insert_teams,
     update_season,
 )
+from modules.database import get_config, get_pool
+from modules.pipeline import reingest_matchday, stream_season
 from modules.utils_dataframe import (
     extractor_data_match,
     extractor_data_match_checker,
@@ -23,17 +22,8 @@ from modules.utils_dataframe import (
 )
 
 
-with open('/home/sp3767/Documents/files/credentials.json') as f:
-    config = json.load(f)
-
-connection = sql.connect(
-    user=config['DB_USER'],
-    password=config['DB_PASSWORD'],
-    host=config['DB_HOST'],
-    database=config['DB_NAME']
-    )
-
-cursor = connection.cursor()
+# Cada llamada a connector recibe el pool compartido: toma una conexión y la devuelve al terminar.
+# El pool y la configuración se crean al usarlos por primera vez, no al importar.
 
 def main_menu():
     while True:
@@ -50,7 +40,7 @@ def main_menu():
             competition_options(main_menu)
 
 def competition_options(opcion):
-    competition_list = get_competitions(connection)
+    competition_list = get_competitions(get_pool())
     if opcion == 1:
         print("Competiciones disponibles:")
         contador = 0
@@ -67,7 +57,7 @@ def competition_options(opcion):
         competition_name = input("Ingresa el nombre de la competición: ").replace(" ","_").lower() 
         existing_competitions = [competition[1] for competition in competition_list]
         if competition_name not in existing_competitions:
-            insert_competitions(connection, competition_name)
+            insert_competitions(get_pool(), competition_name)
             print(f"Competición '{competition_name.replace('_', ' ').title()}' ha sido creada exitosamente.")
             folder_creation_competition(competition_name)
         else:
@@ -79,7 +69,7 @@ def competition_options(opcion):
 ## Temporada:
 
 def season_main_menu(season_options, competition_id, competition_name):
-    season_list = get_seasons(connection, competition_id)
+    season_list = get_seasons(get_pool(), competition_id)
     if season_options == 3:
         main_menu()
     else:
@@ -87,7 +77,7 @@ def season_main_menu(season_options, competition_id, competition_name):
             if len(season_list) < 1:
                 print("No hay temporadas disponibles.")
                 season_name = input("Ingresa la temporada con el formato XXXX/XXXX:").replace("/","_")
-                insert_season(connection, competition_id, season_name)
+                insert_season(get_pool(), competition_id, season_name)
                 folder_creation_season(competition_name, season_name)
                 season_main_menu(season_options,competition_id,competition_name)
             else:
@@ -97,10 +87,10 @@ def season_main_menu(season_options, competition_id, competition_name):
                     print(f"{contador}. {season[2].replace('_', '/')}")
                 season_choice = int(input("Selecciona una temporada: "))
                 selected_season = list(season_list[season_choice - 1])
-                matchdays = list(get_matchday(connection, selected_season[0]))
+                matchdays = list(get_matchday(get_pool(), selected_season[0]))
                 if len(matchdays) < 1:
                     matchdays = int(input("Ingresa el número de jornadas: "))
-                    insert_matchdays(connection, matchdays, selected_season[0])
+                    insert_matchdays(get_pool(), matchdays, selected_season[0])
                     
             selected_teams = [None, None]
             selected_season_menu(selected_season, selected_teams, competition_name)
@@ -110,42 +100,53 @@ def season_main_menu(season_options, competition_id, competition_name):
             if season_list:
                 existing_seasons = [season[2] for season in season_list]
                 if season_name not in existing_seasons:
-                    insert_season(connection, competition_id, season_name)
+                    insert_season(get_pool(), competition_id, season_name)
                     folder_creation_season(competition_name, season_name)
                 else:
                     print(f"La temporada '{season_name.replace('_', ' ').title()}' ya existe.")
 
             else:
-                insert_season(connection, competition_id, season_name)
+                insert_season(get_pool(), competition_id, season_name)
                 folder_creation_season(competition_name, season_name)
 
 def selected_season_menu(selected_season, selected_teams, competition_name):
     season_id = int(selected_season[0])
     season_name = selected_season[2]
+    config = get_config()
     folder_path = config['folder_path_matchday'].format(competition_name=competition_name,season_name=season_name)
     folder_path_checker = config['folder_path_match_data'].format(competition_name=competition_name,season_name=season_name)
     try:
-        matchday_id, last_insert_date, days_since_update = get_matchday_information(connection, season_id)
+        matchday_id, last_insert_date, days_since_update = get_matchday_information(get_pool(), season_id)
         matchday = int(matchday_id) - season_id * 50
         print(f"Ultimo Matchday añadido: {matchday}\nFecha: {last_insert_date}\nDías desde última actualización:{days_since_update}")
     except:
         matchday = 0
-        extractor_data_match(competition_name, season_name, folder_path, extractor_data_match_checker(folder_path_checker))
-        insert_teams(connection, competition_name, season_name, season_id)
+        extractor_data_match(competition_name, season_name, folder_path, extractor_data_match_checker(folder_path_checker), workers=config.get('fetch_workers', 1), storage=config.get('storage', 'files'))
+        insert_teams(get_pool(), competition_name, season_name, season_id)
         print("No hay jornadas disponibles.")
-    season_submenu_options = int(input("1. Actualizar información\n2. Regresar al menu principal. \nSelecciona una opción: "))
+    season_submenu_options = int(input("1. Actualizar información\n2. Recargar una jornada.\n3. Regresar al menu principal. \nSelecciona una opción: "))
     if season_submenu_options == 1:
-        extractor_data_match(competition_name, season_name, folder_path, extractor_data_match_checker(folder_path_checker))
+        if not config.get('pipeline', False):
+            extractor_data_match(competition_name, season_name, folder_path, extractor_data_match_checker(folder_path_checker), workers=config.get('fetch_workers', 1), storage=config.get('storage', 'files'))
         try:
-            update_season(connection, competition_name, season_name, season_id, matchday)
+            if config.get('pipeline', False):
+                # Descarga, parseo y carga en flujo, confirmando cada jornada
+                stream_season(competition_name, season_name, season_id, matchday)
+            else:
+                update_season(get_pool(), competition_name, season_name, season_id, matchday)
         except:
             print("Error al actualizar la información.")
             selected_season_menu(selected_season, selected_teams, competition_name)
         finally:
             print("Información actualizada.")
             selected_season_menu(selected_season, selected_teams, competition_name)
+    elif season_submenu_options == 2:
+        # Borra y vuelve a cargar una sola jornada desde match_data en una transacción
+        reingest_matchday(competition_name, season_name, season_id, int(input("Jornada a recargar: ")))
+        selected_season_menu(selected_season, selected_teams, competition_name)
     else:
         main_menu()
 
 
-main_menu()
\ No newline at end of file
+if __name__ == "__main__":
+    main_menu()
\ No newline at end of file